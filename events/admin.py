@@ -1,6 +1,14 @@
 from django.contrib import admin
 
-from events.models import Event
+from events.models import (
+    Event,
+    NotificationLog,
+    OutboxNotification,
+    WaitlistEntry,
+)
 
 
 admin.site.register(Event)
+admin.site.register(WaitlistEntry)
+admin.site.register(OutboxNotification)
+admin.site.register(NotificationLog)
@@ -0,0 +1,150 @@
+import json
+import os
+import socket
+from functools import lru_cache
+
+import redis
+from django.conf import settings
+
+
+DIRECT_REGISTRATION_MODE = "direct"
+BUFFERED_REGISTRATION_MODE = "buffered"
+
+STREAM_KEY = "events:registrations"
+GROUP_NAME = "appliers"
+STATUS_KEY = "events:registrations:status:{event_id}:{user_id}"
+
+PENDING_STATUS = "pending"
+
+# KEYS[1] - stream, KEYS[2] - status of the request
+# ARGV[1] - event id, ARGV[2] - user id,
+# ARGV[3] - pending status, ARGV[4] - status timeout in seconds
+ENQUEUE_SCRIPT = """
+if redis.call("GET", KEYS[2]) == ARGV[3] then
+    return 0
+end
+redis.call("SET", KEYS[2], ARGV[3], "EX", ARGV[4])
+redis.call("XADD", KEYS[1], "*", "event_id", ARGV[1], "user_id", ARGV[2])
+return 1
+"""
+
+
+def buffer_enabled() -> bool:
+    return (
+        getattr(settings, "EVENT_REGISTRATION_MODE", DIRECT_REGISTRATION_MODE)
+        == BUFFERED_REGISTRATION_MODE
+    )
+
+
+@lru_cache
+def get_client() -> redis.Redis:
+    return redis.Redis.from_url(settings.EVENT_REGISTRATION_BUFFER_REDIS_URL)
+
+
+@lru_cache
+def get_enqueue_script():
+    return get_client().register_script(ENQUEUE_SCRIPT)
+
+
+def get_consumer_name() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def dump_status(status: str, detail: str | None = None) -> str:
+    return json.dumps({"status": status, "detail": detail})
+
+
+def enqueue_registration(event_id: int, user_id: int) -> bool:
+    """
+    Appends the registration request to the stream, unless a request
+    of the user for the event is pending already.
+    Returns True if the request was appended.
+    """
+    return bool(
+        get_enqueue_script()(
+            keys=[
+                STREAM_KEY,
+                STATUS_KEY.format(event_id=event_id, user_id=user_id),
+            ],
+            args=[
+                event_id,
+                user_id,
+                dump_status(PENDING_STATUS),
+                settings.EVENT_REGISTRATION_STATUS_TIMEOUT,
+            ],
+        )
+    )
+
+
+def get_status(event_id: int, user_id: int) -> dict | None:
+    status = get_client().get(
+        STATUS_KEY.format(event_id=event_id, user_id=user_id)
+    )
+    return None if status is None else json.loads(status)
+
+
+def parse_entries(entries: list) -> list[tuple[str, int, int]]:
+    return [
+        (
+            entry_id.decode(),
+            int(fields[b"event_id"]),
+            int(fields[b"user_id"]),
+        )
+        for entry_id, fields in entries
+        # Entries deleted before being claimed have no fields
+        if fields
+    ]
+
+
+def read_registrations(count: int) -> list[tuple[str, int, int]]:
+    """
+    Reads up to `count` requests for this consumer, first the ones left
+    unacknowledged by consumers that crashed, then the new ones.
+    Returns (entry id, event id, user id) in the order of the requests.
+    """
+    client = get_client()
+    try:
+        client.xgroup_create(STREAM_KEY, GROUP_NAME, id="0", mkstream=True)
+    except redis.ResponseError as error:
+        if "BUSYGROUP" not in str(error):
+            raise
+
+    consumer = get_consumer_name()
+    _, claimed, *_ = client.xautoclaim(
+        STREAM_KEY,
+        GROUP_NAME,
+        consumer,
+        min_idle_time=settings.EVENT_REGISTRATION_BUFFER_CLAIM_IDLE_MS,
+        count=count,
+    )
+    registrations = parse_entries(claimed)
+    if len(registrations) < count:
+        for _, entries in client.xreadgroup(
+            GROUP_NAME,
+            consumer,
+            {STREAM_KEY: ">"},
+            count=count - len(registrations),
+        ):
+            registrations += parse_entries(entries)
+    return registrations
+
+
+def complete_registrations(
+    entry_ids: list[str],
+    statuses: dict[tuple[int, int], tuple[str, str]],
+) -> None:
+    """
+    Stores the statuses of the applied requests and removes them
+    from the stream with one round trip.
+    """
+    pipeline = get_client().pipeline(transaction=False)
+    for (event_id, user_id), (status, detail) in statuses.items():
+        pipeline.set(
+            STATUS_KEY.format(event_id=event_id, user_id=user_id),
+            dump_status(status, detail),
+            ex=settings.EVENT_REGISTRATION_STATUS_TIMEOUT,
+        )
+    if entry_ids:
+        pipeline.xack(STREAM_KEY, GROUP_NAME, *entry_ids)
+        pipeline.xdel(STREAM_KEY, *entry_ids)
+    pipeline.execute()
@@ -0,0 +1,102 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.request import Request
+
+
+LIST_GENERATION_KEY = "events:generation:list"
+EVENT_GENERATION_KEY = "events:generation:event:{event_id}"
+# Fields of the event itself, not changed by registrations
+EVENT_CONTENT_GENERATION_KEY = "events:generation:event-content:{event_id}"
+# Organizer and participant usernames and emails are part of the responses
+USERS_GENERATION_KEY = "events:generation:users"
+
+# Filters depending on the requesting user
+USER_FILTERS = ("participating", "organizing")
+
+
+def get_response_cache_timeout() -> int:
+    return getattr(settings, "EVENT_RESPONSE_CACHE_TIMEOUT", 60)
+
+
+def get_list_validator_bucket_seconds() -> int:
+    return getattr(settings, "EVENT_LIST_VALIDATOR_BUCKET_SECONDS", 60)
+
+
+def get_generations(*keys: str) -> list[int]:
+    """
+    Current generations of the keys. Missing generations start from
+    the current time, so entries cached before an eviction never match.
+    """
+    generations = cache.get_many(keys)
+    missing = {
+        key: time.time_ns() for key in keys if key not in generations
+    }
+    for key, generation in missing.items():
+        if not cache.add(key, generation, timeout=None):
+            missing[key] = cache.get(key, generation)
+    generations.update(missing)
+    return [generations[key] for key in keys]
+
+
+def bump_generation(key: str) -> None:
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def invalidate_event_list() -> None:
+    bump_generation(LIST_GENERATION_KEY)
+
+
+def invalidate_event(event_id: int) -> None:
+    """
+    Invalidates the cached event and all the cached lists.
+    """
+    bump_generation(EVENT_GENERATION_KEY.format(event_id=event_id))
+    bump_generation(LIST_GENERATION_KEY)
+
+
+def invalidate_event_content(event_id: int) -> None:
+    bump_generation(EVENT_CONTENT_GENERATION_KEY.format(event_id=event_id))
+
+
+def invalidate_users() -> None:
+    bump_generation(USERS_GENERATION_KEY)
+
+
+def get_response_cache_key(
+    request: Request,
+    variant: str,
+    event_id: int | str | None = None,
+) -> str:
+    """
+    Builds the key from the normalized query params, the response variant
+    (action and serializer) and the generations the response depends on.
+    Responses of the user-dependent filters are cached per user.
+    """
+    params = sorted(
+        (name, sorted(values))
+        for name, values in request.query_params.lists()
+    )
+    user_id = None
+    if any(name in USER_FILTERS for name, _ in params):
+        user_id = request.user.pk
+    signature = hashlib.md5(
+        repr(
+            (request.build_absolute_uri(request.path), params, user_id)
+        ).encode()
+    ).hexdigest()
+
+    generation_keys = [USERS_GENERATION_KEY]
+    if event_id is None:
+        generation_keys.append(LIST_GENERATION_KEY)
+    else:
+        generation_keys.append(EVENT_GENERATION_KEY.format(event_id=event_id))
+    generations = "-".join(
+        str(generation) for generation in get_generations(*generation_keys)
+    )
+    return f"events:response:{variant}:{generations}:{signature}"
@@ -1,6 +1,19 @@
+import re
+from datetime import date, datetime, time, timedelta
+
 import django_filters
 import django.utils.timezone
-from django.db.models import QuerySet, Case, When, Value, IntegerField
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import (
+    QuerySet,
+    Case,
+    When,
+    Value,
+    IntegerField,
+    F,
+    FloatField,
+)
+from django.db.models.functions import Cast
 
 from events.models import Event
 
@@ -20,10 +33,28 @@ class EventFilter(django_filters.FilterSet):
         label="Location Name",
     )
     start_date = django_filters.DateFilter(
-        field_name="start_time",
-        lookup_expr="date",
+        method="filter_start_date",
         label="Start Date",
     )
+    starts_after = django_filters.IsoDateTimeFilter(
+        field_name="start_time",
+        lookup_expr="gte",
+        label="Starts at or after",
+    )
+    starts_before = django_filters.IsoDateTimeFilter(
+        field_name="start_time",
+        lookup_expr="lt",
+        label="Starts before",
+    )
+    ends_before = django_filters.IsoDateTimeFilter(
+        field_name="end_time",
+        lookup_expr="lt",
+        label="Ends before",
+    )
+    search = django_filters.CharFilter(
+        method="filter_search",
+        label="Search in title, description and location",
+    )
     participating = django_filters.BooleanFilter(
         method="filter_participating",
         label="Events I participate in",
@@ -37,11 +68,13 @@ class EventFilter(django_filters.FilterSet):
             ("start_time", "start_time"),
             ("title", "title"),
             ("location", "location"),
+            ("participant_count", "popularity"),
         ),
         field_labels={
             "start_time": "Start time",
             "title": "Title",
             "location": "Location",
+            "participant_count": "Popularity",
         },
         label="Order by",
     )
@@ -53,11 +86,54 @@ class EventFilter(django_filters.FilterSet):
             "organizer",
             "location",
             "start_date",
+            "starts_after",
+            "starts_before",
+            "ends_before",
+            "search",
             "participating",
             "organizing",
             "ordering",
         )
 
+    def filter_start_date(self, queryset, name, value: date) -> QuerySet:
+        """
+        Filters events starting on the day in the current timezone.
+        Uses a half-open [day, next day) range instead of casting
+        start_time to a date, so the start_time index can be used.
+        """
+        timezone = django.utils.timezone.get_current_timezone()
+        day_start = django.utils.timezone.make_aware(
+            datetime.combine(value, time.min), timezone
+        )
+        next_day_start = django.utils.timezone.make_aware(
+            datetime.combine(value + timedelta(days=1), time.min), timezone
+        )
+        return queryset.filter(
+            start_time__gte=day_start,
+            start_time__lt=next_day_start,
+        )
+
+    def filter_search(self, queryset, name, value) -> QuerySet:
+        """
+        Full-text search with prefix matching of every word,
+        served by the GIN index on the stored search vector.
+        """
+        words = re.findall(r"\w+", value)
+        if not words:
+            return queryset
+        query = SearchQuery(
+            " & ".join(f"{word}:*" for word in words),
+            search_type="raw",
+            config="english",
+        )
+        # Double precision round-trips through the cursors exactly,
+        # unlike the real returned by ts_rank
+        return queryset.filter(search_vector=query).annotate(
+            search_rank=Cast(
+                SearchRank(F("search_vector"), query), FloatField()
+            )
+        )
+
     def filter_participating(self, queryset, name, value) -> QuerySet:
         """
         Filters events where the current user is a participant.
@@ -77,12 +153,25 @@ class EventFilter(django_filters.FilterSet):
     @property
     def qs(self) -> QuerySet:
         """
-        Get the queryset with default ordering applied.
+        Get the queryset with default ordering applied,
+        upcoming events first. EventPaginator reads the upcoming
+        and past events as separate index-ordered segments
+        instead of sorting by the is_upcoming annotation.
         """
         queryset = super().qs
-        ordering = self.form.cleaned_data.get("ordering") or ["start_time"]
+        default_ordering = ["start_time"]
+        if "search_rank" in queryset.query.annotations:
+            default_ordering = ["-search_rank", "start_time"]
+        ordering = self.form.cleaned_data.get("ordering") or default_ordering
         if not isinstance(ordering, (list, tuple)):
             ordering = [ordering]
+        # Map exposed names (e.g. "popularity") to model fields
+        ordering = [
+            self.filters["ordering"].get_ordering_value(param)
+            for param in ordering
+        ]
+        # Ties are broken by id, so pages never overlap
+        ordering.append("id")
         return queryset.annotate(
             is_upcoming=Case(
                 When(start_time__gte=django.utils.timezone.now(), then=Value(0)),
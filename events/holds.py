@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+import redis
+from django.conf import settings
+
+
+# Sorted set of the user ids holding seats, scored by expiry in milliseconds
+HOLDS_KEY = "events:holds:{event_id}"
+
+# KEYS[1] - holds of the event
+# ARGV[1] - now, ARGV[2] - expiry, ARGV[3] - user id,
+# ARGV[4] - free seats in the database, -1 if the event has no capacity
+HOLD_SEAT_SCRIPT = """
+redis.call("ZREMRANGEBYSCORE", KEYS[1], "-inf", ARGV[1])
+local expires_at = redis.call("ZSCORE", KEYS[1], ARGV[3])
+if expires_at then
+    return expires_at
+end
+local free_seats = tonumber(ARGV[4])
+if free_seats >= 0 and redis.call("ZCARD", KEYS[1]) >= free_seats then
+    return false
+end
+redis.call("ZADD", KEYS[1], ARGV[2], ARGV[3])
+if redis.call("PTTL", KEYS[1]) < tonumber(ARGV[2]) - tonumber(ARGV[1]) then
+    redis.call("PEXPIREAT", KEYS[1], ARGV[2])
+end
+return ARGV[2]
+"""
+
+
+def get_hold_duration() -> timedelta:
+    return timedelta(
+        minutes=getattr(settings, "EVENT_SEAT_HOLD_MINUTES", 0)
+    )
+
+
+def holds_enabled() -> bool:
+    return get_hold_duration() > timedelta(0)
+
+
+@lru_cache
+def get_client() -> redis.Redis:
+    return redis.Redis.from_url(settings.EVENT_SEAT_HOLDS_REDIS_URL)
+
+
+@lru_cache
+def get_hold_seat_script():
+    return get_client().register_script(HOLD_SEAT_SCRIPT)
+
+
+def to_milliseconds(moment: datetime) -> int:
+    return int(moment.timestamp() * 1000)
+
+
+def from_milliseconds(milliseconds: int | bytes) -> datetime:
+    return datetime.fromtimestamp(
+        int(float(milliseconds)) / 1000, timezone.utc
+    )
+
+
+def hold_seat(
+    event_id: int,
+    user_id: int,
+    free_seats: int | None,
+    now: datetime,
+) -> datetime | None:
+    """
+    Holds a seat for the user with one atomic script, unless the active
+    holds already take all the free seats. Expired holds are dropped
+    by the script and the key expires with its latest hold, so nothing
+    has to be released in the database.
+    Returns the expiry of the new or the existing hold, None if full.
+    """
+    expires_at = get_hold_seat_script()(
+        keys=[HOLDS_KEY.format(event_id=event_id)],
+        args=[
+            to_milliseconds(now),
+            to_milliseconds(now + get_hold_duration()),
+            user_id,
+            -1 if free_seats is None else max(free_seats, 0),
+        ],
+    )
+    return None if expires_at is None else from_milliseconds(expires_at)
+
+
+def get_holds(
+    event_id: int,
+    user_id: int | None,
+    now: datetime,
+) -> tuple[int, datetime | None]:
+    """
+    Counts the active holds of the other users and reads the expiry
+    of the active hold of the user with one round trip.
+    """
+    key = HOLDS_KEY.format(event_id=event_id)
+    pipeline = get_client().pipeline(transaction=False)
+    pipeline.zcount(key, f"({to_milliseconds(now)}", "+inf")
+    # No user has the id 0
+    pipeline.zscore(key, user_id or 0)
+    count, expires_at = pipeline.execute()
+    if expires_at is None or expires_at <= to_milliseconds(now):
+        return count, None
+    return count - 1, from_milliseconds(expires_at)
+
+
+def release_hold(event_id: int, user_id: int) -> None:
+    get_client().zrem(HOLDS_KEY.format(event_id=event_id), user_id)
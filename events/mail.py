@@ -0,0 +1,197 @@
+import os
+import queue
+import smtplib
+import threading
+import time
+
+from celery.signals import worker_process_shutdown
+from django.conf import settings
+from django.core.mail import (
+    EmailMessage,
+    EmailMultiAlternatives,
+    get_connection,
+)
+from django.core.mail.backends.base import BaseEmailBackend
+
+
+# Errors after which the message is sent again over a new connection
+CONNECTION_ERRORS = (
+    smtplib.SMTPServerDisconnected,
+    ConnectionError,
+    TimeoutError,
+)
+
+# Errors failing a single message, the connection stays usable
+RECIPIENT_ERRORS = (
+    smtplib.SMTPRecipientsRefused,
+    smtplib.SMTPDataError,
+)
+
+
+class SendInterrupted(Exception):
+    """
+    Connection error of send_individual_messages, raised once `handled`
+    messages were sent or refused, `sent` of them sent.
+    """
+
+    def __init__(self, handled: int, sent: int) -> None:
+        super().__init__(handled, sent)
+        self.handled = handled
+        self.sent = sent
+
+
+class ConnectionPool:
+    """
+    Open email backend connections reused across messages,
+    so the connection, TLS handshake and login are paid once
+    per connection instead of once per message.
+    Connections idle for longer than `keepalive` seconds are checked
+    with NOOP before reuse, as servers drop idle clients.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        keepalive: float,
+        **connection_kwargs,
+    ) -> None:
+        self.keepalive = keepalive
+        self.connection_kwargs = connection_kwargs
+        self.pid = os.getpid()
+        # The most recently used connections are the most likely alive
+        self.idle = queue.LifoQueue(maxsize=size)
+
+    def open_connection(self) -> BaseEmailBackend:
+        connection = get_connection(**self.connection_kwargs)
+        connection.open()
+        return connection
+
+    @staticmethod
+    def close_connection(connection: BaseEmailBackend) -> None:
+        try:
+            connection.close()
+        except (smtplib.SMTPException, OSError):
+            pass
+
+    @staticmethod
+    def is_alive(connection: BaseEmailBackend) -> bool:
+        if not hasattr(connection, "connection"):
+            # Not an SMTP backend, e.g. the locmem one of the tests
+            return True
+        if connection.connection is None:
+            return False
+        try:
+            return connection.connection.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def acquire(self) -> BaseEmailBackend:
+        while True:
+            try:
+                connection, released_at = self.idle.get_nowait()
+            except queue.Empty:
+                return self.open_connection()
+            if (
+                time.monotonic() - released_at < self.keepalive
+                or self.is_alive(connection)
+            ):
+                return connection
+            self.close_connection(connection)
+
+    def release(self, connection: BaseEmailBackend) -> None:
+        try:
+            self.idle.put_nowait((connection, time.monotonic()))
+        except queue.Full:
+            self.close_connection(connection)
+
+    def close(self) -> None:
+        while True:
+            try:
+                connection, _ = self.idle.get_nowait()
+            except queue.Empty:
+                return
+            self.close_connection(connection)
+
+    def send_messages(self, messages: list[EmailMessage]) -> int:
+        """
+        Sends the messages over a pooled connection. If the connection
+        was dropped meanwhile, sends them once more over a new one.
+        """
+        connection = self.acquire()
+        try:
+            sent = connection.send_messages(messages)
+        except CONNECTION_ERRORS:
+            self.close_connection(connection)
+            connection = self.open_connection()
+            try:
+                sent = connection.send_messages(messages)
+            except BaseException:
+                self.close_connection(connection)
+                raise
+        except BaseException:
+            self.close_connection(connection)
+            raise
+        self.release(connection)
+        return sent
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """
+    Returns the pool of the current process. Worker processes forked
+    with the pool of the parent create their own, as the sockets
+    of the parent cannot be shared.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.pid != os.getpid():
+            _pool = ConnectionPool(
+                size=settings.EVENT_EMAIL_POOL_SIZE,
+                keepalive=settings.EVENT_EMAIL_KEEPALIVE,
+            )
+        return _pool
+
+
+@worker_process_shutdown.connect
+def close_connections(**kwargs) -> None:
+    if _pool is not None and _pool.pid == os.getpid():
+        _pool.close()
+
+
+def build_message(
+    subject: str,
+    message: str,
+    recipient_list: list[str],
+    html_message: str | None = None,
+) -> EmailMultiAlternatives:
+    mail = EmailMultiAlternatives(
+        subject=subject,
+        body=message,
+        from_email=settings.EMAIL_HOST_USER,
+        to=recipient_list,
+    )
+    if html_message:
+        mail.attach_alternative(html_message, "text/html")
+    return mail
+
+
+def send_individual_messages(messages: list[EmailMessage]) -> int:
+    """
+    Sends the messages one by one over a pooled connection, so a refused
+    recipient does not stop the others. Connection errors are raised
+    as SendInterrupted, so only the messages not handled are sent again.
+    Returns the number of sent messages.
+    """
+    pool = get_pool()
+    sent = 0
+    for handled, message in enumerate(messages):
+        try:
+            sent += pool.send_messages([message])
+        except RECIPIENT_ERRORS:
+            pass
+        except CONNECTION_ERRORS as error:
+            raise SendInterrupted(handled, sent) from error
+    return sent
@@ -0,0 +1,118 @@
+import socketserver
+import threading
+import time
+
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+
+from events.mail import ConnectionPool
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """
+    Minimal SMTP dialogue accepting every message.
+    """
+
+    def reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self) -> None:
+        # Stands in for the TLS handshake and login of a real server
+        time.sleep(self.server.handshake_delay)
+        self.reply("220 localhost ESMTP")
+        while line := self.rfile.readline():
+            command = line.decode().split(" ", 1)[0].strip().upper()
+            if command == "EHLO":
+                self.reply("250 localhost")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                with self.server.lock:
+                    self.server.received += 1
+                self.reply("250 OK")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("250 OK")
+
+
+class SMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+
+    def __init__(self, handshake_delay: float) -> None:
+        super().__init__(("127.0.0.1", 0), SMTPHandler)
+        self.handshake_delay = handshake_delay
+        self.received = 0
+        self.lock = threading.Lock()
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares email throughput of a new SMTP connection per message "
+        "(send_mail) and of pooled connections (events.mail) "
+        "against a local stand-in SMTP server."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--messages", type=int, default=200)
+        parser.add_argument(
+            "--handshake-ms",
+            type=float,
+            default=50,
+            help="Connection setup delay of the stand-in server.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        server = SMTPServer(handshake_delay=options["handshake_ms"] / 1000)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        connection_kwargs = {
+            "backend": "django.core.mail.backends.smtp.EmailBackend",
+            "host": "127.0.0.1",
+            "port": server.server_address[1],
+            "username": "",
+            "password": "",
+            "use_tls": False,
+            "use_ssl": False,
+        }
+        messages = [
+            EmailMessage(
+                subject=f"Benchmark {index}",
+                body="Benchmark",
+                from_email="events@localhost",
+                to=[f"user_{index}@localhost"],
+            )
+            for index in range(options["messages"])
+        ]
+
+        try:
+            self.report(
+                "Connection per message",
+                messages,
+                lambda message: get_connection(
+                    **connection_kwargs
+                ).send_messages([message]),
+            )
+            pool = ConnectionPool(size=1, keepalive=30, **connection_kwargs)
+            self.report(
+                "Pooled connection",
+                messages,
+                lambda message: pool.send_messages([message]),
+            )
+            pool.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.stdout.write(f"Messages received: {server.received}")
+
+    def report(self, name: str, messages: list[EmailMessage], send) -> None:
+        started_at = time.perf_counter()
+        for message in messages:
+            send(message)
+        elapsed = time.perf_counter() - started_at
+        self.stdout.write(self.style.MIGRATE_HEADING(name))
+        self.stdout.write(
+            f"{len(messages)} messages in {elapsed:.2f} s, "
+            f"{len(messages) / elapsed:.0f} messages/s"
+        )
@@ -0,0 +1,124 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q, QuerySet
+
+from events.models import Event
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares query plans of the icontains filters with and without "
+        "the trigram indexes on a synthetic dataset, and reports which "
+        "trigram indexes the planner picked for every lookup. "
+        "All changes are rolled back."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--events", type=int, default=200_000)
+        # On small user tables the planner may prefer a seq scan
+        parser.add_argument("--users", type=int, default=100_000)
+
+    def handle(self, *args, **options) -> None:
+        with transaction.atomic():
+            self.create_dataset(options["users"], options["events"])
+            queries = self.get_queries()
+
+            self.stdout.write(self.style.MIGRATE_HEADING("With indexes"))
+            plans = self.explain_queries(queries)
+
+            self.drop_trigram_indexes()
+            self.stdout.write(self.style.MIGRATE_HEADING("Without indexes"))
+            self.explain_queries(queries)
+
+            self.stdout.write(
+                self.style.MIGRATE_HEADING("Trigram indexes used")
+            )
+            for name, plan in plans.items():
+                indexes = re.findall(r"Index Scan on (\w+_trgm_idx)", plan)
+                self.stdout.write(
+                    f"{name}: {', '.join(indexes) or 'none, seq scan'}"
+                )
+
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS("Synthetic dataset rolled back"))
+
+    def create_dataset(self, users: int, events: int) -> None:
+        self.stdout.write(
+            f"Creating {users} users and {events} events..."
+        )
+        user_table = get_user_model()._meta.db_table
+        event_table = Event._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {user_table} (
+                    password, is_superuser, username, first_name, last_name,
+                    email, is_staff, is_active, date_joined
+                )
+                SELECT
+                    '', FALSE, 'user_' || md5(i::text), '', '',
+                    'user_' || i || '@' || md5(i::text) || '.com',
+                    FALSE, TRUE, NOW()
+                FROM generate_series(1, %s) AS i
+                RETURNING id
+                """,
+                [users],
+            )
+            first_user_id = min(row[0] for row in cursor.fetchall())
+            cursor.execute(
+                f"""
+                INSERT INTO {event_table} (
+                    title, description, start_time, end_time, location,
+                    organizer_id, participant_count, updated_at
+                )
+                SELECT
+                    'Event ' || md5(i::text), '',
+                    NOW() + i * INTERVAL '1 hour',
+                    NOW() + i * INTERVAL '1 hour' + INTERVAL '30 minutes',
+                    'Venue ' || md5((i %% 1000)::text),
+                    %s + i %% %s,
+                    0, NOW()
+                FROM generate_series(1, %s) AS i
+                """,
+                [first_user_id, users, events],
+            )
+            cursor.execute(f"ANALYZE {user_table}, {event_table}")
+
+    @staticmethod
+    def get_queries() -> dict[str, QuerySet]:
+        """
+        Lookups made by EventFilter and UserAdmin.search_fields.
+        """
+        term = "a1b2"
+        return {
+            "EventFilter.title": Event.objects.filter(title__icontains=term),
+            "EventFilter.location": Event.objects.filter(
+                location__icontains=term
+            ),
+            "EventFilter.organizer": Event.objects.filter(
+                organizer__username__icontains=term
+            ),
+            "UserAdmin.search_fields": get_user_model().objects.filter(
+                Q(email__icontains=term) | Q(username__icontains=term)
+            ),
+        }
+
+    @staticmethod
+    def drop_trigram_indexes() -> None:
+        with connection.cursor() as cursor:
+            for model in (Event, get_user_model()):
+                for index in model._meta.indexes:
+                    if index.name.endswith("_trgm_idx"):
+                        cursor.execute(f"DROP INDEX {index.name}")
+
+    def explain_queries(self, queries: dict[str, QuerySet]) -> dict[str, str]:
+        plans = {}
+        for name, queryset in queries.items():
+            plans[name] = queryset.explain(analyze=True)
+            self.stdout.write(self.style.SQL_KEYWORD(name))
+            self.stdout.write(plans[name])
+            self.stdout.write("")
+        return plans
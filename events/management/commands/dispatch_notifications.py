@@ -0,0 +1,53 @@
+import time
+
+import kombu.exceptions
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, close_old_connections
+
+from events.outbox import dispatch_notifications
+
+
+class Command(BaseCommand):
+    help = (
+        "Publishes the notifications written to the outbox to Celery. "
+        "Several dispatchers may run in parallel."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.EVENT_OUTBOX_BATCH_SIZE,
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.EVENT_OUTBOX_POLL_INTERVAL,
+            help="Seconds to wait when the outbox is drained.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the outbox and exit.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        batch_size = options["batch_size"]
+        while True:
+            try:
+                dispatched = dispatch_notifications(batch_size)
+            except (
+                OperationalError,
+                kombu.exceptions.OperationalError,
+            ) as error:
+                # The batch stays in the outbox until both are back
+                self.stderr.write(f"Dispatching failed: {error}")
+                close_old_connections()
+                dispatched = 0
+            if dispatched:
+                self.stdout.write(f"Dispatched {dispatched} notifications")
+            if dispatched < batch_size:
+                if options["once"]:
+                    return
+                time.sleep(options["interval"])
@@ -0,0 +1,655 @@
+from collections import defaultdict
+from datetime import datetime
+
+from django.db import connection, models, transaction
+from django.db.models import Exists, F, OuterRef
+
+import events.cache
+import events.notifications
+
+
+class EventManager(models.Manager):
+    # Event fields and registration guards for the user
+    REGISTRATION_STATE_SQL = """
+        SELECT
+            e.id,
+            e.title,
+            e.start_time,
+            e.end_time,
+            e.location,
+            e.capacity,
+            e.capacity - e.participant_count AS free_seats,
+            e.capacity > e.participant_count + %(reserved)s
+                AS has_free_seats,
+            u.email AS organizer_email,
+            e.organizer_id = %(user_id)s AS is_organizer,
+            e.start_time < %(now)s AS started,
+            EXISTS (
+                SELECT 1
+                FROM {participant_table} p
+                WHERE p.event_id = e.id AND p.user_id = %(user_id)s
+            ) AS registered,
+            EXISTS (
+                SELECT 1
+                FROM {waitlist_table} w
+                WHERE w.event_id = e.id AND w.user_id = %(user_id)s
+            ) AS on_waitlist,
+            EXISTS (
+                SELECT 1
+                FROM {waitlist_table} w
+                WHERE w.event_id = e.id
+            ) AS has_waitlist
+        FROM {event_table} e
+        JOIN {user_table} u ON u.id = e.organizer_id
+        WHERE e.id = %(event_id)s
+    """
+
+    def get_tables(self) -> dict[str, str]:
+        return {
+            "event_table": self.model._meta.db_table,
+            "participant_table": (
+                self.model.participants.through._meta.db_table
+            ),
+            "user_table": (
+                self.model._meta.get_field("organizer")
+                .related_model._meta.db_table
+            ),
+            "waitlist_table": (
+                self.model._meta.get_field("waitlist")
+                .related_model._meta.db_table
+            ),
+            "outbox_table": (
+                self.model._meta.get_field("outbox_notifications")
+                .related_model._meta.db_table
+            ),
+        }
+
+    @staticmethod
+    def fetch_row(sql: str, params: dict) -> dict | None:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            columns = [column.name for column in cursor.description]
+        return dict(zip(columns, row))
+
+    def get_registration_state(
+        self,
+        event_id: int,
+        user_id: int,
+        now: datetime,
+    ) -> dict | None:
+        """
+        Read the registration guards of the user without changing anything.
+        Return None if there is no such event.
+        """
+        return self.fetch_row(
+            self.REGISTRATION_STATE_SQL.format(**self.get_tables()),
+            {
+                "event_id": event_id,
+                "user_id": user_id,
+                "now": now,
+                "reserved": 0,
+            },
+        )
+
+    def register_participant(
+        self,
+        event_id: int,
+        user_id: int,
+        now: datetime,
+        reserved: int = 0,
+        held: bool = False,
+    ) -> dict | None:
+        """
+        Register the user in one statement: reads the event with
+        its guards, claims a seat with a conditional UPDATE and inserts
+        the participant row with ON CONFLICT DO NOTHING.
+        The seat is claimed only if the user is not the organizer,
+        is not registered or waitlisted, the event has not started
+        and nobody is waiting for a seat already. Otherwise, users of
+        capacity-limited events are appended to the waitlist.
+        The registration email is written to the outbox by the same
+        statement (see events.outbox).
+        `reserved` seats are held by other users (see events.holds)
+        and cannot be claimed. A `held` seat is claimed regardless of
+        the waitlist, as it was reserved before, and never waitlisted.
+        The event row is only locked by the UPDATE, never by
+        SELECT FOR UPDATE, so oversells are impossible without
+        serializing registrations on a lock held across round trips.
+        Return None if there is no such event.
+        """
+        row = self.fetch_row(
+            """
+            WITH event AS ({registration_state}),
+            allowed AS (
+                SELECT id, capacity, has_waitlist
+                FROM event
+                WHERE NOT is_organizer
+                    AND NOT registered
+                    AND NOT on_waitlist
+                    AND NOT started
+            ),
+            claimed AS (
+                UPDATE {event_table}
+                SET
+                    participant_count = participant_count + 1,
+                    updated_at = %(now)s
+                WHERE
+                    id IN (
+                        SELECT id
+                        FROM allowed
+                        WHERE %(held)s OR NOT has_waitlist
+                    )
+                    AND (
+                        capacity IS NULL
+                        OR participant_count + %(reserved)s < capacity
+                    )
+                RETURNING id
+            ),
+            inserted AS (
+                INSERT INTO {participant_table} (event_id, user_id)
+                SELECT id, %(user_id)s FROM claimed
+                ON CONFLICT (event_id, user_id) DO NOTHING
+                RETURNING event_id
+            ),
+            notified AS (
+                INSERT INTO {outbox_table}
+                    (template, event_id, user_id, created_at, available_at)
+                SELECT
+                    %(template)s,
+                    event_id,
+                    %(user_id)s,
+                    %(now)s,
+                    %(available_at)s
+                FROM inserted
+            ),
+            waitlisted AS (
+                INSERT INTO {waitlist_table} (event_id, user_id, created_at)
+                SELECT id, %(user_id)s, %(now)s
+                FROM allowed
+                WHERE capacity IS NOT NULL
+                    AND NOT %(held)s
+                    AND NOT EXISTS (SELECT 1 FROM claimed)
+                ON CONFLICT (event_id, user_id) DO NOTHING
+                RETURNING id
+            )
+            SELECT
+                event.*,
+                EXISTS (SELECT 1 FROM claimed) AS claimed,
+                EXISTS (SELECT 1 FROM inserted) AS inserted,
+                EXISTS (SELECT 1 FROM waitlisted) AS waitlisted
+            FROM event
+            """.format(
+                registration_state=self.REGISTRATION_STATE_SQL.format(
+                    **self.get_tables()
+                ),
+                **self.get_tables(),
+            ),
+            {
+                "event_id": event_id,
+                "user_id": user_id,
+                "now": now,
+                "reserved": reserved,
+                "held": held,
+                "template": events.notifications.REGISTRATION,
+                "available_at": (
+                    now + events.notifications.get_coalesce_window()
+                ),
+            },
+        )
+        if row is None:
+            return None
+
+        if row["claimed"] and not row["inserted"]:
+            # Registered by a concurrent request after the snapshot
+            self.filter(pk=event_id).update(
+                participant_count=F("participant_count") - 1
+            )
+            row["registered"] = True
+        if row["inserted"]:
+            transaction.on_commit(
+                lambda: events.cache.invalidate_event(event_id)
+            )
+        return row
+
+    def apply_registrations(
+        self,
+        registrations: list[tuple[int, int]],
+        now: datetime,
+        reserved: dict[int, int] | None = None,
+    ) -> list[dict | None]:
+        """
+        Apply a batch of (event id, user id) registration requests
+        in their order, with the checks of register_participant.
+        The events of the batch are locked, so their seats are counted
+        once, the participants and the waitlist rows are inserted by
+        one bulk_create each and the counters are set by one UPDATE.
+        The registration emails are written to the outbox with them.
+        `reserved` maps event ids to the seats held by users.
+        Must run in a transaction.
+        Return the rows of register_participant, None for missing events.
+        """
+        reserved = reserved or {}
+        participant_model = self.model.participants.through
+        waitlist_model = self.model._meta.get_field("waitlist").related_model
+        outbox_model = (
+            self.model._meta.get_field("outbox_notifications").related_model
+        )
+        event_ids = {event_id for event_id, _ in registrations}
+        user_ids = {user_id for _, user_id in registrations}
+
+        events_by_id = self.filter(pk__in=event_ids).annotate(
+            has_waitlist=Exists(
+                waitlist_model.objects.filter(event_id=OuterRef("pk"))
+            )
+        ).select_related("organizer").only(
+            "title",
+            "start_time",
+            "end_time",
+            "location",
+            "capacity",
+            "participant_count",
+            "organizer__email",
+        ).order_by("pk").select_for_update(of=("self",)).in_bulk()
+        registered = set(
+            participant_model.objects.filter(
+                event_id__in=event_ids, user_id__in=user_ids
+            ).values_list("event_id", "user_id")
+        )
+        waitlisted = set(
+            waitlist_model.objects.filter(
+                event_id__in=event_ids, user_id__in=user_ids
+            ).values_list("event_id", "user_id")
+        )
+
+        available_at = now + events.notifications.get_coalesce_window()
+        rows = []
+        participants, waitlist_entries, notifications = [], [], []
+        claimed = defaultdict(int)
+        for event_id, user_id in registrations:
+            event = events_by_id.get(event_id)
+            if event is None:
+                rows.append(None)
+                continue
+            taken = (
+                event.participant_count
+                + claimed[event_id]
+                + reserved.get(event_id, 0)
+            )
+            row = {
+                "id": event.id,
+                "title": event.title,
+                "start_time": event.start_time,
+                "end_time": event.end_time,
+                "location": event.location,
+                "capacity": event.capacity,
+                "has_free_seats": (
+                    event.capacity is not None and event.capacity > taken
+                ),
+                "organizer_email": event.organizer.email,
+                "is_organizer": event.organizer_id == user_id,
+                "started": event.start_time < now,
+                "registered": (event_id, user_id) in registered,
+                "on_waitlist": (event_id, user_id) in waitlisted,
+                "has_waitlist": event.has_waitlist,
+                "inserted": False,
+                "waitlisted": False,
+                "user_id": user_id,
+            }
+            rows.append(row)
+            if (
+                row["is_organizer"]
+                or row["registered"]
+                or row["on_waitlist"]
+                or row["started"]
+            ):
+                continue
+
+            if not event.has_waitlist and (
+                event.capacity is None or taken < event.capacity
+            ):
+                participants.append(
+                    participant_model(event_id=event_id, user_id=user_id)
+                )
+                notifications.append(
+                    outbox_model(
+                        template=events.notifications.REGISTRATION,
+                        event_id=event_id,
+                        user_id=user_id,
+                        created_at=now,
+                        available_at=available_at,
+                    )
+                )
+                registered.add((event_id, user_id))
+                claimed[event_id] += 1
+                row["inserted"] = True
+            elif event.capacity is not None:
+                waitlist_entries.append(
+                    waitlist_model(
+                        event_id=event_id, user_id=user_id, created_at=now
+                    )
+                )
+                waitlisted.add((event_id, user_id))
+                # Later requests queue behind this one
+                event.has_waitlist = True
+                row["waitlisted"] = True
+
+        participant_model.objects.bulk_create(
+            participants, ignore_conflicts=True
+        )
+        waitlist_model.objects.bulk_create(
+            waitlist_entries, ignore_conflicts=True
+        )
+        outbox_model.objects.bulk_create(notifications)
+        if claimed:
+            # Recounted, as conflicting rows added without locking
+            # the event are skipped by bulk_create
+            self.filter(pk__in=claimed).update(
+                participant_count=self.model.count_participants(),
+                updated_at=now,
+            )
+            for event_id in claimed:
+                transaction.on_commit(
+                    lambda event_id=event_id: (
+                        events.cache.invalidate_event(event_id)
+                    )
+                )
+        return rows
+
+    def unregister_participant(
+        self,
+        event_id: int,
+        user_id: int,
+        now: datetime,
+    ) -> dict | None:
+        """
+        Unregister the user in one statement: deletes the participant
+        row if the event has not started and releases the seat,
+        or removes the user from the waitlist.
+        The cancellation email is written to the outbox by the same
+        statement (see events.outbox).
+        The registered flags are read from the snapshot before the delete.
+        Return None if there is no such event.
+        """
+        row = self.fetch_row(
+            """
+            WITH event AS (
+                SELECT
+                    e.id,
+                    e.title,
+                    e.start_time < %(now)s AS started,
+                    EXISTS (
+                        SELECT 1
+                        FROM {waitlist_table} w
+                        WHERE w.event_id = e.id
+                    ) AS has_waitlist
+                FROM {event_table} e
+                WHERE e.id = %(event_id)s
+            ),
+            deleted AS (
+                DELETE FROM {participant_table} p
+                USING event
+                WHERE p.event_id = event.id
+                    AND p.user_id = %(user_id)s
+                    AND NOT event.started
+                RETURNING p.event_id
+            ),
+            released AS (
+                UPDATE {event_table}
+                SET
+                    participant_count = participant_count - 1,
+                    updated_at = %(now)s
+                WHERE id IN (SELECT event_id FROM deleted)
+                RETURNING id
+            ),
+            notified AS (
+                INSERT INTO {outbox_table}
+                    (template, event_id, user_id, created_at, available_at)
+                SELECT
+                    %(template)s,
+                    event_id,
+                    %(user_id)s,
+                    %(now)s,
+                    %(available_at)s
+                FROM deleted
+            ),
+            left_waitlist AS (
+                DELETE FROM {waitlist_table} w
+                USING event
+                WHERE w.event_id = event.id
+                    AND w.user_id = %(user_id)s
+                    AND NOT event.started
+                RETURNING w.id
+            )
+            SELECT
+                event.*,
+                EXISTS (
+                    SELECT 1
+                    FROM {participant_table} p
+                    WHERE p.event_id = event.id AND p.user_id = %(user_id)s
+                ) AS registered,
+                EXISTS (
+                    SELECT 1
+                    FROM {waitlist_table} w
+                    WHERE w.event_id = event.id AND w.user_id = %(user_id)s
+                ) AS on_waitlist,
+                EXISTS (SELECT 1 FROM released) AS unregistered,
+                EXISTS (SELECT 1 FROM left_waitlist) AS left_waitlist
+            FROM event
+            """.format(**self.get_tables()),
+            {
+                "event_id": event_id,
+                "user_id": user_id,
+                "now": now,
+                "template": events.notifications.CANCEL_REGISTRATION,
+                "available_at": (
+                    now + events.notifications.get_coalesce_window()
+                ),
+            },
+        )
+        if row is None:
+            return None
+
+        if not row["started"]:
+            # Unregistered by a concurrent request after the snapshot
+            row["registered"] = row["unregistered"]
+            row["on_waitlist"] = row["left_waitlist"]
+        if row["unregistered"] or row["left_waitlist"]:
+            transaction.on_commit(
+                lambda: events.cache.invalidate_event(event_id)
+            )
+        return row
+
+    def promote_waitlisted(
+        self,
+        event_id: int,
+        limit: int,
+        now: datetime,
+        reserved: int = 0,
+    ) -> list[dict]:
+        """
+        Move up to `limit` first waitlisted users of the upcoming event
+        to its participants, as many as there are free seats
+        not `reserved` by seat holds.
+        The event row is locked while the free seats are counted
+        and claimed by the same statement, so every batch is one
+        short transaction. The promotion emails are written
+        to the outbox by the same statement (see events.outbox).
+        Return the promoted users.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                WITH event AS (
+                    SELECT
+                        e.id,
+                        LEAST(
+                            COALESCE(
+                                e.capacity
+                                - e.participant_count
+                                - %(reserved)s,
+                                %(limit)s
+                            ),
+                            %(limit)s
+                        ) AS free_seats
+                    FROM {event_table} e
+                    WHERE e.id = %(event_id)s AND e.start_time >= %(now)s
+                    FOR NO KEY UPDATE
+                ),
+                promoted AS (
+                    DELETE FROM {waitlist_table} w
+                    WHERE w.id IN (
+                        SELECT w.id
+                        FROM {waitlist_table} w
+                        JOIN event ON event.id = w.event_id
+                        ORDER BY w.id
+                        LIMIT (SELECT GREATEST(free_seats, 0) FROM event)
+                    )
+                    RETURNING w.id, w.event_id, w.user_id
+                ),
+                inserted AS (
+                    INSERT INTO {participant_table} (event_id, user_id)
+                    SELECT event_id, user_id FROM promoted
+                    ON CONFLICT (event_id, user_id) DO NOTHING
+                    RETURNING event_id, user_id
+                ),
+                claimed AS (
+                    UPDATE {event_table} e
+                    SET
+                        participant_count = e.participant_count + (
+                            SELECT COUNT(*) FROM inserted
+                        ),
+                        updated_at = %(now)s
+                    WHERE e.id IN (SELECT event_id FROM inserted)
+                    RETURNING e.id
+                ),
+                notified AS (
+                    INSERT INTO {outbox_table}
+                        (template, event_id, user_id, created_at, available_at)
+                    SELECT
+                        %(template)s,
+                        event_id,
+                        user_id,
+                        %(now)s,
+                        %(available_at)s
+                    FROM inserted
+                )
+                SELECT
+                    inserted.user_id,
+                    u.username,
+                    u.email
+                FROM inserted
+                JOIN promoted USING (event_id, user_id)
+                JOIN {user_table} u ON u.id = inserted.user_id
+                ORDER BY promoted.id
+                """.format(**self.get_tables()),
+                {
+                    "event_id": event_id,
+                    "limit": limit,
+                    "now": now,
+                    "reserved": reserved,
+                    "template": events.notifications.WAITLIST_PROMOTION,
+                    "available_at": (
+                        now + events.notifications.get_coalesce_window()
+                    ),
+                },
+            )
+            columns = [column.name for column in cursor.description]
+            promoted = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        if promoted:
+            transaction.on_commit(
+                lambda: events.cache.invalidate_event(event_id)
+            )
+        return promoted
+
+    def claim_reminders(
+        self,
+        now: datetime,
+        until: datetime,
+        limit: int,
+    ) -> dict:
+        """
+        Claim up to `limit` events starting from `now` until `until`
+        whose participants were not reminded yet, and write a reminder
+        of every participant to the outbox (see events.outbox),
+        in one statement. The events are found by a range scan of
+        the partial index of the events to be reminded, and locked
+        with SKIP LOCKED, so concurrent runs claim different events
+        and a committed claim is never repeated. They are selected
+        by a materialized CTE, as a subquery of the UPDATE may be
+        evaluated again and claim more than `limit` events.
+        Return the numbers of claimed events and of reminders.
+        """
+        return self.fetch_row(
+            """
+            WITH pending AS MATERIALIZED (
+                SELECT id
+                FROM {event_table}
+                WHERE reminder_sent_at IS NULL
+                    AND start_time >= %(now)s
+                    AND start_time < %(until)s
+                ORDER BY start_time, id
+                LIMIT %(limit)s
+                FOR UPDATE SKIP LOCKED
+            ),
+            claimed AS (
+                UPDATE {event_table} e
+                SET reminder_sent_at = %(now)s
+                FROM pending
+                WHERE e.id = pending.id
+                RETURNING e.id
+            ),
+            notified AS (
+                INSERT INTO {outbox_table}
+                    (template, event_id, user_id, created_at, available_at)
+                SELECT %(template)s, p.event_id, p.user_id, %(now)s, %(now)s
+                FROM {participant_table} p
+                JOIN claimed ON claimed.id = p.event_id
+                RETURNING id
+            )
+            SELECT
+                (SELECT COUNT(*) FROM claimed) AS events,
+                (SELECT COUNT(*) FROM notified) AS reminders
+            """.format(**self.get_tables()),
+            {
+                "now": now,
+                "until": until,
+                "limit": limit,
+                "template": events.notifications.REMINDER,
+            },
+        )
+
+
+class NotificationLogManager(models.Manager):
+    def get_digests(self, user_ids: list[int]) -> list[dict]:
+        """
+        Group the logged notifications of the users per user
+        by one statement, with the ids of the rows to delete once
+        the digests are sent, so notifications logged meanwhile are
+        left for the next digest, never lost.
+        Return the users with their notifications, oldest first.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT
+                    user_id,
+                    JSON_AGG(
+                        JSON_BUILD_OBJECT(
+                            'template', template,
+                            'event_id', event_id
+                        )
+                        ORDER BY id
+                    ) AS notices,
+                    ARRAY_AGG(id ORDER BY id) AS ids
+                FROM {log_table}
+                WHERE user_id = ANY(%s)
+                GROUP BY user_id
+                ORDER BY user_id
+                """.format(log_table=self.model._meta.db_table),
+                [user_ids],
+            )
+            columns = [column.name for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.4 on 2026-10-18 04:25
+
+import django.contrib.postgres.constraints
+import django.contrib.postgres.fields.ranges
+import events.models
+from django.conf import settings
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.AddConstraint(
+            model_name="event",
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(
+                expressions=[
+                    ("location", "="),
+                    (
+                        events.models.TsTzRange(
+                            "start_time",
+                            "end_time",
+                            django.contrib.postgres.fields.ranges.RangeBoundary(),
+                        ),
+                        "&&",
+                    ),
+                ],
+                name="exclude_overlapping_events_at_location",
+            ),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.4 on 2026-10-18 04:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0002_event_overlap_exclusion_constraint"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="participant_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunSQL(
+            sql="""
+                UPDATE events_event
+                SET participant_count = (
+                    SELECT COUNT(*)
+                    FROM events_event_participants
+                    WHERE events_event_participants.event_id = events_event.id
+                )
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.4 on 2026-10-18 05:07
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0010_outboxnotification"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="outboxnotification",
+            name="available_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name="outboxnotification",
+            index=models.Index(
+                fields=["available_at", "id"], name="outbox_available_at_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.4 on 2026-10-18 05:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0012_notificationlog"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="reminder_sent_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        # Past events are never reminded, so they leave the pending index
+        migrations.RunSQL(
+            sql="""
+                UPDATE events_event
+                SET reminder_sent_at = start_time
+                WHERE start_time < NOW()
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                condition=models.Q(("reminder_sent_at__isnull", True)),
+                fields=["start_time", "id"],
+                name="event_reminder_pending_idx",
+            ),
+        ),
+    ]
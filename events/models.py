@@ -1,9 +1,36 @@
+from collections import defaultdict
 from datetime import datetime
 
 import django.utils.timezone
 from django.conf import settings
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import (
+    DateTimeRangeField,
+    RangeBoundary,
+    RangeOperators,
+)
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction, IntegrityError
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Upper
+
+from events.managers import EventManager, NotificationLogManager
+
+
+OVERLAP_CONSTRAINT_NAME = "exclude_overlapping_events_at_location"
+CAPACITY_CONSTRAINT_NAME = "event_participants_within_capacity"
+
+# Results of the registrations made by EventManager
+REGISTERED = "registered"
+WAITLISTED = "waitlisted"
+REJECTED = "rejected"
+
+
+class TsTzRange(models.Func):
+    function = "TSTZRANGE"
+    output_field = DateTimeRangeField()
 
 
 class Event(models.Model):
@@ -22,9 +49,79 @@ class Event(models.Model):
         blank=True,
         related_name="participated_events",
     )
+    # No limit if not set
+    capacity = models.PositiveIntegerField(blank=True, null=True)
+    # Maintained with F() updates on participants changes (events.signals)
+    participant_count = models.PositiveIntegerField(default=0, editable=False)
+    # Also set on participants changes, validates conditional requests
+    updated_at = models.DateTimeField(auto_now=True)
+    # Claimed by send_event_reminders, cleared when the start time changes
+    reminder_sent_at = models.DateTimeField(
+        blank=True, null=True, editable=False
+    )
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector("title", weight="A", config="english")
+            + SearchVector("location", weight="B", config="english")
+            + SearchVector("description", weight="C", config="english")
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    objects = EventManager()
 
     class Meta:
         ordering = ["start_time"]
+        indexes = [
+            # Date windows and keyset pages
+            models.Index(
+                fields=["start_time", "id"],
+                name="event_start_time_id_idx",
+            ),
+            # Upcoming events still to be reminded of
+            models.Index(
+                fields=["start_time", "id"],
+                condition=Q(reminder_sent_at__isnull=True),
+                name="event_reminder_pending_idx",
+            ),
+            # Events of an organizer ordered by time
+            models.Index(
+                fields=["organizer", "start_time"],
+                name="event_organizer_start_idx",
+            ),
+            GinIndex(fields=["search_vector"], name="event_search_vector_idx"),
+            # Trigram indexes serving icontains, i.e. UPPER(field) LIKE '%x%'
+            GinIndex(
+                OpClass(Upper("title"), name="gin_trgm_ops"),
+                name="event_title_trgm_idx",
+            ),
+            GinIndex(
+                OpClass(Upper("location"), name="gin_trgm_ops"),
+                name="event_location_trgm_idx",
+            ),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=(
+                    Q(capacity__isnull=True)
+                    | Q(participant_count__lte=F("capacity"))
+                ),
+                name=CAPACITY_CONSTRAINT_NAME,
+            ),
+            # Backed by a GiST index (btree_gist), so overlap lookups are
+            # index seeks and concurrent inserts cannot double-book a venue
+            ExclusionConstraint(
+                name=OVERLAP_CONSTRAINT_NAME,
+                expressions=[
+                    ("location", RangeOperators.EQUAL),
+                    (
+                        TsTzRange("start_time", "end_time", RangeBoundary()),
+                        RangeOperators.OVERLAPS,
+                    ),
+                ],
+            ),
+        ]
 
     def __str__(self) -> str:
         return (
@@ -34,18 +131,89 @@ class Event(models.Model):
         )
 
     @staticmethod
-    def validate_time_and_location(
+    def count_participants() -> Coalesce:
+        """
+        Subquery counting participants of the outer event row.
+        """
+        participants = Event.participants.through.objects.filter(
+            event_id=OuterRef("pk")
+        )
+        return Coalesce(
+            Subquery(
+                participants.values("event_id")
+                .annotate(count=Count("pk"))
+                .values("count")
+            ),
+            0,
+        )
+
+    @staticmethod
+    def get_overlap_error_message(location: str) -> str:
+        return f"An event at '{location}' overlaps with this time period."
+
+    @staticmethod
+    def get_capacity_error_message() -> str:
+        return (
+            "Event capacity cannot be lower than "
+            "the number of registered participants."
+        )
+
+    @staticmethod
+    def get_registration_error_message(event: dict) -> str | None:
+        """
+        Checks the registration guards read by EventManager.
+        """
+        if event["is_organizer"]:
+            return "You are the organizer of this event."
+        if event["registered"]:
+            return "You are already registered for this event."
+        if event["on_waitlist"]:
+            return "You are already on the waitlist for this event."
+        if event["started"]:
+            return "You cannot register for the event that have already started or is finished"
+        return None
+
+    @staticmethod
+    def get_registration_result(event: dict) -> tuple[str, str]:
+        """
+        Result and message of the registration made by EventManager.
+        """
+        message = Event.get_registration_error_message(event)
+        if message is not None:
+            return REJECTED, message
+        if event["waitlisted"]:
+            return WAITLISTED, (
+                "The event is full, you are on the waitlist. "
+                "You will be registered once a seat is available."
+            )
+        if not event["inserted"]:
+            return REJECTED, "The event is full."
+        return REGISTERED, "Successfully registered for the event."
+
+    @staticmethod
+    def get_violated_constraint(error: IntegrityError) -> str | None:
+        diag = getattr(error.__cause__, "diag", None)
+        return getattr(diag, "constraint_name", None)
+
+    @staticmethod
+    def is_overlap_violation(error: IntegrityError) -> bool:
+        """
+        Checks if the integrity error was raised by the overlap constraint.
+        """
+        return (
+            Event.get_violated_constraint(error) == OVERLAP_CONSTRAINT_NAME
+        )
+
+    @staticmethod
+    def validate_time(
         start_time: datetime,
         end_time: datetime,
-        location: str,
         error_to_raise: type[Exception],
-        current_event_id: int = None,
     ) -> None:
         """
-        Validates time and location constraints:
+        Validates time constraints:
         - Start time must be before end time.
         - Start time must be in the future.
-        - No overlapping events at the same location.
         """
         if start_time >= end_time:
             raise error_to_raise(
@@ -54,21 +222,97 @@ class Event(models.Model):
         if start_time < django.utils.timezone.now():
             raise error_to_raise("Event starting time must be in the future.")
 
-        overlapping_events = Event.objects.filter(
+    @staticmethod
+    def find_overlapping(events: list[dict]) -> set[int]:
+        """
+        Returns indexes of events overlapping each other or existing events
+        at the same location. Sorts and sweeps each location, using one
+        range query per location instead of one query per event.
+        """
+        indexes_by_location = defaultdict(list)
+        for index, event in enumerate(events):
+            indexes_by_location[event["location"]].append(index)
+
+        overlapping = set()
+        for location, indexes in indexes_by_location.items():
+            window = (
+                min(events[index]["start_time"] for index in indexes),
+                max(events[index]["end_time"] for index in indexes),
+            )
+            existing_events = Event.objects.annotate(
+                time_range=TsTzRange("start_time", "end_time", RangeBoundary())
+            ).filter(
+                location=location,
+                time_range__overlap=window,
+            ).values_list("start_time", "end_time")
+
+            # Existing events are marked with None, only new ones are reported
+            intervals = sorted(
+                [
+                    (start_time, end_time, None)
+                    for start_time, end_time in existing_events
+                ]
+                + [
+                    (
+                        events[index]["start_time"],
+                        events[index]["end_time"],
+                        index,
+                    )
+                    for index in indexes
+                ],
+                key=lambda interval: interval[0],
+            )
+            latest_end, latest_index = None, None
+            for start_time, end_time, index in intervals:
+                if latest_end is not None and start_time < latest_end:
+                    overlapping.update(
+                        i for i in (index, latest_index) if i is not None
+                    )
+                if latest_end is None or end_time > latest_end:
+                    latest_end, latest_index = end_time, index
+        return overlapping
+
+    @staticmethod
+    def validate_time_and_location(
+        start_time: datetime,
+        end_time: datetime,
+        location: str,
+        error_to_raise: type[Exception],
+        current_event_id: int = None,
+    ) -> None:
+        """
+        Validates time and location constraints:
+        - Start time must be before end time.
+        - Start time must be in the future.
+        - No overlapping events at the same location.
+        """
+        Event.validate_time(
+            start_time=start_time,
+            end_time=end_time,
+            error_to_raise=error_to_raise,
+        )
+
+        # Same range expression as the exclusion constraint,
+        # so the lookup is served by its GiST index
+        overlapping_events = Event.objects.annotate(
+            time_range=TsTzRange("start_time", "end_time", RangeBoundary())
+        ).filter(
             location=location,
-            end_time__gt=start_time,
-            start_time__lt=end_time,
+            time_range__overlap=(start_time, end_time),
         )
         if current_event_id:
             overlapping_events = overlapping_events.exclude(
                 pk=current_event_id
             )
         if overlapping_events.exists():
-            raise error_to_raise(
-                f"An event at '{location}' overlaps with this time period."
-            )
+            raise error_to_raise(Event.get_overlap_error_message(location))
 
     def clean(self) -> None:
+        if (
+            self.capacity is not None
+            and self.capacity < self.participant_count
+        ):
+            raise ValidationError(Event.get_capacity_error_message())
         Event.validate_time_and_location(
             start_time=self.start_time,
             end_time=self.end_time,
@@ -78,5 +322,131 @@ class Event(models.Model):
         )
 
     def save(self, *args, **kwargs) -> None:
-        self.full_clean()
-        super().save(*args, **kwargs)
+        # Overlaps are already checked in clean() and enforced by the database
+        self.full_clean(validate_constraints=False)
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            # Never overwrite the counter or the reminder claimed
+            # meanwhile (see EventManager.claim_reminders) with possibly
+            # stale values, they are only saved when passed explicitly
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and not field.generated
+                and field.name not in ("participant_count", "reminder_sent_at")
+            ]
+        try:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+        except IntegrityError as error:
+            constraint = Event.get_violated_constraint(error)
+            if constraint == OVERLAP_CONSTRAINT_NAME:
+                message = Event.get_overlap_error_message(self.location)
+            elif constraint == CAPACITY_CONSTRAINT_NAME:
+                # Participants registered after the capacity was validated
+                message = Event.get_capacity_error_message()
+            else:
+                raise
+            raise ValidationError(message) from error
+
+
+class WaitlistEntry(models.Model):
+    event = models.ForeignKey(
+        to=Event,
+        on_delete=models.CASCADE,
+        related_name="waitlist",
+    )
+    user = models.ForeignKey(
+        to=settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="waitlisted_events",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        # First in, first out
+        ordering = ["id"]
+        verbose_name_plural = "waitlist entries"
+        indexes = [
+            models.Index(
+                fields=["event", "id"],
+                name="waitlist_event_id_idx",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["event", "user"],
+                name="unique_waitlist_event_user",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user} waiting for {self.event}"
+
+
+class OutboxNotification(models.Model):
+    """
+    Notification written in the transaction of the change it is about
+    and published to Celery by the dispatch_notifications command,
+    so it is sent if and only if the change is committed.
+    """
+
+    template = models.CharField(max_length=63)
+    event = models.ForeignKey(
+        to=Event,
+        on_delete=models.CASCADE,
+        related_name="outbox_notifications",
+    )
+    # Notifications without a user are sent to all the participants
+    user = models.ForeignKey(
+        to=settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="+",
+        blank=True,
+        null=True,
+    )
+    created_at = models.DateTimeField(default=django.utils.timezone.now)
+    # Held until then, so the later notifications of the same user
+    # and event are coalesced with it (see events.outbox)
+    available_at = models.DateTimeField(default=django.utils.timezone.now)
+
+    class Meta:
+        # Published in the order of the changes
+        ordering = ["id"]
+        indexes = [
+            models.Index(
+                fields=["available_at", "id"],
+                name="outbox_available_at_id_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.template} of {self.event} for {self.user or 'all'}"
+
+
+class NotificationLog(models.Model):
+    """
+    Notification of a user in the digest mode, sent with the others
+    of the day by one email (see events.tasks).
+    """
+
+    template = models.CharField(max_length=63)
+    event = models.ForeignKey(
+        to=Event,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    user = models.ForeignKey(
+        to=settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    created_at = models.DateTimeField(default=django.utils.timezone.now)
+
+    objects = NotificationLogManager()
+
+    class Meta:
+        ordering = ["id"]
+
+    def __str__(self) -> str:
+        return f"{self.template} of {self.event} for {self.user}"
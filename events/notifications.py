@@ -0,0 +1,277 @@
+from datetime import timedelta
+from functools import lru_cache
+from html.parser import HTMLParser
+from string import Formatter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMultiAlternatives
+from django.utils.html import escape
+
+import events.cache
+import events.mail
+import events.models
+from email_templates.event_cancel_registration_template import (
+    CANCEL_REGISTRATION_HTML_CONTENT,
+)
+from email_templates.event_digest_template import (
+    DIGEST_HTML_CONTENT,
+    DIGEST_NOTICE_HTML_CONTENT,
+)
+from email_templates.event_registration_template import (
+    REGISTRATION_HTML_CONTENT,
+)
+from email_templates.event_reminder_template import REMINDER_HTML_CONTENT
+from email_templates.event_update_template import UPDATE_HTML_CONTENT
+from email_templates.event_waitlist_promotion_template import (
+    WAITLIST_PROMOTION_HTML_CONTENT,
+)
+
+
+REGISTRATION = "registration"
+CANCEL_REGISTRATION = "cancel_registration"
+UPDATE = "update"
+WAITLIST_PROMOTION = "waitlist_promotion"
+REMINDER = "reminder"
+
+# Subject and HTML body of every notification
+TEMPLATES = {
+    REGISTRATION: (
+        "You are registered at {event}",
+        REGISTRATION_HTML_CONTENT,
+    ),
+    CANCEL_REGISTRATION: (
+        "You've canceled you registration at {event}",
+        CANCEL_REGISTRATION_HTML_CONTENT,
+    ),
+    UPDATE: (
+        "Event {event} was updated",
+        UPDATE_HTML_CONTENT,
+    ),
+    WAITLIST_PROMOTION: (
+        "You are registered at {event}",
+        WAITLIST_PROMOTION_HTML_CONTENT,
+    ),
+    REMINDER: (
+        "Reminder: {event} starts at {start_time}",
+        REMINDER_HTML_CONTENT,
+    ),
+}
+
+DIGEST_SUBJECT = "Your events of the day"
+# Line of the digest for every notification that may wait for it,
+# the others are sent immediately to all the users
+DIGEST_NOTICES = {
+    REGISTRATION: (
+        "You are registered at {event}: "
+        "{start_time} - {end_time}, {location}."
+    ),
+    CANCEL_REGISTRATION: "You've canceled your registration at {event}.",
+    UPDATE: "{event} was updated: {start_time} - {end_time}, {location}.",
+    WAITLIST_PROMOTION: (
+        "A seat was freed for you at {event}: "
+        "{start_time} - {end_time}, {location}."
+    ),
+}
+
+# Templates changing the registration of the user, coalesced
+# to the net change (see events.outbox)
+REGISTRATION_TEMPLATES = {
+    REGISTRATION,
+    CANCEL_REGISTRATION,
+    WAITLIST_PROMOTION,
+}
+# Templates leaving the user registered for the event
+REGISTERED_TEMPLATES = {REGISTRATION, WAITLIST_PROMOTION}
+
+EVENT_CONTEXT_KEY = "events:email:event:{event_id}:{generations}"
+DATETIME_FORMAT = "%d %b %Y %H:%M"
+
+# Tags starting a new line of the plain text
+BLOCK_TAGS = {"br", "div", "h1", "h2", "h3", "p", "tr"}
+
+
+class TextExtractor(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__()
+        self.lines = [""]
+        self.skipped_tag = None
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        if tag in ("head", "style"):
+            self.skipped_tag = tag
+        elif tag in BLOCK_TAGS:
+            self.lines.append("")
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == self.skipped_tag:
+            self.skipped_tag = None
+
+    def handle_data(self, data: str) -> None:
+        if self.skipped_tag is None:
+            self.lines[-1] += data
+
+    def get_text(self) -> str:
+        # Whitespace is collapsed as by browsers
+        lines = (" ".join(line.split()) for line in self.lines)
+        return "\n\n".join(line for line in lines if line)
+
+
+def get_coalesce_window() -> timedelta:
+    return timedelta(
+        seconds=getattr(settings, "EVENT_NOTIFICATION_COALESCE_SECONDS", 0)
+    )
+
+
+def html_to_text(html: str) -> str:
+    extractor = TextExtractor()
+    extractor.feed(html)
+    extractor.close()
+    return extractor.get_text()
+
+
+def compile_format(template: str) -> list[tuple[str, str | None]]:
+    """
+    Splits the format string into (literal text, field name) parts.
+    """
+    return [
+        (literal, field_name)
+        for literal, field_name, _, _ in Formatter().parse(template)
+    ]
+
+
+def render_format(
+    parts: list[tuple[str, str | None]],
+    context: dict,
+    escape_values: bool = False,
+) -> str:
+    rendered = []
+    for literal, field_name in parts:
+        rendered.append(literal)
+        if field_name is not None:
+            value = str(context[field_name])
+            rendered.append(escape(value) if escape_values else value)
+    return "".join(rendered)
+
+
+@lru_cache
+def get_template(key: str) -> dict[str, list]:
+    """
+    Compiles the template once per process. The plain text alternative
+    is extracted from the HTML here, so messages are only formatted.
+    """
+    subject, html = TEMPLATES[key]
+    return {
+        "subject": compile_format(subject),
+        "text": compile_format(html_to_text(html)),
+        "html": compile_format(html),
+    }
+
+
+@lru_cache
+def get_digest_template() -> dict:
+    return {
+        "text": compile_format(html_to_text(DIGEST_HTML_CONTENT)),
+        "html": compile_format(DIGEST_HTML_CONTENT),
+        "notice_html": compile_format(DIGEST_NOTICE_HTML_CONTENT),
+        "notices": {
+            key: compile_format(notice)
+            for key, notice in DIGEST_NOTICES.items()
+        },
+    }
+
+
+def get_event_context(event_id: int) -> dict | None:
+    """
+    Event fields of the messages, shared by all the recipients and
+    cached per event version: the event content and users generations
+    (see events.cache). Registrations do not change the version.
+    """
+    generations = events.cache.get_generations(
+        events.cache.EVENT_CONTENT_GENERATION_KEY.format(event_id=event_id),
+        events.cache.USERS_GENERATION_KEY,
+    )
+    key = EVENT_CONTEXT_KEY.format(
+        event_id=event_id,
+        generations="-".join(str(generation) for generation in generations),
+    )
+    context = cache.get(key)
+    if context is None:
+        event = (
+            events.models.Event.objects.select_related("organizer")
+            .only(
+                "title",
+                "start_time",
+                "end_time",
+                "location",
+                "organizer__email",
+            )
+            .filter(pk=event_id)
+            .first()
+        )
+        if event is None:
+            return None
+        context = {
+            "event": event.title,
+            "start_time": event.start_time.strftime(DATETIME_FORMAT),
+            "end_time": event.end_time.strftime(DATETIME_FORMAT),
+            "location": event.location,
+            "organizer_email": event.organizer.email,
+        }
+        cache.set(key, context, settings.EVENT_EMAIL_CONTEXT_CACHE_TIMEOUT)
+    return context
+
+
+def build_message(
+    template_key: str,
+    context: dict,
+    email: str,
+) -> EmailMultiAlternatives:
+    template = get_template(template_key)
+    return events.mail.build_message(
+        subject=render_format(template["subject"], context),
+        message=render_format(template["text"], context),
+        recipient_list=[email],
+        html_message=render_format(
+            template["html"], context, escape_values=True
+        ),
+    )
+
+
+def build_digest(
+    username: str,
+    email: str,
+    notices: list[tuple[str, dict]],
+) -> EmailMultiAlternatives:
+    """
+    Builds one message listing the (template key, event context)
+    notifications, a line each.
+    """
+    template = get_digest_template()
+    lines = [
+        render_format(template["notices"][key], context)
+        for key, context in notices
+    ]
+    return events.mail.build_message(
+        subject=DIGEST_SUBJECT,
+        message=render_format(
+            template["text"],
+            {"username": username, "notices": "\n\n".join(lines)},
+        ),
+        recipient_list=[email],
+        html_message=render_format(
+            template["html"],
+            {
+                "username": escape(username),
+                # The lines are escaped when rendered into paragraphs
+                "notices": "".join(
+                    render_format(
+                        template["notice_html"],
+                        {"notice": line},
+                        escape_values=True,
+                    )
+                    for line in lines
+                ),
+            },
+        ),
+    )
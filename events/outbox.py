@@ -0,0 +1,104 @@
+from collections import defaultdict
+
+import django.utils.timezone
+from django.db import transaction
+from django.db.models import Q
+
+import events.notifications
+import events.tasks
+from events.models import OutboxNotification
+
+
+def get_net_template(templates: list[str]) -> str | None:
+    """
+    Collapses the registration notifications of one user and event,
+    oldest first, to the latest one, unless the user ends up
+    registered or not as before them. The state before is the opposite
+    of the one left by the first notification.
+    """
+    if (templates[0] in events.notifications.REGISTERED_TEMPLATES) != (
+        templates[-1] in events.notifications.REGISTERED_TEMPLATES
+    ):
+        return None
+    return templates[-1]
+
+
+def dispatch_notifications(batch_size: int) -> int:
+    """
+    Publishes a batch of the outbox notifications held for their
+    coalesce window to Celery and deletes them in one transaction.
+    The pending notifications of the same user and event, or of the same
+    event for updates, are coalesced with them: only the net change of
+    the registration is sent, one update email per event and other
+    notifications once each.
+    The rows are locked with SELECT ... FOR UPDATE SKIP LOCKED, so
+    several dispatchers drain the outbox in parallel without publishing
+    a notification twice.
+    If publishing fails, the transaction is rolled back and the batch
+    is published again later, so notifications are sent at least once.
+    Notifications of a batch with the same template and event are
+    published as one task, registration changes to the transactional
+    queue and the others to the bulk one (see events_core.celery).
+    Returns the number of dispatched notifications.
+    """
+    with transaction.atomic():
+        keys = set(
+            OutboxNotification.objects.select_for_update(skip_locked=True)
+            .filter(available_at__lte=django.utils.timezone.now())
+            .order_by("available_at", "id")
+            .values_list("event_id", "user_id")[:batch_size]
+        )
+        if not keys:
+            return 0
+
+        condition = Q()
+        for event_id, user_id in keys:
+            condition |= Q(event_id=event_id, user_id=user_id)
+        notifications = list(
+            OutboxNotification.objects.select_for_update(skip_locked=True)
+            .filter(condition)
+            .order_by("id")
+            .values_list("id", "template", "event_id", "user_id")
+        )
+
+        templates = defaultdict(list)
+        for _, template, event_id, user_id in notifications:
+            templates[event_id, user_id].append(template)
+        user_ids, updated_event_ids = defaultdict(list), set()
+        for (event_id, user_id), key_templates in templates.items():
+            if user_id is None:
+                updated_event_ids.add(event_id)
+                continue
+            changes = [
+                template
+                for template in key_templates
+                if template in events.notifications.REGISTRATION_TEMPLATES
+            ]
+            # Other notifications, such as reminders, are sent once each
+            sent_templates = [
+                template
+                for template in dict.fromkeys(key_templates)
+                if template not in events.notifications.REGISTRATION_TEMPLATES
+            ]
+            if changes and (template := get_net_template(changes)):
+                sent_templates.append(template)
+            for template in sent_templates:
+                user_ids[template, event_id].append(user_id)
+
+        for (template, event_id), batch_user_ids in user_ids.items():
+            if template in events.notifications.REGISTRATION_TEMPLATES:
+                task = events.tasks.send_notification
+            else:
+                task = events.tasks.send_bulk_notification
+            task.delay(
+                template=template,
+                event_id=event_id,
+                user_ids=batch_user_ids,
+            )
+        for event_id in updated_event_ids:
+            events.tasks.notify_event_update.delay(event_id)
+
+        OutboxNotification.objects.filter(
+            pk__in=[notification[0] for notification in notifications]
+        ).delete()
+    return len(notifications)
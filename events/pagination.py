@@ -1,19 +1,340 @@
-from sys import stdout
+import base64
+import binascii
+import hashlib
+import json
 
+import django.utils.timezone
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator, Page, EmptyPage, PageNotAnInteger
+from django.db.models import Model, Q, QuerySet
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.request import Request
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+
+
+PAGE_MODE = "page"
+CURSOR_MODE = "cursor"
+
+
+EXACT_COUNT_MODE = "exact"
+ESTIMATED_COUNT_MODE = "estimated"
+
+UPCOMING_FIRST_FIELD = "is_upcoming"
+
+
+def get_upcoming_first_segments(
+    queryset: QuerySet,
+) -> list[tuple[int, QuerySet]] | None:
+    """
+    Splits a queryset ordered upcoming-first (see EventFilter.qs) into
+    the upcoming and past segments ordered by the rest of the ordering.
+    Unlike sorting by the is_upcoming expression, each segment can be
+    read in index order and only as far as the page needs.
+    """
+    ordering = list(queryset.query.order_by)
+    if not ordering or ordering[0] != UPCOMING_FIRST_FIELD:
+        return None
+    now = django.utils.timezone.now()
+    return [
+        (0, queryset.filter(start_time__gte=now).order_by(*ordering[1:])),
+        (1, queryset.filter(start_time__lt=now).order_by(*ordering[1:])),
+    ]
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that can avoid an exact COUNT(*) over the filtered queryset.
+    In the estimated count mode, broad queries are counted by the PostgreSQL
+    planner estimate and narrow ones by an exact count cached per
+    filter signature for a short time.
+    """
+
+    count_is_exact = True
+
+    @cached_property
+    def count(self) -> int:
+        if (
+            getattr(settings, "EVENT_COUNT_MODE", EXACT_COUNT_MODE)
+            != ESTIMATED_COUNT_MODE
+        ):
+            return super().count
+
+        # Ordering and annotations do not change the count
+        queryset = self.object_list.values("pk").order_by()
+        self.count_is_exact = False
+
+        estimate = self.get_planner_estimate(queryset)
+        if estimate >= getattr(
+            settings, "EVENT_COUNT_ESTIMATE_THRESHOLD", 10000
+        ):
+            return estimate
+
+        sql, params = queryset.query.sql_with_params()
+        cache_key = "events:count:" + hashlib.md5(
+            repr((sql, params)).encode()
+        ).hexdigest()
+        count = cache.get(cache_key)
+        if count is None:
+            count = queryset.count()
+            self.count_is_exact = True
+            cache.set(
+                cache_key,
+                count,
+                getattr(settings, "EVENT_COUNT_CACHE_TIMEOUT", 30),
+            )
+        return count
+
+    @staticmethod
+    def get_planner_estimate(queryset: QuerySet) -> int:
+        plan = json.loads(queryset.explain(format="json"))
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    def validate_number(self, number: int | str) -> int:
+        if self.count_is_exact:
+            return super().validate_number(number)
+        # The estimate may be too low, so pages past it are still served
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages["invalid_page"])
+        if number < 1:
+            raise EmptyPage(self.error_messages["min_page"])
+        return number
+
+    def page(self, number: int | str) -> Page:
+        # Count first, as it decides how the page number is validated
+        self.count
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        if self.count_is_exact and top + self.orphans >= self.count:
+            top = self.count
+        return self._get_page(self.get_slice(bottom, top), number, self)
+
+    def get_slice(self, bottom: int, top: int) -> list | QuerySet:
+        segments = get_upcoming_first_segments(self.object_list)
+        if segments is None:
+            return self.object_list[bottom:top]
+
+        (_, upcoming), (_, past) = segments
+        results = list(upcoming[bottom:top])
+        if len(results) == top - bottom:
+            return results
+        # The page reaches the past events
+        if results or not bottom:
+            upcoming_count = bottom + len(results)
+        else:
+            upcoming_count = upcoming.count()
+        return results + list(
+            past[max(bottom - upcoming_count, 0):top - upcoming_count]
+        )
 
 
 class EventPaginator(PageNumberPagination):
+    django_paginator_class = EstimatedCountPaginator
     page_size = 5
     page_size_query_param = "per_page"
     max_page_size = 10
+    pagination_mode_query_param = "pagination"
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_pagination_mode(self, request: Request) -> str:
+        mode = request.query_params.get(
+            self.pagination_mode_query_param,
+            getattr(settings, "EVENT_PAGINATION_MODE", PAGE_MODE),
+        )
+        return mode if mode in (PAGE_MODE, CURSOR_MODE) else PAGE_MODE
+
+    def paginate_queryset(
+        self,
+        queryset: QuerySet,
+        request: Request,
+        view=None,
+    ) -> list | None:
+        self.mode = self.get_pagination_mode(request)
+        if self.mode == CURSOR_MODE:
+            return self.paginate_queryset_by_cursor(queryset, request)
+        return super().paginate_queryset(queryset, request, view=view)
+
+    def paginate_queryset_by_cursor(
+        self,
+        queryset: QuerySet,
+        request: Request,
+    ) -> list | None:
+        """
+        Keyset pagination over the queryset ordering with the primary key
+        as a tie-breaker. Pages are fetched with an index-friendly
+        WHERE clause instead of OFFSET, and the table is never counted.
+        """
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        self.request = request
+        self.ordering = self.get_keyset_ordering(queryset)
+        position, reverse = self.decode_cursor(request)
+
+        segments = get_upcoming_first_segments(queryset)
+        if segments is None:
+            segments, ordering = [(None, queryset)], self.ordering
+            segment_position = position
+        else:
+            ordering = self.ordering[1:]
+            segment_position = None
+            if position is not None:
+                if position[0] not in (0, 1):
+                    raise NotFound(self.invalid_cursor_message)
+                # Continue within the segment of the position
+                segments = [
+                    (value, segment)
+                    for value, segment in segments
+                    if (value <= position[0] if reverse
+                        else value >= position[0])
+                ]
+                segment_position = position[1:]
+        if reverse:
+            segments.reverse()
+
+        results = []
+        for index, (value, segment) in enumerate(segments):
+            if reverse:
+                segment = segment.order_by(
+                    *(self.invert_ordering(field) for field in ordering)
+                )
+            else:
+                segment = segment.order_by(*ordering)
+            if index == 0 and segment_position is not None:
+                segment = segment.filter(
+                    self.get_keyset_filter(ordering, segment_position, reverse)
+                )
+            rows = list(segment[:page_size + 1 - len(results)])
+            if value is not None:
+                for row in rows:
+                    setattr(row, UPCOMING_FIRST_FIELD, value)
+            results.extend(rows)
+            if len(results) > page_size:
+                break
+
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        if reverse:
+            results.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.next_position = (
+            self.get_position(results[-1])
+            if results and self.has_next
+            else None
+        )
+        self.previous_position = (
+            self.get_position(results[0])
+            if results and self.has_previous
+            else None
+        )
+        return results
+
+    @staticmethod
+    def get_keyset_ordering(queryset: QuerySet) -> list[str]:
+        ordering = list(
+            queryset.query.order_by or queryset.model._meta.ordering
+        )
+        if not {"pk", "id"} & {field.lstrip("-") for field in ordering}:
+            ordering.append("id")
+        return ordering
+
+    @staticmethod
+    def invert_ordering(field: str) -> str:
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+    @staticmethod
+    def get_keyset_filter(
+        ordering: list[str],
+        position: list,
+        reverse: bool,
+    ) -> Q:
+        """
+        Builds the row-comparison condition selecting rows after
+        the position, e.g. (a > x) OR (a = x AND b > y) for ascending fields.
+        """
+        keyset_filter = Q()
+        equal_filter = Q()
+        for field, value in zip(ordering, position):
+            name = field.lstrip("-")
+            descending = field.startswith("-") != reverse
+            lookup = "lt" if descending else "gt"
+            keyset_filter |= equal_filter & Q(**{f"{name}__{lookup}": value})
+            equal_filter &= Q(**{name: value})
+        return keyset_filter
+
+    def get_position(self, instance: Model) -> list:
+        return [
+            getattr(instance, field.lstrip("-")) for field in self.ordering
+        ]
+
+    def encode_cursor(self, position: list, reverse: bool) -> str:
+        # Datetimes keep full precision, e.g. "2025-01-20 09:00:00+00:00"
+        payload = json.dumps({"p": position, "r": int(reverse)}, default=str)
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, request: Request) -> tuple[list | None, bool]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            position, reverse = payload["p"], bool(payload["r"])
+        except (TypeError, ValueError, KeyError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(
+            self.ordering
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def get_cursor_link(
+        self,
+        position: list | None,
+        reverse: bool,
+    ) -> str | None:
+        if position is None:
+            return None
+        url = remove_query_param(
+            self.request.build_absolute_uri(),
+            self.page_query_param,
+        )
+        return replace_query_param(
+            url,
+            self.cursor_query_param,
+            self.encode_cursor(position, reverse),
+        )
 
     def get_paginated_response(self, data: dict) -> Response:
+        if self.mode == CURSOR_MODE:
+            return Response(
+                {
+                    "next": self.get_cursor_link(
+                        self.next_position, reverse=False
+                    ),
+                    "previous": self.get_cursor_link(
+                        self.previous_position, reverse=True
+                    ),
+                    "results": data,
+                }
+            )
         return Response(
             {
                 "pages": self.page.paginator.num_pages,
                 "count": self.page.paginator.count,
+                "count_is_exact": self.page.paginator.count_is_exact,
                 "next": self.get_next_link(),
                 "previous": self.get_previous_link(),
                 "results": data,
@@ -32,6 +353,10 @@ class EventPaginator(PageNumberPagination):
                     "type": "integer",
                     "example": 18,
                 },
+                "count_is_exact": {
+                    "type": "boolean",
+                    "example": True,
+                },
                 "next": {
                     "type": "string",
                     "nullable": True,
@@ -51,3 +376,29 @@ class EventPaginator(PageNumberPagination):
                 "results": schema
             },
         }
+
+    def get_schema_operation_parameters(self, view) -> list[dict]:
+        return super().get_schema_operation_parameters(view) + [
+            {
+                "name": self.pagination_mode_query_param,
+                "required": False,
+                "in": "query",
+                "description": (
+                    "Pagination mode: 'page' (default) or 'cursor'. "
+                    "Cursor pages do not include 'pages' and 'count'."
+                ),
+                "schema": {
+                    "type": "string",
+                    "enum": [PAGE_MODE, CURSOR_MODE],
+                },
+            },
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {
+                    "type": "string",
+                },
+            },
+        ]
@@ -12,10 +12,13 @@ from events.schemas.examples.events import (
     list_example_json,
     create_update_request_example_json,
     create_update_response_example_json,
+    bulk_create_request_example_json,
+    bulk_create_response_example_json,
     unauthorised_401_no_token,
     unauthorised_401_invalid_token,
     bad_request_400_empty_fields,
     bad_request_400_overlapping_event,
+    bad_request_400_bulk_overlapping_events,
     bad_request_400_event_in_the_past,
     bad_request_400_end_time_before_start_time,
     detail_example_json,
@@ -24,6 +27,16 @@ from events.schemas.examples.events import (
     forbidden_403,
     ok_200_registered,
     bad_request_400_already_registered,
+    bad_request_400_event_full,
+    bad_request_400_already_on_waitlist,
+    accepted_202_waitlisted,
+    accepted_202_registration_buffered,
+    ok_200_registration_status,
+    not_found_404_no_registration_request,
+    ok_200_left_waitlist,
+    bad_request_400_holds_not_available,
+    bad_request_400_no_seat_held,
+    ok_200_seat_held,
     bad_request_400_organizer_registering,
     ok_200_cancel_registration,
     bad_request_400_not_registered,
@@ -34,6 +47,7 @@ from events.serializers import (
     EventListSerializer,
     EventCreateUpdateSerializer,
     EventRetrieveSerializer,
+    EventBulkCreateSerializer,
 )
 
 
@@ -165,6 +179,48 @@ event_schema = extend_schema_view(
                 ),
                 required=False,
             ),
+            OpenApiParameter(
+                name="starts_after",
+                type=OpenApiTypes.DATETIME,
+                location=OpenApiParameter.QUERY,
+                description=(
+                    "Filter events starting at or after the time. "
+                    "Example: '?starts_after=2024-12-15T08:00:00Z'"
+                ),
+                required=False,
+            ),
+            OpenApiParameter(
+                name="starts_before",
+                type=OpenApiTypes.DATETIME,
+                location=OpenApiParameter.QUERY,
+                description=(
+                    "Filter events starting before the time. "
+                    "Example: '?starts_before=2024-12-31T00:00:00Z'"
+                ),
+                required=False,
+            ),
+            OpenApiParameter(
+                name="ends_before",
+                type=OpenApiTypes.DATETIME,
+                location=OpenApiParameter.QUERY,
+                description=(
+                    "Filter events ending before the time. "
+                    "Example: '?ends_before=2024-12-31T00:00:00Z'"
+                ),
+                required=False,
+            ),
+            OpenApiParameter(
+                name="search",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description=(
+                    "Full-text search in title, location and description. "
+                    "Matches word prefixes, results are ranked by relevance "
+                    "unless ordering is given. "
+                    "Example: '?search=product launch'"
+                ),
+                required=False,
+            ),
             OpenApiParameter(
                 name="participating",
                 type=OpenApiTypes.BOOL,
@@ -218,6 +274,40 @@ event_schema = extend_schema_view(
             status.HTTP_401_UNAUTHORIZED: UNAUTHORISED_OPEN_API_RESPONSE,
         },
     ),
+    bulk_create=extend_schema(
+        description=(
+            "Create many events in one transaction. "
+            "Errors are reported per event, in the request order"
+        ),
+        request=EventBulkCreateSerializer(many=True),
+        examples=[
+            OpenApiExample(
+                name="Events bulk request example",
+                value=bulk_create_request_example_json,
+                request_only=True,
+            ),
+            OpenApiExample(
+                name="Events bulk response example",
+                value=bulk_create_response_example_json,
+                response_only=True,
+            ),
+        ],
+        responses={
+            status.HTTP_201_CREATED: EventBulkCreateSerializer(many=True),
+            status.HTTP_400_BAD_REQUEST: OpenApiResponse(
+                description="Bad request, invalid data",
+                response=OpenApiTypes.OBJECT,
+                examples=[
+                    OpenApiExample(
+                        name="Overlapping events example",
+                        value=bad_request_400_bulk_overlapping_events,
+                        response_only=True,
+                    ),
+                ],
+            ),
+            status.HTTP_401_UNAUTHORIZED: UNAUTHORISED_OPEN_API_RESPONSE,
+        },
+    ),
     retrieve=extend_schema(
         description="Retrieve detail event information",
         examples=[
@@ -304,6 +394,110 @@ event_schema = extend_schema_view(
                     )
                 ],
             ),
+            status.HTTP_202_ACCEPTED: OpenApiResponse(
+                description=(
+                    "The event is full, put on the waitlist, or the request "
+                    "is accepted (EVENT_REGISTRATION_MODE = 'buffered')"
+                ),
+                response=OpenApiTypes.OBJECT,
+                examples=[
+                    OpenApiExample(
+                        name="Put on the waitlist example",
+                        value=accepted_202_waitlisted,
+                        response_only=True,
+                    ),
+                    OpenApiExample(
+                        name="Request accepted in the buffered mode example",
+                        value=accepted_202_registration_buffered,
+                        response_only=True,
+                    ),
+                ],
+            ),
+            status.HTTP_400_BAD_REQUEST: OpenApiResponse(
+                description="Bad request, invalid data",
+                response=OpenApiTypes.OBJECT,
+                examples=[
+                    OpenApiExample(
+                        name="Already registered example",
+                        value=bad_request_400_already_registered,
+                        response_only=True,
+                    ),
+                    OpenApiExample(
+                        name="Already on the waitlist example",
+                        value=bad_request_400_already_on_waitlist,
+                        response_only=True,
+                    ),
+                    OpenApiExample(
+                        name="Organizer registering example",
+                        value=bad_request_400_organizer_registering,
+                        response_only=True,
+                    ),
+                    OpenApiExample(
+                        name="Event started or is in the past example",
+                        value=bad_request_400_event_started_or_in_the_past,
+                        response_only=True,
+                    ),
+                    OpenApiExample(
+                        name="Event is full example",
+                        value=bad_request_400_event_full,
+                        response_only=True,
+                    ),
+                ],
+            ),
+            status.HTTP_401_UNAUTHORIZED: UNAUTHORISED_OPEN_API_RESPONSE,
+            status.HTTP_404_NOT_FOUND: NOT_FOUND_OPEN_API_RESPONSE,
+        },
+    ),
+    registration_status=extend_schema(
+        description=(
+            "Status of the registration request accepted "
+            "in the buffered registration mode: "
+            "pending, registered, waitlisted or rejected"
+        ),
+        responses={
+            status.HTTP_200_OK: OpenApiResponse(
+                description="Status of the request",
+                response=OpenApiTypes.OBJECT,
+                examples=[
+                    OpenApiExample(
+                        name="Registration status example",
+                        value=ok_200_registration_status,
+                        response_only=True,
+                    )
+                ],
+            ),
+            status.HTTP_401_UNAUTHORIZED: UNAUTHORISED_OPEN_API_RESPONSE,
+            status.HTTP_404_NOT_FOUND: OpenApiResponse(
+                description="No registration request",
+                response=OpenApiTypes.OBJECT,
+                examples=[
+                    OpenApiExample(
+                        name="No registration request example",
+                        value=not_found_404_no_registration_request,
+                        response_only=True,
+                    )
+                ],
+            ),
+        },
+    ),
+    hold=extend_schema(
+        description=(
+            "Hold a seat at the event for a few minutes "
+            "(EVENT_SEAT_HOLD_MINUTES), confirm to register"
+        ),
+        request=None,
+        responses={
+            status.HTTP_200_OK: OpenApiResponse(
+                description="Seat held",
+                response=OpenApiTypes.OBJECT,
+                examples=[
+                    OpenApiExample(
+                        name="Seat held example",
+                        value=ok_200_seat_held,
+                        response_only=True,
+                    )
+                ],
+            ),
             status.HTTP_400_BAD_REQUEST: OpenApiResponse(
                 description="Bad request, invalid data",
                 response=OpenApiTypes.OBJECT,
@@ -313,6 +507,11 @@ event_schema = extend_schema_view(
                         value=bad_request_400_already_registered,
                         response_only=True,
                     ),
+                    OpenApiExample(
+                        name="Already on the waitlist example",
+                        value=bad_request_400_already_on_waitlist,
+                        response_only=True,
+                    ),
                     OpenApiExample(
                         name="Organizer registering example",
                         value=bad_request_400_organizer_registering,
@@ -323,6 +522,61 @@ event_schema = extend_schema_view(
                         value=bad_request_400_event_started_or_in_the_past,
                         response_only=True,
                     ),
+                    OpenApiExample(
+                        name="Event is full example",
+                        value=bad_request_400_event_full,
+                        response_only=True,
+                    ),
+                    OpenApiExample(
+                        name="Holds not available example",
+                        value=bad_request_400_holds_not_available,
+                        response_only=True,
+                    ),
+                ],
+            ),
+            status.HTTP_401_UNAUTHORIZED: UNAUTHORISED_OPEN_API_RESPONSE,
+            status.HTTP_404_NOT_FOUND: NOT_FOUND_OPEN_API_RESPONSE,
+        },
+    ),
+    confirm=extend_schema(
+        description="Register for the event at the seat held by the user",
+        request=None,
+        responses={
+            status.HTTP_200_OK: OpenApiResponse(
+                description="Successful register",
+                response=OpenApiTypes.OBJECT,
+                examples=[
+                    OpenApiExample(
+                        name="Successful register example",
+                        value=ok_200_registered,
+                        response_only=True,
+                    )
+                ],
+            ),
+            status.HTTP_400_BAD_REQUEST: OpenApiResponse(
+                description="Bad request, invalid data",
+                response=OpenApiTypes.OBJECT,
+                examples=[
+                    OpenApiExample(
+                        name="No seat held example",
+                        value=bad_request_400_no_seat_held,
+                        response_only=True,
+                    ),
+                    OpenApiExample(
+                        name="Already registered example",
+                        value=bad_request_400_already_registered,
+                        response_only=True,
+                    ),
+                    OpenApiExample(
+                        name="Event started or is in the past example",
+                        value=bad_request_400_event_started_or_in_the_past,
+                        response_only=True,
+                    ),
+                    OpenApiExample(
+                        name="Holds not available example",
+                        value=bad_request_400_holds_not_available,
+                        response_only=True,
+                    ),
                 ],
             ),
             status.HTTP_401_UNAUTHORIZED: UNAUTHORISED_OPEN_API_RESPONSE,
@@ -341,7 +595,12 @@ event_schema = extend_schema_view(
                         name="Successful cancel example",
                         value=ok_200_cancel_registration,
                         response_only=True,
-                    )
+                    ),
+                    OpenApiExample(
+                        name="Left the waitlist example",
+                        value=ok_200_left_waitlist,
+                        response_only=True,
+                    ),
                 ],
             ),
             status.HTTP_400_BAD_REQUEST: OpenApiResponse(
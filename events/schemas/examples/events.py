@@ -6,6 +6,7 @@ list_example_json = [
         "start_time": "13 Dec 2024 08:00",
         "end_time": "13 Dec 2024 10:00",
         "location": "Headquarters",
+        "capacity": None,
         "organizer": "Digital_Dragon (digital.dragon@test.com)",
         "participants": 5,
     },
@@ -16,6 +17,7 @@ list_example_json = [
         "start_time": "13 Dec 2024 12:00",
         "end_time": "13 Dec 2024 14:00",
         "location": "Room 301",
+        "capacity": None,
         "organizer": "John_Doe (john.doe@test.com)",
         "participants": 7,
     },
@@ -26,6 +28,7 @@ list_example_json = [
         "start_time": "15 Dec 2024 08:00",
         "end_time": "15 Dec 2024 10:00",
         "location": "Lab 5",
+        "capacity": None,
         "organizer": "John_Doe (john.doe@test.com)",
         "participants": 5,
     },
@@ -36,6 +39,7 @@ list_example_json = [
         "start_time": "22 Dec 2024 13:00",
         "end_time": "22 Dec 2024 14:30",
         "location": "Client Office",
+        "capacity": None,
         "organizer": "SkyWalker89 (sky.walker@test.com)",
         "participants": 0,
     },
@@ -46,6 +50,7 @@ list_example_json = [
         "start_time": "20 Jan 2025 09:00",
         "end_time": "20 Jan 2025 10:30",
         "location": "Online",
+        "capacity": None,
         "organizer": "John_Doe (john.doe@test.com)",
         "participants": 5,
     },
@@ -58,6 +63,7 @@ detail_example_json = {
     "start_time": "13 Dec 2024 08:00",
     "end_time": "13 Dec 2024 10:00",
     "location": "Headquarters",
+    "capacity": None,
     "organizer": "Digital_Dragon (digital.dragon@test.com)",
     "participants": [
         "John_Doe (john.doe@test.com)",
@@ -74,6 +80,7 @@ create_update_request_example_json = {
     "start_time": "2025-03-30T14:00:00",
     "end_time": "2025-03-30T17:00:00",
     "location": "Main Auditorium",
+    "capacity": 200,
 }
 
 create_update_response_example_json = {
@@ -83,10 +90,51 @@ create_update_response_example_json = {
     "start_time": "2025-03-30T14:00:00Z",
     "end_time": "2025-03-30T17:00:00Z",
     "location": "Main Auditorium",
+    "capacity": 200,
     "organizer": "SkyWalker89 (sky.walker@test.com)",
     "participants": 0,
 }
 
+bulk_create_request_example_json = [
+    {
+        "title": "Product Launch",
+        "description": "Official launch event for the company's new product.",
+        "start_time": "2025-03-30T14:00:00",
+        "end_time": "2025-03-30T17:00:00",
+        "location": "Main Auditorium",
+    },
+    {
+        "title": "Product Launch Afterparty",
+        "description": "Celebration of the new product launch.",
+        "start_time": "2025-03-30T18:00:00",
+        "end_time": "2025-03-30T22:00:00",
+        "location": "Main Auditorium",
+    },
+]
+
+bulk_create_response_example_json = [
+    {
+        "id": 13,
+        "title": "Product Launch",
+        "description": "Official launch event for the company's new product.",
+        "start_time": "2025-03-30T14:00:00Z",
+        "end_time": "2025-03-30T17:00:00Z",
+        "location": "Main Auditorium",
+        "capacity": None,
+        "organizer": "SkyWalker89 (sky.walker@test.com)",
+    },
+    {
+        "id": 14,
+        "title": "Product Launch Afterparty",
+        "description": "Celebration of the new product launch.",
+        "start_time": "2025-03-30T18:00:00Z",
+        "end_time": "2025-03-30T22:00:00Z",
+        "location": "Main Auditorium",
+        "capacity": None,
+        "organizer": "SkyWalker89 (sky.walker@test.com)",
+    },
+]
+
 unauthorised_401_no_token = {
     "detail": "Authentication credentials were not provided."
 }
@@ -116,6 +164,15 @@ bad_request_400_overlapping_event = {
     ]
 }
 
+bad_request_400_bulk_overlapping_events = [
+    {},
+    {
+        "non_field_errors": [
+            "An event at 'Main Auditorium' overlaps with this time period."
+        ]
+    },
+]
+
 bad_request_400_event_in_the_past = {
     "non_field_errors": ["Event starting time must be in the future."]
 }
@@ -150,12 +207,56 @@ bad_request_400_unregister_event_started_or_in_the_past = {
     "detail": "You cannot unregister from the event that have already started or is finished"
 }
 
+bad_request_400_event_full = {"detail": "The event is full."}
+
+bad_request_400_already_on_waitlist = {
+    "detail": "You are already on the waitlist for this event."
+}
+
+bad_request_400_holds_not_available = {
+    "detail": "Seat holds are not available."
+}
+
+bad_request_400_no_seat_held = {
+    "detail": "You have no seat held for this event."
+}
+
+ok_200_seat_held = {
+    "detail": "Seat held, confirm to register for the event.",
+    "expires_at": "2025-01-20T09:10:00Z",
+}
+
+accepted_202_registration_buffered = {
+    "detail": "Registration request accepted.",
+    "status_url": (
+        "http://localhost:8000/api/v1/events/7/registration-status/"
+    ),
+}
+
+ok_200_registration_status = {
+    "status": "registered",
+    "detail": "Successfully registered for the event.",
+}
+
+not_found_404_no_registration_request = {
+    "detail": "No registration request for this event."
+}
+
+accepted_202_waitlisted = {
+    "detail": "The event is full, you are on the waitlist. "
+    "You will be registered once a seat is available."
+}
+
 ok_200_registered = {"detail": "Successfully registered for the event."}
 
 ok_200_cancel_registration = {
     "detail": "Successfully unregistered from the event."
 }
 
+ok_200_left_waitlist = {
+    "detail": "Successfully left the waitlist of the event."
+}
+
 not_found_404 = {"detail": "No Event matches the given query."}
 
 forbidden_403 = {
@@ -1,14 +1,20 @@
 import django.utils.timezone
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction, IntegrityError
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
+import events.cache
 from events.models import Event
 
 
+BULK_CREATE_MAX_EVENTS = 500
+
+
 class EventSerializer(serializers.ModelSerializer):
     organizer = serializers.SerializerMethodField(read_only=True)
     participants = serializers.IntegerField(
-        source="participants.count",
+        source="participant_count",
         read_only=True,
     )
     class Meta:
@@ -20,6 +26,7 @@ class EventSerializer(serializers.ModelSerializer):
             "start_time",
             "end_time",
             "location",
+            "capacity",
             "organizer",
             "participants",
         )
@@ -82,4 +89,93 @@ class EventCreateUpdateSerializer(EventSerializer):
             error_to_raise=ValidationError,
             current_event_id=self.instance.pk if self.instance else None,
         )
+
+        capacity = attrs.get("capacity")
+        if (
+            self.instance
+            and capacity is not None
+            and capacity < self.instance.participant_count
+        ):
+            raise ValidationError(Event.get_capacity_error_message())
+        return data
+
+    def create(self, validated_data: dict) -> Event:
+        try:
+            return super().create(validated_data)
+        except DjangoValidationError as error:
+            # Overlap caught by the exclusion constraint on a concurrent insert
+            raise ValidationError(error.messages)
+
+    def update(self, instance: Event, validated_data: dict) -> Event:
+        try:
+            return super().update(instance, validated_data)
+        except DjangoValidationError as error:
+            raise ValidationError(error.messages)
+
+
+class EventBulkCreateListSerializer(serializers.ListSerializer):
+    def to_internal_value(self, data: list) -> list[dict]:
+        validated_data = super().to_internal_value(data)
+
+        # Check overlaps inside the batch and against existing events
+        overlapping = Event.find_overlapping(validated_data)
+        if overlapping:
+            raise ValidationError(
+                [
+                    {
+                        "non_field_errors": [
+                            Event.get_overlap_error_message(attrs["location"])
+                        ]
+                    }
+                    if index in overlapping
+                    else {}
+                    for index, attrs in enumerate(validated_data)
+                ]
+            )
+        return validated_data
+
+    def create(self, validated_data: list[dict]) -> list[Event]:
+        try:
+            with transaction.atomic():
+                # bulk_create() sends no post_save signals
+                transaction.on_commit(events.cache.invalidate_event_list)
+                return Event.objects.bulk_create(
+                    [Event(**attrs) for attrs in validated_data]
+                )
+        except IntegrityError as error:
+            if not Event.is_overlap_violation(error):
+                raise
+            # Overlap caught by the exclusion constraint on a concurrent insert
+            raise ValidationError(
+                "Some events overlap with events created in the meantime."
+            )
+
+
+class EventBulkCreateSerializer(EventSerializer):
+    class Meta(EventSerializer.Meta):
+        fields = (
+            "id",
+            "title",
+            "description",
+            "start_time",
+            "end_time",
+            "location",
+            "capacity",
+            "organizer",
+        )
+        read_only_fields = (
+            "id",
+            "organizer",
+        )
+        list_serializer_class = EventBulkCreateListSerializer
+
+    def validate(self, attrs: dict) -> dict:
+        data = super().validate(attrs=attrs)
+
+        # Overlaps are checked for the whole batch by the list serializer
+        Event.validate_time(
+            start_time=attrs["start_time"],
+            end_time=attrs["end_time"],
+            error_to_raise=ValidationError,
+        )
         return data
@@ -0,0 +1,132 @@
+import django.utils.timezone
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_save,
+)
+from django.dispatch import receiver
+
+import events.cache
+from events.models import Event
+
+
+@receiver(m2m_changed, sender=Event.participants.through)
+def update_participant_count(
+    sender,
+    instance,
+    action: str,
+    reverse: bool,
+    pk_set: set | None,
+    **kwargs,
+) -> None:
+    """
+    Keeps Event.participant_count in the same transaction as the participants
+    change. Django reports only really added rows, so additions are
+    applied with F() updates. Removed ids may include non-participants,
+    so affected events are recounted instead.
+    """
+    now = django.utils.timezone.now()
+    if action == "post_add" and pk_set:
+        if reverse:
+            Event.objects.filter(pk__in=pk_set).update(
+                participant_count=F("participant_count") + 1,
+                updated_at=now,
+            )
+        else:
+            Event.objects.filter(pk=instance.pk).update(
+                participant_count=F("participant_count") + len(pk_set),
+                updated_at=now,
+            )
+    elif action == "post_remove" and pk_set:
+        events = (
+            Event.objects.filter(pk__in=pk_set)
+            if reverse
+            else Event.objects.filter(pk=instance.pk)
+        )
+        events.update(
+            participant_count=Event.count_participants(),
+            updated_at=now,
+        )
+    elif action == "pre_clear" and reverse:
+        # Participated events are unknown once cleared
+        instance._cleared_event_ids = list(
+            instance.participated_events.values_list("pk", flat=True)
+        )
+    elif action == "post_clear":
+        if reverse:
+            Event.objects.filter(
+                pk__in=getattr(instance, "_cleared_event_ids", [])
+            ).update(
+                participant_count=Event.count_participants(),
+                updated_at=now,
+            )
+        else:
+            Event.objects.filter(pk=instance.pk).update(
+                participant_count=0,
+                updated_at=now,
+            )
+
+
+@receiver(m2m_changed, sender=Event.participants.through)
+def invalidate_participants_cache(
+    sender,
+    instance,
+    action: str,
+    reverse: bool,
+    pk_set: set | None,
+    **kwargs,
+) -> None:
+    """
+    Invalidates cached responses of events with changed participants.
+    """
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        event_ids = [instance.pk]
+    elif action == "post_clear":
+        event_ids = getattr(instance, "_cleared_event_ids", [])
+    else:
+        event_ids = pk_set or []
+    for event_id in event_ids:
+        transaction.on_commit(
+            lambda event_id=event_id: events.cache.invalidate_event(event_id)
+        )
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_event_cache(sender, instance: Event, **kwargs) -> None:
+    """
+    Invalidates cached responses and email fragments of the saved
+    or deleted event. Generations are bumped after commit, so data built
+    from the old state cannot be cached under the new generation.
+    """
+    event_id = instance.pk
+    transaction.on_commit(lambda: events.cache.invalidate_event(event_id))
+    transaction.on_commit(
+        lambda: events.cache.invalidate_event_content(event_id)
+    )
+
+
+@receiver(pre_save, sender=get_user_model())
+def invalidate_users_cache(sender, instance, update_fields, **kwargs) -> None:
+    """
+    Invalidates cached event responses on username or email changes.
+    """
+    if instance._state.adding:
+        return
+    if update_fields is not None and not {"username", "email"} & set(
+        update_fields
+    ):
+        return
+    previous = (
+        sender.objects.filter(pk=instance.pk)
+        .values("username", "email")
+        .first()
+    )
+    if previous != {"username": instance.username, "email": instance.email}:
+        transaction.on_commit(events.cache.invalidate_users)
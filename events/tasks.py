@@ -1,15 +1,362 @@
-from celery import shared_task
+from datetime import timedelta
+from itertools import islice
+
+import django.utils.timezone
+from celery import group, shared_task
+from celery.utils.time import get_exponential_backoff_interval
 from django.conf import settings
-from django.core.mail import send_mail
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
+
+import events.buffer
+import events.cache
+import events.holds
+import events.mail
+import events.notifications
+from events.models import Event, NotificationLog, REJECTED, WAITLISTED
+from users.models import NotificationMode
+
+
+# Email tasks are retried with exponential backoff while the SMTP server
+# is unreachable, for the messages not sent yet only. Messages refused
+# by it are not retried. They are acknowledged once received, as running
+# them again after a lost worker would send their messages twice.
+EMAIL_RETRY_OPTIONS = {"bind": True, "max_retries": 5}
+EMAIL_RETRY_BACKOFF_MAX = 10 * 60
+
+# Tasks safe to run again are acknowledged once done, so the ones
+# of a worker lost meanwhile are delivered again
+REDELIVERY_OPTIONS = {"acks_late": True, "reject_on_worker_lost": True}
+
+
+def retry_unsent(task, error: events.mail.SendInterrupted, **kwargs) -> None:
+    """
+    Retries the email task with the arguments of the messages not sent,
+    with exponential backoff and full jitter as autoretry_for would.
+    Once the retries are exhausted, the connection error is raised.
+    """
+    raise task.retry(
+        kwargs=kwargs,
+        exc=error.__cause__,
+        countdown=get_exponential_backoff_interval(
+            factor=1,
+            retries=task.request.retries,
+            maximum=EMAIL_RETRY_BACKOFF_MAX,
+            full_jitter=True,
+        ),
+    )
+
+
+def deliver_notification(
+    task,
+    template: str,
+    event_id: int,
+    user_ids: list[int],
+) -> int:
+    """
+    Renders the notification for every user from the compiled template
+    (see events.notifications) and sends a separate message to each of
+    them over one pooled connection. Only ids travel through the broker.
+    Notifications of the users in the digest mode are logged instead,
+    for send_notification_digests. If the connection is lost, the task
+    is retried for the users not sent their message yet.
+    Returns the number of sent messages.
+    """
+    context = events.notifications.get_event_context(event_id)
+    if context is None:
+        return 0
+    users = get_user_model().objects.filter(pk__in=user_ids).only(
+        "username", "email", "notification_mode"
+    )
+    messages, recipient_ids, logged = [], [], []
+    for user in users.order_by("pk"):
+        if (
+            user.notification_mode == NotificationMode.DIGEST
+            and template in events.notifications.DIGEST_NOTICES
+        ):
+            logged.append(
+                NotificationLog(
+                    template=template, event_id=event_id, user_id=user.pk
+                )
+            )
+        else:
+            messages.append(
+                events.notifications.build_message(
+                    template,
+                    {**context, "username": user.username},
+                    user.email,
+                )
+            )
+            recipient_ids.append(user.pk)
+    # Retries only carry the users left to email, never logged twice
+    NotificationLog.objects.bulk_create(logged)
+    try:
+        return events.mail.send_individual_messages(messages)
+    except events.mail.SendInterrupted as error:
+        retry_unsent(
+            task,
+            error,
+            template=template,
+            event_id=event_id,
+            user_ids=recipient_ids[error.handled:],
+        )
+
+
+@shared_task(**EMAIL_RETRY_OPTIONS)
+def send_notification(
+    self,
+    template: str,
+    event_id: int,
+    user_ids: list[int],
+) -> int:
+    """
+    Sends the registration notifications, routed to the transactional
+    queue (see events_core.celery).
+    """
+    return deliver_notification(self, template, event_id, user_ids)
+
+
+@shared_task(**EMAIL_RETRY_OPTIONS)
+def send_bulk_notification(
+    self,
+    template: str,
+    event_id: int,
+    user_ids: list[int],
+) -> int:
+    """
+    Sends the update notifications and reminders, routed to the bulk
+    queue (see events_core.celery).
+    """
+    return deliver_notification(self, template, event_id, user_ids)
+
+
+def delete_digested(digests: list[dict]) -> None:
+    NotificationLog.objects.filter(
+        pk__in=[log_id for digest in digests for log_id in digest["ids"]]
+    ).delete()
+
+
+@shared_task(**EMAIL_RETRY_OPTIONS)
+def send_digests(self, user_ids: list[int]) -> int:
+    """
+    Renders and sends the digests of the users with the notifications
+    logged for them, then deletes the sent notifications from the log,
+    so a failed chunk keeps them for its retries and the next digest.
+    If the connection is lost, the log of the users sent their digest
+    is deleted and the task is retried for the others.
+    Repeated notifications about an event are listed once.
+    Returns the number of sent messages.
+    """
+    digests = NotificationLog.objects.get_digests(user_ids)
+    users = get_user_model().objects.only("username", "email").in_bulk(
+        [digest["user_id"] for digest in digests]
+    )
+    contexts, messages, recipients, empty = {}, [], [], []
+    for digest in digests:
+        user = users.get(digest["user_id"])
+        notices = []
+        for template, event_id in dict.fromkeys(
+            (notice["template"], notice["event_id"])
+            for notice in digest["notices"]
+        ):
+            if event_id not in contexts:
+                contexts[event_id] = (
+                    events.notifications.get_event_context(event_id)
+                )
+            if contexts[event_id] is not None:
+                notices.append((template, contexts[event_id]))
+        if user is None or not notices:
+            # Nothing left to send
+            empty.append(digest)
+            continue
+        messages.append(
+            events.notifications.build_digest(
+                user.username, user.email, notices
+            )
+        )
+        recipients.append(digest)
+    try:
+        sent = events.mail.send_individual_messages(messages)
+    except events.mail.SendInterrupted as error:
+        delete_digested(empty + recipients[:error.handled])
+        retry_unsent(
+            self,
+            error,
+            user_ids=[
+                digest["user_id"] for digest in recipients[error.handled:]
+            ],
+        )
+    delete_digested(empty + recipients)
+    return sent
 
 
 @shared_task
-def send_email_notification(message: str, subject: str, emails: list[str]) -> None:
-    send_mail(
-        subject=subject,
-        message=message,
-        from_email=settings.EMAIL_HOST_USER,
-        recipient_list=emails,
-        fail_silently=True,
-        html_message=message,
+def send_notification_digests() -> int:
+    """
+    Emails every user in the digest mode the notifications logged
+    since the previous digest. The users with logged notifications are
+    sent their digests in chunks, each by a task of one Celery group
+    reading and clearing the log of its users (see send_digests).
+    Returns the number of digests.
+    """
+    chunk_size = settings.EVENT_NOTIFICATION_CHUNK_SIZE
+    user_ids = list(
+        NotificationLog.objects.values_list("user_id", flat=True)
+        .distinct()
+        .order_by("user_id")
     )
+    group(
+        send_digests.s(user_ids=user_ids[start:start + chunk_size])
+        for start in range(0, len(user_ids), chunk_size)
+    ).apply_async()
+    return len(user_ids)
+
+
+@shared_task
+def notify_event_update(event_id: int) -> None:
+    """
+    Emails the participants about the event update. Participant ids
+    are streamed from the database in chunks, each sent by a task
+    of one Celery group, so no process holds all of them.
+    """
+    chunk_size = settings.EVENT_NOTIFICATION_CHUNK_SIZE
+    user_ids = (
+        Event.participants.through.objects.filter(event_id=event_id)
+        .order_by("user_id")
+        .values_list("user_id", flat=True)
+        .iterator(chunk_size=chunk_size)
+    )
+    chunks = iter(lambda: list(islice(user_ids, chunk_size)), [])
+    # The group consumes the generator lazily, chunk by chunk
+    group(
+        send_bulk_notification.s(
+            template=events.notifications.UPDATE,
+            event_id=event_id,
+            user_ids=chunk,
+        )
+        for chunk in chunks
+    ).apply_async()
+
+
+@shared_task(**REDELIVERY_OPTIONS)
+def reconcile_participant_counts() -> int:
+    """
+    Repairs drift of the denormalized participant counters.
+    Returns the number of repaired events.
+    """
+    repaired = (
+        Event.objects.annotate(actual_count=Event.count_participants())
+        .exclude(participant_count=F("actual_count"))
+        .update(
+            participant_count=Event.count_participants(),
+            updated_at=django.utils.timezone.now(),
+        )
+    )
+    if repaired:
+        # Counters are only listed, event details show participants
+        transaction.on_commit(events.cache.invalidate_event_list)
+    return repaired
+
+
+@shared_task(**REDELIVERY_OPTIONS)
+def promote_waitlisted_participants(event_id: int) -> int:
+    """
+    Promotes waitlisted users of the event to free seats in FIFO order.
+    Every batch is one statement committed on its own with the emails
+    to the promoted users (see events.outbox), so seats freed meanwhile
+    are picked up by the next batch.
+    Returns the number of promoted users.
+    """
+    batch_size = settings.EVENT_WAITLIST_PROMOTION_BATCH_SIZE
+    promoted_count = 0
+    while True:
+        now = django.utils.timezone.now()
+        reserved = 0
+        if events.holds.holds_enabled():
+            # Seats held before the waitlist started
+            reserved, _ = events.holds.get_holds(event_id, None, now)
+        promoted = Event.objects.promote_waitlisted(
+            event_id,
+            limit=batch_size,
+            now=now,
+            reserved=reserved,
+        )
+        promoted_count += len(promoted)
+        if len(promoted) < batch_size:
+            return promoted_count
+
+
+@shared_task(**REDELIVERY_OPTIONS)
+def apply_buffered_registrations() -> int:
+    """
+    Applies a batch of the registration requests buffered by
+    EventViewSet.register (see events.buffer) in one transaction
+    with their emails (see events.outbox), then stores their statuses.
+    Runs every EVENT_REGISTRATION_BUFFER_INTERVAL seconds, so the
+    database absorbs one batch per interval however fast requests come.
+    Requests are removed from the stream only once applied, and applying
+    them again after a crash is a no-op.
+    Returns the number of applied requests.
+    """
+    registrations = events.buffer.read_registrations(
+        settings.EVENT_REGISTRATION_BUFFER_BATCH_SIZE
+    )
+    if not registrations:
+        return 0
+
+    now = django.utils.timezone.now()
+    reserved = {}
+    if events.holds.holds_enabled():
+        for event_id in {event_id for _, event_id, _ in registrations}:
+            reserved[event_id], _ = events.holds.get_holds(
+                event_id, None, now
+            )
+    with transaction.atomic():
+        rows = Event.objects.apply_registrations(
+            [(event_id, user_id) for _, event_id, user_id in registrations],
+            now=now,
+            reserved=reserved,
+        )
+
+    statuses, promoted_event_ids = {}, set()
+    for (_, event_id, user_id), row in zip(registrations, rows):
+        if row is None:
+            result = REJECTED, "No Event matches the given query."
+        else:
+            result = Event.get_registration_result(row)
+            if result[0] == WAITLISTED and row["has_free_seats"]:
+                promoted_event_ids.add(event_id)
+        # Repeated requests do not hide the result of the first one
+        statuses.setdefault((event_id, user_id), result)
+
+    for event_id in promoted_event_ids:
+        promote_waitlisted_participants.delay(event_id)
+
+    events.buffer.complete_registrations(
+        [entry_id for entry_id, _, _ in registrations], statuses
+    )
+    return len(registrations)
+
+
+@shared_task(**REDELIVERY_OPTIONS)
+def send_event_reminders() -> int:
+    """
+    Reminds the participants of the events starting within
+    EVENT_REMINDER_LEAD_MINUTES. Every batch of events is claimed with
+    the reminders of all their participants written to the outbox
+    by one statement (see EventManager.claim_reminders), so overlapping
+    runs and restarts never remind twice. The outbox dispatcher streams
+    the reminders to send_bulk_notification in chunks.
+    Users registered after the reminders of the event are not reminded.
+    Returns the number of reminders.
+    """
+    batch_size = settings.EVENT_REMINDER_BATCH_SIZE
+    now = django.utils.timezone.now()
+    until = now + timedelta(minutes=settings.EVENT_REMINDER_LEAD_MINUTES)
+    reminders = 0
+    while True:
+        claimed = Event.objects.claim_reminders(now, until, limit=batch_size)
+        reminders += claimed["reminders"]
+        if claimed["events"] < batch_size:
+            return reminders
@@ -1,20 +1,52 @@
-from datetime import datetime
+import smtplib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from io import StringIO
 from unittest import mock
 
+from celery.exceptions import Retry
 from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
 from django.db.models import QuerySet, Case, When, Value, IntegerField, Q
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 import django.utils.timezone
 from rest_framework import status
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient
 
-from events.models import Event
+from events.filters import EventFilter
+from events_core.celery import app as celery_app
+from events.mail import ConnectionPool, send_individual_messages
+from events.models import (
+    Event,
+    NotificationLog,
+    OutboxNotification,
+    WaitlistEntry,
+)
+from events.outbox import dispatch_notifications
+from events.pagination import EstimatedCountPaginator
+from events.tasks import (
+    apply_buffered_registrations,
+    notify_event_update,
+    send_bulk_notification,
+    send_digests,
+    send_notification,
+    send_notification_digests,
+    promote_waitlisted_participants,
+    reconcile_participant_counts,
+    send_event_reminders,
+)
 from events.serializers import EventListSerializer, EventRetrieveSerializer
 from events.views import EventViewSet
 
 
 EVENT_URL = reverse("events:event-list")
+BULK_CREATE_URL = reverse("events:event-bulk-create")
 PAGE_SIZE = EventViewSet.pagination_class.page_size
 NOW_MOCKED_VALUE = django.utils.timezone.make_aware(
     datetime(2024, 12, 13, 10, 0, 0),
@@ -34,6 +66,26 @@ def unregister_url(event_id: int) -> str:
     return reverse("events:event-unregister", args=[event_id])
 
 
+def registration_status_url(event_id: int) -> str:
+    return reverse("events:event-registration-status", args=[event_id])
+
+
+def get_outbox(event_id: int) -> list[tuple[str, int | None]]:
+    return list(
+        OutboxNotification.objects.filter(event_id=event_id).values_list(
+            "template", "user_id"
+        )
+    )
+
+
+def hold_url(event_id: int) -> str:
+    return reverse("events:event-hold", args=[event_id])
+
+
+def confirm_url(event_id: int) -> str:
+    return reverse("events:event-confirm", args=[event_id])
+
+
 def annotate_priority(queryset: QuerySet, *ordering) -> QuerySet:
     if not ordering:
         ordering = ["start_time"]
@@ -75,6 +127,54 @@ class NotAuthenticatedEventApiTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["results"], serializer.data)
 
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_get_events_list_counts_participants_in_one_query(
+        self, mocked_now
+    ) -> None:
+        # Count and page queries, participants are not prefetched
+        with self.assertNumQueries(2):
+            response = self.client.get(EVENT_URL)
+
+        for event in response.data["results"]:
+            self.assertEqual(
+                event["participants"],
+                Event.objects.get(id=event["id"]).participants.count(),
+            )
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_get_events_list_pages_across_upcoming_and_past(
+        self, mocked_now
+    ) -> None:
+        per_page = 3
+        events = list(
+            annotate_priority(Event.objects.all()).values_list(
+                "id", flat=True
+            )
+        )
+        for page in range(1, len(events) // per_page + 2):
+            with self.subTest(page=page):
+                response = self.client.get(
+                    EVENT_URL, {"page": page, "per_page": per_page}
+                )
+
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(
+                    [event["id"] for event in response.data["results"]],
+                    events[(page - 1) * per_page:page * per_page],
+                )
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_get_events_list_not_sorted_by_is_upcoming(
+        self, mocked_now
+    ) -> None:
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(EVENT_URL)
+
+        page_sql = context.captured_queries[-1]["sql"]
+        order_by = page_sql.rsplit("ORDER BY", 1)[1]
+        self.assertNotIn("CASE", order_by)
+        self.assertNotIn("is_upcoming", order_by)
+
     @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
     def test_get_events_list_filter_by_title(self, mocked_now) -> None:
         title = "party"
@@ -111,6 +211,89 @@ class NotAuthenticatedEventApiTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["results"], serializer.data)
 
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_get_events_list_filter_by_start_date_in_current_timezone(
+        self, mocked_now
+    ) -> None:
+        # 2024-12-13 12:00 UTC is already 2024-12-14 in Auckland
+        with django.utils.timezone.override("Pacific/Auckland"):
+            response = self.client.get(
+                EVENT_URL, {"start_date": "2024-12-14"}
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [event["id"] for event in response.data["results"]], [4]
+        )
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_get_events_list_filter_by_time_range(self, mocked_now) -> None:
+        filters = {
+            "starts_after": "2024-12-13T12:00:00Z",
+            "starts_before": "2025-01-25T07:00:00Z",
+            "ends_before": "2025-01-20T10:30:00Z",
+        }
+        response = self.client.get(EVENT_URL, filters)
+        events = annotate_priority(
+            Event.objects.filter(
+                start_time__gte=filters["starts_after"],
+                start_time__lt=filters["starts_before"],
+                end_time__lt=filters["ends_before"],
+            )
+        )[:PAGE_SIZE]
+        serializer = EventListSerializer(events, many=True)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"], serializer.data)
+        self.assertEqual(len(serializer.data), 3)
+        # Bounds are exclusive like starts_before, event 7 ends at it
+        self.assertNotIn(
+            7, [event["id"] for event in response.data["results"]]
+        )
+
+    def test_filter_by_start_date_uses_start_time_index(self) -> None:
+        queryset = EventFilter().filter_start_date(
+            Event.objects.all(), "start_date", date(2024, 12, 13)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = queryset.explain()
+
+        self.assertIn("event_start_time_id_idx", plan)
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_get_events_list_search(self, mocked_now) -> None:
+        searches = {
+            "blockchain": [7],
+            "futur develop": [7],
+            "netw": [5],
+            "meeting": [1, 4, 9, 10],
+            "company's product": [12, 13],
+            "!!": list(
+                annotate_priority(Event.objects.all()).values_list(
+                    "id", flat=True
+                )[:PAGE_SIZE]
+            ),
+        }
+        for search, expected_ids in searches.items():
+            with self.subTest(search=search):
+                response = self.client.get(EVENT_URL, {"search": search})
+
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertCountEqual(
+                    [event["id"] for event in response.data["results"]],
+                    expected_ids,
+                )
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_get_events_list_search_ranked(self, mocked_now) -> None:
+        # Upcoming events first, then title > location > description matches
+        response = self.client.get(EVENT_URL, {"search": "meeting"})
+        self.assertEqual(
+            [event["id"] for event in response.data["results"]],
+            [10, 4, 9, 1],
+        )
+
     @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
     def test_get_events_list_filter_by_organizer(self, mocked_now) -> None:
         organizer = "Digital_Dragon"
@@ -324,19 +507,18 @@ class AuthenticatedEventApiTests(TestCase):
         response = self.client.post(EVENT_URL, self.payload)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
-    @mock.patch("events.tasks.send_email_notification.delay")
     @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
     def test_update_own_event_sends_email(
         self,
         mocked_now,
-        mocked_send_mail,
     ) -> None:
-        response = self.client.put(
-            detail_url(self.own_event.id), self.updated_payload
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put(
+                detail_url(self.own_event.id), self.updated_payload
+            )
         self.own_event.refresh_from_db()
 
-        mocked_send_mail.assert_called_once()
+        self.assertEqual(get_outbox(self.own_event.id), [("update", None)])
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(self.updated_payload["title"], self.own_event.title)
@@ -356,31 +538,28 @@ class AuthenticatedEventApiTests(TestCase):
         )
         self.assertEqual(self.user.id, self.own_event.organizer_id)
 
-    @mock.patch("events.tasks.send_email_notification.delay")
     @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
     def test_update_not_own_event_forbidden(
         self,
         mocked_now,
-        mocked_send_mail,
     ) -> None:
         response = self.client.put(
             detail_url(self.not_own_event.id), self.updated_payload
         )
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
-    @mock.patch("events.tasks.send_email_notification.delay")
     @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
     def test_partially_update_own_event_sends_email(
         self,
         mocked_now,
-        mocked_send_mail,
     ) -> None:
-        response = self.client.patch(
-            detail_url(self.own_event.id), self.partial_updated_payload
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                detail_url(self.own_event.id), self.partial_updated_payload
+            )
         self.own_event.refresh_from_db()
 
-        mocked_send_mail.assert_called_once()
+        self.assertEqual(get_outbox(self.own_event.id), [("update", None)])
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(
@@ -392,12 +571,10 @@ class AuthenticatedEventApiTests(TestCase):
             self.own_event.end_time.strftime("%Y-%m-%d %H:%M"),
         )
 
-    @mock.patch("events.tasks.send_email_notification.delay")
     @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
     def test_partially_update_own_event_forbidden(
         self,
         mocked_now,
-        mocked_send_mail,
     ) -> None:
         response = self.client.put(
             detail_url(self.not_own_event.id), self.partial_updated_payload
@@ -420,103 +597,2232 @@ class AuthenticatedEventApiTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
         self.assertTrue(event_exists)
 
-    @mock.patch("events.tasks.send_email_notification.delay")
     @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
-    def test_register_for_the_event(
-        self,
-        mocked_now,
-        mocked_send_mail,
-    ) -> None:
+    def test_register_for_the_event(self, mocked_now) -> None:
         response = self.client.post(
             register_url(self.not_participate_in_event.id)
         )
         self.not_participate_in_event.refresh_from_db()
 
-        mocked_send_mail.assert_called_once()
+        self.assertEqual(
+            get_outbox(self.not_participate_in_event.id),
+            [("registration", self.user.id)],
+        )
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn(
             self.user,
             self.not_participate_in_event.participants.all(),
         )
 
-    @mock.patch("events.tasks.send_email_notification.delay")
     @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
     def test_register_for_the_own_event_error(
         self,
         mocked_now,
-        mocked_send_mail,
     ) -> None:
         response = self.client.post(
             register_url(self.own_event.id)
         )
 
-        mocked_send_mail.assert_not_called()
+        self.assertFalse(OutboxNotification.objects.exists())
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertNotIn(
             self.user,
             self.own_event.participants.all(),
         )
 
-    @mock.patch("events.tasks.send_email_notification.delay")
     @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
     def test_register_for_the_already_registered_event_error(
         self,
         mocked_now,
-        mocked_send_mail,
     ) -> None:
         response = self.client.post(
             register_url(self.participate_in_event.id)
         )
-        mocked_send_mail.assert_not_called()
+        self.assertFalse(OutboxNotification.objects.exists())
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
-    @mock.patch("events.tasks.send_email_notification.delay")
     @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
     def test_register_for_the_past_event_error(
             self,
             mocked_now,
-            mocked_send_mail,
     ) -> None:
         response = self.client.post(
             register_url(self.not_participate_in_past_event.id)
         )
         self.not_participate_in_past_event.refresh_from_db()
 
-        mocked_send_mail.assert_not_called()
+        self.assertFalse(OutboxNotification.objects.exists())
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertNotIn(
             self.user,
             self.not_participate_in_past_event.participants.all(),
         )
 
-    @mock.patch("events.tasks.send_email_notification.delay")
     @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
-    def test_unregister_from_the_event(
-            self,
-            mocked_now,
-            mocked_send_mail,
-    ) -> None:
+    def test_unregister_from_the_event(self, mocked_now) -> None:
         response = self.client.post(
             unregister_url(self.participate_in_event.id)
         )
         self.participate_in_event.refresh_from_db()
 
-        mocked_send_mail.assert_called_once()
+        self.assertEqual(
+            get_outbox(self.participate_in_event.id),
+            [("cancel_registration", self.user.id)],
+        )
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertNotIn(
             self.user,
             self.participate_in_event.participants.all(),
         )
 
-    @mock.patch("events.tasks.send_email_notification.delay")
     @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
     def test_unregister_from_the_event_you_are_not_in_error(
             self,
             mocked_now,
-            mocked_send_mail,
     ) -> None:
         response = self.client.post(
             unregister_url(self.not_participate_in_event.id)
         )
-        mocked_send_mail.assert_not_called()
+        self.assertFalse(OutboxNotification.objects.exists())
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class EventOverlapConstraintTests(TestCase):
+    fixtures = ["events/tests/fixtures/events_data.json"]
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.get(pk=1)
+        self.client.force_authenticate(self.user)
+        self.payload = {
+            "title": "Product Launch",
+            "description": "Official launch event for the company's new product.",
+            "start_time": "2026-03-30 14:00",
+            "end_time": "2026-03-30 17:00",
+            "location": "Main Auditorium",
+        }
+
+    def build_event(self, start_time: str, end_time: str) -> Event:
+        return Event(
+            title="Constraint check",
+            start_time=django.utils.timezone.make_aware(
+                datetime.fromisoformat(start_time)
+            ),
+            end_time=django.utils.timezone.make_aware(
+                datetime.fromisoformat(end_time)
+            ),
+            location="Main Auditorium",
+            organizer=self.user,
+        )
+
+    def test_database_rejects_overlapping_events(self) -> None:
+        Event.objects.bulk_create(
+            [self.build_event("2026-03-30 14:00", "2026-03-30 17:00")]
+        )
+        with self.assertRaises(IntegrityError):
+            Event.objects.bulk_create(
+                [self.build_event("2026-03-30 16:00", "2026-03-30 18:00")]
+            )
+
+    def test_database_allows_adjacent_events(self) -> None:
+        Event.objects.bulk_create(
+            [
+                self.build_event("2026-03-30 14:00", "2026-03-30 17:00"),
+                self.build_event("2026-03-30 17:00", "2026-03-30 18:00"),
+            ]
+        )
+        self.assertEqual(
+            Event.objects.filter(title="Constraint check").count(), 2
+        )
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_constraint_violation_mapped_to_validation_error(
+        self, mocked_now
+    ) -> None:
+        response = self.client.post(EVENT_URL, self.payload)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        # Simulate a concurrent insert that passed the overlap check
+        with mock.patch(
+            "events.models.Event.validate_time_and_location"
+        ):
+            response = self.client.post(EVENT_URL, self.payload)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data,
+            [Event.get_overlap_error_message(self.payload["location"])],
+        )
+
+
+class BulkCreateEventApiTests(TestCase):
+    fixtures = ["events/tests/fixtures/events_data.json"]
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.get(pk=1)
+        self.client.force_authenticate(self.user)
+        self.payload = [
+            {
+                "title": f"Season game {day}",
+                "start_time": f"2026-04-{day:02d} 18:00",
+                "end_time": f"2026-04-{day:02d} 20:00",
+                "location": "Stadium" if day % 2 else "Arena",
+            }
+            for day in range(1, 21)
+        ]
+
+    def test_bulk_create_not_authenticated_error(self) -> None:
+        self.client.force_authenticate(None)
+        response = self.client.post(
+            BULK_CREATE_URL, self.payload, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_bulk_create_events(self, mocked_now) -> None:
+        # One range query per location, plus the insert in a savepoint
+        with self.assertNumQueries(5):
+            response = self.client.post(
+                BULK_CREATE_URL, self.payload, format="json"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), len(self.payload))
+        events = Event.objects.filter(title__startswith="Season game")
+        self.assertEqual(events.count(), len(self.payload))
+        self.assertFalse(events.exclude(organizer=self.user).exists())
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_bulk_create_overlapping_in_batch_error(self, mocked_now) -> None:
+        self.payload[4]["location"] = self.payload[3]["location"]
+        self.payload[4]["start_time"] = "2026-04-04 19:00"
+
+        response = self.client.post(
+            BULK_CREATE_URL, self.payload, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("non_field_errors", response.data[3])
+        self.assertIn("non_field_errors", response.data[4])
+        self.assertEqual(response.data[0], {})
+        self.assertFalse(
+            Event.objects.filter(title__startswith="Season game").exists()
+        )
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_bulk_create_overlapping_existing_event_error(
+        self, mocked_now
+    ) -> None:
+        self.payload[0]["location"] = "Main Auditorium"
+        self.payload[0]["start_time"] = "2025-03-30 12:00"
+        self.payload[0]["end_time"] = "2025-03-30 13:00"
+
+        response = self.client.post(
+            BULK_CREATE_URL, self.payload, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data[0],
+            {
+                "non_field_errors": [
+                    Event.get_overlap_error_message("Main Auditorium")
+                ]
+            },
+        )
+        self.assertEqual(response.data[1], {})
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_bulk_create_invalid_time_error(self, mocked_now) -> None:
+        self.payload[2]["end_time"] = self.payload[2]["start_time"]
+
+        response = self.client.post(
+            BULK_CREATE_URL, self.payload, format="json"
+        )
+
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("non_field_errors", response.data[2])
+        self.assertEqual(response.data[1], {})
+
+
+class CursorPaginationEventApiTests(TestCase):
+    fixtures = ["events/tests/fixtures/events_data.json"]
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+
+    def get_all_pages(self, params: dict) -> list[int]:
+        response = self.client.get(EVENT_URL, params)
+        ids = []
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn("count", response.data)
+            ids.extend(event["id"] for event in response.data["results"])
+            if not response.data["next"]:
+                return ids
+            response = self.client.get(response.data["next"])
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_cursor_pages_keep_list_order(self, mocked_now) -> None:
+        for ordering in ["start_time", "-title", "location"]:
+            with self.subTest(ordering=ordering):
+                ids = self.get_all_pages(
+                    {"pagination": "cursor", "ordering": ordering}
+                )
+                events = annotate_priority(
+                    Event.objects.all(), ordering, "id"
+                )
+                self.assertEqual(
+                    ids, list(events.values_list("id", flat=True))
+                )
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_cursor_pages_keep_search_rank_ties(self, mocked_now) -> None:
+        # Events 9 and 1 have the same rank for "meeting"
+        for search in ["meeting", "product", "room"]:
+            with self.subTest(search=search):
+                ids = self.get_all_pages(
+                    {"pagination": "cursor", "per_page": 1, "search": search}
+                )
+                response = self.client.get(
+                    EVENT_URL, {"search": search, "per_page": 100}
+                )
+                self.assertEqual(
+                    ids,
+                    [event["id"] for event in response.data["results"]],
+                )
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_cursor_previous_page(self, mocked_now) -> None:
+        first_page = self.client.get(EVENT_URL, {"pagination": "cursor"})
+        self.assertIsNone(first_page.data["previous"])
+
+        second_page = self.client.get(first_page.data["next"])
+        response = self.client.get(second_page.data["previous"])
+
+        self.assertEqual(
+            response.data["results"], first_page.data["results"]
+        )
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_cursor_previous_pages_across_upcoming_and_past(
+        self, mocked_now
+    ) -> None:
+        response = self.client.get(
+            EVENT_URL, {"pagination": "cursor", "per_page": 3}
+        )
+        while response.data["next"]:
+            response = self.client.get(response.data["next"])
+
+        ids = []
+        while True:
+            ids[:0] = [event["id"] for event in response.data["results"]]
+            if not response.data["previous"]:
+                break
+            response = self.client.get(response.data["previous"])
+
+        self.assertEqual(
+            ids,
+            list(
+                annotate_priority(Event.objects.all(), "start_time", "id")
+                .values_list("id", flat=True)
+            ),
+        )
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_cursor_pages_stable_on_insert(self, mocked_now) -> None:
+        first_page = self.client.get(EVENT_URL, {"pagination": "cursor"})
+        first_page_ids = [
+            event["id"] for event in first_page.data["results"]
+        ]
+        Event.objects.bulk_create(
+            [
+                Event(
+                    title="Inserted meanwhile",
+                    start_time=NOW_MOCKED_VALUE,
+                    end_time=NOW_MOCKED_VALUE + timedelta(hours=1),
+                    location="Somewhere",
+                    organizer_id=1,
+                )
+            ]
+        )
+
+        second_page = self.client.get(first_page.data["next"])
+
+        self.assertFalse(
+            {event["id"] for event in second_page.data["results"]}
+            & set(first_page_ids)
+        )
+
+    @override_settings(EVENT_PAGINATION_MODE="cursor")
+    def test_cursor_mode_from_settings(self) -> None:
+        response = self.client.get(EVENT_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", response.data)
+
+    def test_invalid_cursor_error(self) -> None:
+        response = self.client.get(
+            EVENT_URL, {"pagination": "cursor", "cursor": "invalid"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class EstimatedCountEventApiTests(TestCase):
+    fixtures = ["events/tests/fixtures/events_data.json"]
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        cache.clear()
+
+    def test_exact_count(self) -> None:
+        response = self.client.get(EVENT_URL)
+
+        self.assertEqual(response.data["count"], Event.objects.count())
+        self.assertTrue(response.data["count_is_exact"])
+
+    def test_planner_estimate(self) -> None:
+        estimate = EstimatedCountPaginator.get_planner_estimate(
+            Event.objects.values("pk")
+        )
+        self.assertIsInstance(estimate, int)
+
+    @override_settings(
+        EVENT_COUNT_MODE="estimated",
+        EVENT_COUNT_ESTIMATE_THRESHOLD=100,
+    )
+    @mock.patch(
+        "events.pagination.EstimatedCountPaginator.get_planner_estimate",
+        return_value=1000,
+    )
+    def test_planner_estimate_for_broad_query(self, mocked_estimate) -> None:
+        response = self.client.get(EVENT_URL)
+
+        self.assertEqual(response.data["count"], 1000)
+        self.assertEqual(response.data["pages"], 1000 // PAGE_SIZE)
+        self.assertFalse(response.data["count_is_exact"])
+
+    @override_settings(
+        EVENT_COUNT_MODE="estimated",
+        EVENT_COUNT_ESTIMATE_THRESHOLD=100,
+    )
+    @mock.patch(
+        "events.pagination.EstimatedCountPaginator.get_planner_estimate",
+        return_value=1,
+    )
+    def test_page_past_estimate(self, mocked_estimate) -> None:
+        response = self.client.get(EVENT_URL, {"page": 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), PAGE_SIZE)
+
+    @override_settings(
+        EVENT_COUNT_MODE="estimated",
+        EVENT_COUNT_ESTIMATE_THRESHOLD=100,
+    )
+    @mock.patch(
+        "events.pagination.EstimatedCountPaginator.get_planner_estimate",
+        return_value=1,
+    )
+    def test_cached_exact_count_for_narrow_query(
+        self, mocked_estimate
+    ) -> None:
+        params = {"location": "room"}
+        count = Event.objects.filter(location__icontains="room").count()
+
+        response = self.client.get(EVENT_URL, params)
+        self.assertEqual(response.data["count"], count)
+        self.assertTrue(response.data["count_is_exact"])
+
+        Event.objects.filter(location__icontains="room").first().delete()
+
+        response = self.client.get(EVENT_URL, params)
+        self.assertEqual(response.data["count"], count)
+        self.assertFalse(response.data["count_is_exact"])
+
+        response = self.client.get(EVENT_URL, {"location": "hall"})
+        self.assertTrue(response.data["count_is_exact"])
+
+
+class ParticipantCountTests(TestCase):
+    fixtures = ["events/tests/fixtures/events_data.json"]
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.get(pk=1)
+        self.client.force_authenticate(self.user)
+        self.event = (
+            Event.objects.filter(start_time__gt=NOW_MOCKED_VALUE)
+            .exclude(Q(participants=self.user) | Q(organizer=self.user))
+            .first()
+        )
+
+    def assertCountsAreCorrect(self) -> None:
+        for event in Event.objects.all():
+            self.assertEqual(
+                event.participant_count, event.participants.count()
+            )
+
+    def test_fixture_counts(self) -> None:
+        self.assertCountsAreCorrect()
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_register_and_unregister_update_count(
+        self,
+        mocked_now,
+    ) -> None:
+        count = self.event.participant_count
+
+        self.client.post(register_url(self.event.id))
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.participant_count, count + 1)
+
+        self.client.post(unregister_url(self.event.id))
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.participant_count, count)
+
+    def test_reverse_participants_changes_update_count(self) -> None:
+        self.user.participated_events.add(self.event)
+        self.assertCountsAreCorrect()
+
+        self.user.participated_events.remove(self.event)
+        self.assertCountsAreCorrect()
+
+        self.user.participated_events.clear()
+        self.assertCountsAreCorrect()
+
+    def test_participants_set_and_clear_update_count(self) -> None:
+        self.event.participants.set(get_user_model().objects.all()[:3])
+        self.assertCountsAreCorrect()
+
+        self.event.participants.remove(self.user, self.event.organizer)
+        self.assertCountsAreCorrect()
+
+        self.event.participants.clear()
+        self.assertCountsAreCorrect()
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_event_save_keeps_count(self, mocked_now) -> None:
+        stale_event = Event.objects.get(pk=self.event.pk)
+        self.event.participants.add(self.user)
+
+        stale_event.title = "Renamed"
+        stale_event.save()
+        stale_event.refresh_from_db()
+
+        self.assertEqual(stale_event.title, "Renamed")
+        self.assertCountsAreCorrect()
+
+    def test_reconcile_participant_counts(self) -> None:
+        Event.objects.filter(pk=self.event.pk).update(participant_count=100)
+
+        repaired = reconcile_participant_counts()
+
+        self.assertEqual(repaired, 1)
+        self.assertCountsAreCorrect()
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_get_events_list_ordering_by_popularity(self, mocked_now) -> None:
+        response = self.client.get(EVENT_URL, {"ordering": "-popularity"})
+        events = annotate_priority(
+            Event.objects.all(), "-participant_count", "id"
+        )[:PAGE_SIZE]
+        serializer = EventListSerializer(events, many=True)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"], serializer.data)
+
+
+class TrigramIndexesBenchmarkTests(TestCase):
+    def test_benchmark_rolls_back_dataset(self) -> None:
+        out = StringIO()
+        call_command(
+            "benchmark_trigram_indexes", events=100, users=10, stdout=out
+        )
+
+        self.assertIn("EventFilter.title", out.getvalue())
+        self.assertIn("Trigram indexes used", out.getvalue())
+        self.assertFalse(Event.objects.exists())
+        self.assertFalse(get_user_model().objects.exists())
+
+
+@override_settings(EVENT_RESPONSE_CACHE_TIMEOUT=60)
+class ResponseCacheEventApiTests(TestCase):
+    fixtures = ["events/tests/fixtures/events_data.json"]
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.event = Event.objects.get(pk=6)
+        self.user = get_user_model().objects.get(pk=3)
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_list_and_retrieve_served_from_cache(self, mocked_now) -> None:
+        for url in [EVENT_URL, detail_url(self.event.id)]:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                with self.assertNumQueries(0):
+                    cached_response = self.client.get(url)
+
+                self.assertEqual(
+                    cached_response.status_code, status.HTTP_200_OK
+                )
+                self.assertEqual(cached_response.data, response.data)
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_list_cached_per_filters(self, mocked_now) -> None:
+        self.client.get(EVENT_URL, {"title": "party", "ordering": "title"})
+
+        with self.assertNumQueries(0):
+            self.client.get(EVENT_URL, {"ordering": "title", "title": "party"})
+        response = self.client.get(EVENT_URL, {"title": "meeting"})
+
+        self.assertEqual(
+            response.data["results"],
+            EventListSerializer(
+                annotate_priority(
+                    Event.objects.filter(title__icontains="meeting")
+                )[:PAGE_SIZE],
+                many=True,
+            ).data,
+        )
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_list_user_filters_cached_per_user(self, mocked_now) -> None:
+        params = {"participating": True}
+        self.client.force_authenticate(self.user)
+        self.client.get(EVENT_URL, params)
+
+        other_user = get_user_model().objects.get(pk=10)
+        self.client.force_authenticate(other_user)
+        response = self.client.get(EVENT_URL, params)
+
+        self.assertEqual(
+            {event["id"] for event in response.data["results"]},
+            set(
+                annotate_priority(
+                    Event.objects.filter(participants=other_user)
+                ).values_list("id", flat=True)[:PAGE_SIZE]
+            ),
+        )
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_event_save_invalidates_cache(self, mocked_now) -> None:
+        self.client.get(EVENT_URL)
+        self.client.get(detail_url(self.event.id))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.event.title = "Renamed event"
+            self.event.save()
+
+        response = self.client.get(EVENT_URL)
+        self.assertIn(
+            "Renamed event",
+            [event["title"] for event in response.data["results"]],
+        )
+        self.assertEqual(
+            self.client.get(detail_url(self.event.id)).data["title"],
+            "Renamed event",
+        )
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_event_delete_invalidates_cache(self, mocked_now) -> None:
+        self.client.get(detail_url(self.event.id))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.event.delete()
+
+        response = self.client.get(detail_url(self.event.id))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_register_and_unregister_invalidate_cache(
+        self, mocked_now
+    ) -> None:
+        participant = f"{self.user.username} ({self.user.email})"
+        self.client.force_authenticate(self.user)
+        self.client.get(EVENT_URL)
+        self.client.get(detail_url(self.event.id))
+
+        for url, participants in [
+            (register_url(self.event.id), 6),
+            (unregister_url(self.event.id), 5),
+        ]:
+            with self.subTest(url=url):
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.client.post(url)
+
+                listed_event = next(
+                    event
+                    for event in self.client.get(EVENT_URL).data["results"]
+                    if event["id"] == self.event.id
+                )
+                retrieved_event = self.client.get(
+                    detail_url(self.event.id)
+                ).data
+                self.assertEqual(listed_event["participants"], participants)
+                self.assertEqual(
+                    participant in retrieved_event["participants"],
+                    participants == 6,
+                )
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_organizer_change_invalidates_cache(self, mocked_now) -> None:
+        self.client.get(detail_url(self.event.id))
+        organizer = self.event.organizer
+
+        with self.captureOnCommitCallbacks(execute=True):
+            organizer.email = "new.email@test.com"
+            organizer.save()
+
+        self.assertEqual(
+            self.client.get(detail_url(self.event.id)).data["organizer"],
+            f"{organizer.username} (new.email@test.com)",
+        )
+
+    def test_last_login_update_keeps_cache(self) -> None:
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.user.last_login = NOW_MOCKED_VALUE
+            self.user.save(update_fields=["last_login"])
+
+        self.assertEqual(callbacks, [])
+
+
+class ConditionalRequestEventApiTests(TestCase):
+    fixtures = ["events/tests/fixtures/events_data.json"]
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.event = Event.objects.get(pk=6)
+        self.user = get_user_model().objects.get(pk=3)
+        # Loading the fixture participants sets the current time
+        Event.objects.update(
+            updated_at=NOW_MOCKED_VALUE - timedelta(days=1)
+        )
+
+    def get_etag(self, url: str) -> str:
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.headers["ETag"]
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_not_modified_with_etag(self, mocked_now) -> None:
+        # Lists are validated from the cache, events by one query
+        for url, queries in [(EVENT_URL, 0), (detail_url(self.event.id), 1)]:
+            with self.subTest(url=url):
+                etag = self.get_etag(url)
+
+                with self.assertNumQueries(queries):
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+                self.assertEqual(
+                    response.status_code, status.HTTP_304_NOT_MODIFIED
+                )
+                self.assertEqual(response.headers["ETag"], etag)
+                self.assertEqual(response.content, b"")
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_not_modified_since_last_modified(self, mocked_now) -> None:
+        response = self.client.get(detail_url(self.event.id))
+        last_modified = response.headers["Last-Modified"]
+
+        response = self.client.get(
+            detail_url(self.event.id), HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertNotIn("Last-Modified", self.client.get(EVENT_URL).headers)
+
+    @mock.patch("django.utils.timezone.now")
+    def test_etag_changes_on_participants_change(self, mocked_now) -> None:
+        mocked_now.return_value = NOW_MOCKED_VALUE
+        etags = {
+            url: self.get_etag(url)
+            for url in [EVENT_URL, detail_url(self.event.id)]
+        }
+
+        mocked_now.return_value = NOW_MOCKED_VALUE + timedelta(seconds=1)
+        self.client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(register_url(self.event.id))
+
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertNotEqual(response.headers["ETag"], etag)
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_etag_changes_on_event_update(self, mocked_now) -> None:
+        etag = self.get_etag(detail_url(self.event.id))
+
+        mocked_now.return_value = NOW_MOCKED_VALUE + timedelta(seconds=1)
+        self.event.description = "Updated description"
+        self.event.save()
+
+        self.assertNotEqual(self.get_etag(detail_url(self.event.id)), etag)
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_list_etag_changes_on_event_delete(self, mocked_now) -> None:
+        etag = self.get_etag(EVENT_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Event.objects.get(pk=13).delete()
+
+        self.assertNotEqual(self.get_etag(EVENT_URL), etag)
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_list_etag_changes_when_event_starts(self, mocked_now) -> None:
+        etag = self.get_etag(EVENT_URL)
+
+        # Event 4 starts at 12:00 and moves to the past events
+        mocked_now.return_value = NOW_MOCKED_VALUE + timedelta(hours=3)
+
+        self.assertNotEqual(self.get_etag(EVENT_URL), etag)
+
+    @override_settings(EVENT_RESPONSE_CACHE_TIMEOUT=60)
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_not_modified_from_cache(self, mocked_now) -> None:
+        etag = self.get_etag(EVENT_URL)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(EVENT_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_list_etag_differs_per_user_for_user_filters(
+        self, mocked_now
+    ) -> None:
+        url = f"{EVENT_URL}?participating=true"
+        self.client.force_authenticate(self.user)
+        etag = self.get_etag(url)
+
+        self.client.force_authenticate(self.event.organizer)
+
+        self.assertNotEqual(self.get_etag(url), etag)
+
+    def test_etag_not_set_for_missing_event(self) -> None:
+        response = self.client.get(detail_url(0))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertNotIn("ETag", response.headers)
+
+
+class EventCapacityTests(TestCase):
+    fixtures = ["events/tests/fixtures/events_data.json"]
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.get(pk=3)
+        self.client.force_authenticate(self.user)
+        # Upcoming event with 5 participants, user 3 is not one of them
+        self.event = Event.objects.get(pk=6)
+
+    def set_capacity(self, capacity: int) -> None:
+        Event.objects.filter(pk=self.event.pk).update(capacity=capacity)
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_register_for_the_last_seat(self, mocked_now) -> None:
+        self.set_capacity(6)
+
+        response = self.client.post(register_url(self.event.id))
+        self.event.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.event.participant_count, 6)
+        self.assertIn(self.user, self.event.participants.all())
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_register_for_the_full_event_puts_on_waitlist(
+        self, mocked_now
+    ) -> None:
+        self.set_capacity(5)
+
+        response = self.client.post(register_url(self.event.id))
+        self.event.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertFalse(OutboxNotification.objects.exists())
+        self.assertTrue(
+            self.event.waitlist.filter(user=self.user).exists()
+        )
+        self.assertEqual(self.event.participant_count, 5)
+        self.assertNotIn(self.user, self.event.participants.all())
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_unregister_releases_seat(self, mocked_now) -> None:
+        self.set_capacity(5)
+        participant = self.event.participants.first()
+        self.client.force_authenticate(participant)
+
+        response = self.client.post(unregister_url(self.event.id))
+        self.event.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.event.participant_count, 4)
+        self.assertTrue(
+            Event.objects.register_participant(
+                self.event.id, self.user.id, NOW_MOCKED_VALUE
+            )["inserted"]
+        )
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_register_and_unregister_in_one_query(self, mocked_now) -> None:
+        self.set_capacity(6)
+
+        for url in [
+            register_url(self.event.id),
+            unregister_url(self.event.id),
+        ]:
+            with self.subTest(url=url):
+                with self.assertNumQueries(1):
+                    response = self.client.post(url)
+
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.participant_count, 5)
+        self.assertEqual(self.event.participants.count(), 5)
+        # The emails are written to the outbox by the same statements
+        self.assertEqual(
+            get_outbox(self.event.id),
+            [
+                ("registration", self.user.id),
+                ("cancel_registration", self.user.id),
+            ],
+        )
+
+    def test_register_for_missing_event_error(self) -> None:
+        for url in [register_url(0), unregister_url(0)]:
+            with self.subTest(url=url):
+                response = self.client.post(url)
+
+                self.assertEqual(
+                    response.status_code, status.HTTP_404_NOT_FOUND
+                )
+
+    def test_database_rejects_participants_over_capacity(self) -> None:
+        self.set_capacity(5)
+
+        with self.assertRaises(IntegrityError):
+            self.event.participants.add(self.user)
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_update_capacity_below_participants_error(
+        self, mocked_now
+    ) -> None:
+        self.client.force_authenticate(self.event.organizer)
+
+        response = self.client.patch(
+            detail_url(self.event.id), {"capacity": 4}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIsNone(Event.objects.get(pk=self.event.pk).capacity)
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_update_capacity(self, mocked_now) -> None:
+        self.client.force_authenticate(self.event.organizer)
+
+        response = self.client.patch(
+            detail_url(self.event.id), {"capacity": 5}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["capacity"], 5)
+
+
+@override_settings(EVENT_SEAT_HOLD_MINUTES=10)
+class HeldSeatsEventCapacityTests(EventCapacityTests):
+    """
+    The registration tests with seat holds enabled, none of them held.
+    """
+
+    def setUp(self) -> None:
+        super().setUp()
+        patcher = mock.patch("events.holds.get_holds", return_value=(0, None))
+        self.mocked_get_holds = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_seats_held_by_others_are_not_taken(self, mocked_now) -> None:
+        self.set_capacity(6)
+        self.mocked_get_holds.return_value = (1, None)
+
+        response = self.client.post(register_url(self.event.id))
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.mocked_get_holds.assert_called_once_with(
+            self.event.id, self.user.id, NOW_MOCKED_VALUE
+        )
+
+
+class ConcurrentRegistrationTests(TransactionTestCase):
+    fixtures = ["events/tests/fixtures/events_data.json"]
+
+    def test_concurrent_registrations_never_oversell(self) -> None:
+        event = Event.objects.get(pk=8)
+        Event.objects.filter(pk=event.pk).update(capacity=3)
+        users = get_user_model().objects.exclude(pk=event.organizer_id)
+        barrier = threading.Barrier(users.count())
+
+        def register(user_id: int) -> bool:
+            try:
+                barrier.wait()
+                return Event.objects.register_participant(
+                    event.id, user_id, NOW_MOCKED_VALUE
+                )["inserted"]
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=users.count()) as executor:
+            results = list(
+                executor.map(register, users.values_list("id", flat=True))
+            )
+        event.refresh_from_db()
+
+        self.assertEqual(results.count(True), 3)
+        self.assertEqual(event.participant_count, 3)
+        self.assertEqual(event.participants.count(), 3)
+
+    def test_concurrent_duplicate_registrations(self) -> None:
+        event = Event.objects.get(pk=8)
+        user_id = 5
+        barrier = threading.Barrier(8)
+
+        def register(_) -> bool:
+            try:
+                barrier.wait()
+                return Event.objects.register_participant(
+                    event.id, user_id, NOW_MOCKED_VALUE
+                )["inserted"]
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(register, range(8)))
+        event.refresh_from_db()
+
+        self.assertEqual(results.count(True), 1)
+        self.assertEqual(event.participant_count, 1)
+        self.assertEqual(event.participants.count(), 1)
+
+
+class WaitlistTests(TestCase):
+    fixtures = ["events/tests/fixtures/events_data.json"]
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        # Upcoming event with 5 participants, users 1-6 are not among them
+        self.event = Event.objects.get(pk=6)
+        Event.objects.filter(pk=self.event.pk).update(capacity=5)
+        self.waiting_users = list(
+            get_user_model().objects.filter(pk__in=[3, 4, 5]).order_by("pk")
+        )
+
+    def join_waitlist(self, users: list) -> None:
+        for user in users:
+            self.client.force_authenticate(user)
+            response = self.client.post(register_url(self.event.id))
+            self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+    def assertCountsAreCorrect(self) -> None:
+        self.event.refresh_from_db()
+        self.assertEqual(
+            self.event.participant_count, self.event.participants.count()
+        )
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_waitlist_keeps_registration_order(self, mocked_now) -> None:
+        self.join_waitlist(self.waiting_users)
+
+        self.assertEqual(
+            list(self.event.waitlist.values_list("user_id", flat=True)),
+            [user.id for user in self.waiting_users],
+        )
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_register_on_waitlist_error(self, mocked_now) -> None:
+        self.join_waitlist(self.waiting_users[:1])
+
+        response = self.client.post(register_url(self.event.id))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.event.waitlist.count(), 1)
+
+    @mock.patch("events.tasks.promote_waitlisted_participants.delay")
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_register_queues_behind_waitlist(
+        self, mocked_now, mocked_promote
+    ) -> None:
+        self.join_waitlist(self.waiting_users[:1])
+        Event.objects.filter(pk=self.event.pk).update(capacity=6)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.join_waitlist(self.waiting_users[1:2])
+
+        mocked_promote.assert_called_once_with(self.event.id)
+        self.assertCountsAreCorrect()
+        self.assertEqual(self.event.participant_count, 5)
+
+    @mock.patch("events.tasks.promote_waitlisted_participants.delay")
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_unregister_promotes_waitlist(
+        self, mocked_now, mocked_promote
+    ) -> None:
+        self.join_waitlist(self.waiting_users[:1])
+        self.client.force_authenticate(self.event.participants.first())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(unregister_url(self.event.id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mocked_promote.assert_called_once_with(self.event.id)
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_unregister_leaves_waitlist(self, mocked_now) -> None:
+        self.join_waitlist(self.waiting_users[:1])
+
+        response = self.client.post(unregister_url(self.event.id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(self.event.waitlist.exists())
+        self.assertFalse(OutboxNotification.objects.exists())
+
+    @mock.patch("events.tasks.promote_waitlisted_participants.delay")
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_capacity_increase_promotes_waitlist(
+        self, mocked_now, mocked_promote
+    ) -> None:
+        self.client.force_authenticate(self.event.organizer)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(detail_url(self.event.id), {"capacity": 7})
+
+        mocked_promote.assert_called_once_with(self.event.id)
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_promote_waitlisted_participants_to_free_seats(
+        self, mocked_now
+    ) -> None:
+        self.join_waitlist(self.waiting_users)
+        Event.objects.filter(pk=self.event.pk).update(capacity=7)
+
+        promoted = promote_waitlisted_participants(self.event.id)
+
+        self.assertEqual(promoted, 2)
+        self.assertEqual(
+            set(
+                self.event.participants.filter(
+                    pk__in=[user.pk for user in self.waiting_users]
+                )
+            ),
+            set(self.waiting_users[:2]),
+        )
+        self.assertEqual(
+            list(self.event.waitlist.values_list("user_id", flat=True)),
+            [self.waiting_users[2].id],
+        )
+        # Rows inserted by one statement are in no particular order
+        self.assertCountEqual(
+            get_outbox(self.event.id),
+            [
+                ("waitlist_promotion", user.id)
+                for user in self.waiting_users[:2]
+            ],
+        )
+        self.assertCountsAreCorrect()
+
+    @override_settings(EVENT_WAITLIST_PROMOTION_BATCH_SIZE=2)
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_promote_waitlisted_participants_in_batches(
+        self, mocked_now
+    ) -> None:
+        self.join_waitlist(self.waiting_users)
+        Event.objects.filter(pk=self.event.pk).update(capacity=None)
+
+        # A full batch and the last one, one statement each
+        with self.assertNumQueries(2):
+            promoted = promote_waitlisted_participants(self.event.id)
+
+        self.assertEqual(promoted, 3)
+        self.assertFalse(WaitlistEntry.objects.exists())
+        self.assertEqual(len(get_outbox(self.event.id)), 3)
+        self.assertCountsAreCorrect()
+
+    def test_promote_waitlisted_participants_of_started_event(self) -> None:
+        with mock.patch(
+            "django.utils.timezone.now", return_value=NOW_MOCKED_VALUE
+        ):
+            self.join_waitlist(self.waiting_users)
+        Event.objects.filter(pk=self.event.pk).update(capacity=None)
+
+        promoted = promote_waitlisted_participants(self.event.id)
+
+        self.assertEqual(promoted, 0)
+        self.assertEqual(self.event.waitlist.count(), 3)
+
+
+@override_settings(EVENT_SEAT_HOLD_MINUTES=10)
+class SeatHoldTests(TestCase):
+    fixtures = ["events/tests/fixtures/events_data.json"]
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        # Upcoming event with 5 participants and one free seat
+        self.event = Event.objects.get(pk=6)
+        Event.objects.filter(pk=self.event.pk).update(capacity=6)
+        self.user = get_user_model().objects.get(pk=3)
+        self.client.force_authenticate(self.user)
+        self.expires_at = NOW_MOCKED_VALUE + timedelta(minutes=10)
+
+    @mock.patch("events.holds.hold_seat")
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_hold_seat(self, mocked_now, mocked_hold_seat) -> None:
+        mocked_hold_seat.return_value = self.expires_at
+
+        response = self.client.post(hold_url(self.event.id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["expires_at"], self.expires_at)
+        mocked_hold_seat.assert_called_once_with(
+            event_id=self.event.id,
+            user_id=self.user.id,
+            free_seats=1,
+            now=NOW_MOCKED_VALUE,
+        )
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.participant_count, 5)
+        self.assertFalse(self.event.participants.filter(pk=self.user.pk))
+
+    @mock.patch("events.holds.hold_seat", return_value=None)
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_hold_seat_of_full_event_error(
+        self, mocked_now, mocked_hold_seat
+    ) -> None:
+        response = self.client.post(hold_url(self.event.id))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @mock.patch("events.holds.hold_seat")
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_hold_seat_behind_waitlist_error(
+        self, mocked_now, mocked_hold_seat
+    ) -> None:
+        WaitlistEntry.objects.create(
+            event=self.event, user=get_user_model().objects.get(pk=4)
+        )
+
+        response = self.client.post(hold_url(self.event.id))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        mocked_hold_seat.assert_not_called()
+
+    @mock.patch("events.holds.hold_seat")
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_hold_seat_when_registered_error(
+        self, mocked_now, mocked_hold_seat
+    ) -> None:
+        self.client.force_authenticate(self.event.participants.first())
+
+        response = self.client.post(hold_url(self.event.id))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        mocked_hold_seat.assert_not_called()
+
+    @override_settings(EVENT_SEAT_HOLD_MINUTES=0)
+    @mock.patch("events.holds.get_client")
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_register_without_holds_skips_redis(
+        self, mocked_now, mocked_get_client
+    ) -> None:
+        response = self.client.post(register_url(self.event.id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mocked_get_client.assert_not_called()
+
+    @override_settings(EVENT_SEAT_HOLD_MINUTES=0)
+    def test_holds_disabled_error(self) -> None:
+        for url in (hold_url(self.event.id), confirm_url(self.event.id)):
+            response = self.client.post(url)
+            self.assertEqual(
+                response.status_code, status.HTTP_400_BAD_REQUEST
+            )
+
+    @mock.patch("events.holds.release_hold")
+    @mock.patch("events.holds.get_holds")
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_confirm_registers_held_seat(
+        self, mocked_now, mocked_get_holds, mocked_release
+    ) -> None:
+        mocked_get_holds.return_value = (0, self.expires_at)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(confirm_url(self.event.id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(self.event.participants.filter(pk=self.user.pk))
+        mocked_release.assert_called_once_with(self.event.id, self.user.id)
+        self.assertEqual(
+            get_outbox(self.event.id), [("registration", self.user.id)]
+        )
+
+    @mock.patch("events.holds.release_hold")
+    @mock.patch("events.holds.get_holds")
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_confirm_held_seat_ahead_of_waitlist(
+        self, mocked_now, mocked_get_holds, mocked_release
+    ) -> None:
+        # Users waitlisted after the seat was held
+        WaitlistEntry.objects.create(
+            event=self.event, user=get_user_model().objects.get(pk=4)
+        )
+        mocked_get_holds.return_value = (0, self.expires_at)
+
+        response = self.client.post(confirm_url(self.event.id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(self.event.participants.filter(pk=self.user.pk))
+        self.assertFalse(self.event.waitlist.filter(user=self.user))
+
+    @mock.patch("events.holds.get_holds", return_value=(1, None))
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_confirm_without_hold_error(
+        self, mocked_now, mocked_get_holds
+    ) -> None:
+        response = self.client.post(confirm_url(self.event.id))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(self.event.participants.filter(pk=self.user.pk))
+
+    @mock.patch("events.tasks.promote_waitlisted_participants.apply_async")
+    @mock.patch("events.holds.get_holds", return_value=(1, None))
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_register_does_not_claim_held_seats(
+        self, mocked_now, mocked_get_holds, mocked_promote
+    ) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(register_url(self.event.id))
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertTrue(self.event.waitlist.filter(user=self.user))
+        # Promotes the waitlist once the holds have expired
+        mocked_promote.assert_called_once_with(
+            (self.event.id,), countdown=600
+        )
+
+    @mock.patch("events.holds.get_holds", return_value=(1, None))
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_promote_waitlisted_participants_skips_held_seats(
+        self, mocked_now, mocked_get_holds
+    ) -> None:
+        for user_id in (3, 4):
+            WaitlistEntry.objects.create(
+                event=self.event, user=get_user_model().objects.get(pk=user_id)
+            )
+        Event.objects.filter(pk=self.event.pk).update(capacity=7)
+
+        promoted = promote_waitlisted_participants(self.event.id)
+
+        self.assertEqual(promoted, 1)
+        self.assertEqual(self.event.waitlist.count(), 1)
+
+
+class BufferedRegistrationTests(TestCase):
+    fixtures = ["events/tests/fixtures/events_data.json"]
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        # Upcoming event with 5 participants and one free seat
+        self.event = Event.objects.get(pk=6)
+        Event.objects.filter(pk=self.event.pk).update(capacity=6)
+        self.user = get_user_model().objects.get(pk=3)
+        self.client.force_authenticate(self.user)
+
+    @override_settings(EVENT_REGISTRATION_MODE="buffered")
+    @mock.patch("events.buffer.enqueue_registration", return_value=True)
+    def test_register_accepts_request_without_queries(
+        self, mocked_enqueue
+    ) -> None:
+        with self.assertNumQueries(0):
+            response = self.client.post(register_url(self.event.id))
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertTrue(
+            response.data["status_url"].endswith(
+                registration_status_url(self.event.id)
+            )
+        )
+        mocked_enqueue.assert_called_once_with(self.event.id, self.user.id)
+
+    @mock.patch("events.buffer.get_status")
+    def test_registration_status(self, mocked_get_status) -> None:
+        mocked_get_status.return_value = {
+            "status": "pending",
+            "detail": None,
+        }
+
+        response = self.client.get(registration_status_url(self.event.id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], "pending")
+        mocked_get_status.assert_called_once_with(
+            self.event.id, self.user.id
+        )
+
+    @mock.patch("events.buffer.get_status", return_value=None)
+    def test_registration_status_without_request(
+        self, mocked_get_status
+    ) -> None:
+        response = self.client.get(registration_status_url(self.event.id))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_apply_registrations(self, mocked_now) -> None:
+        rows = Event.objects.apply_registrations(
+            [
+                (self.event.id, 3),
+                (self.event.id, 4),
+                (self.event.id, 3),
+                (self.event.id, self.event.organizer_id),
+                (5, 3),
+                (999, 3),
+            ],
+            now=NOW_MOCKED_VALUE,
+        )
+
+        self.assertTrue(rows[0]["inserted"])
+        self.assertTrue(rows[1]["waitlisted"])
+        self.assertTrue(rows[2]["registered"])
+        self.assertTrue(rows[3]["is_organizer"])
+        self.assertTrue(rows[4]["started"])
+        self.assertIsNone(rows[5])
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.participant_count, 6)
+        self.assertEqual(self.event.participants.count(), 6)
+        self.assertEqual(
+            list(self.event.waitlist.values_list("user_id", flat=True)), [4]
+        )
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_apply_registrations_with_held_seats(self, mocked_now) -> None:
+        rows = Event.objects.apply_registrations(
+            [(self.event.id, 3)],
+            now=NOW_MOCKED_VALUE,
+            reserved={self.event.id: 1},
+        )
+
+        self.assertTrue(rows[0]["waitlisted"])
+        self.assertFalse(self.event.participants.filter(pk=3).exists())
+
+    @mock.patch("events.buffer.complete_registrations")
+    @mock.patch("events.buffer.read_registrations")
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_apply_buffered_registrations(
+        self, mocked_now, mocked_read, mocked_complete
+    ) -> None:
+        mocked_read.return_value = [
+            ("1-0", self.event.id, 3),
+            ("2-0", self.event.id, 4),
+            ("3-0", 999, 3),
+        ]
+
+        applied = apply_buffered_registrations()
+
+        self.assertEqual(applied, 3)
+        self.assertTrue(self.event.participants.filter(pk=3).exists())
+        self.assertEqual(
+            get_outbox(self.event.id), [("registration", self.user.id)]
+        )
+
+        entry_ids, statuses = mocked_complete.call_args.args
+        self.assertEqual(entry_ids, ["1-0", "2-0", "3-0"])
+        self.assertEqual(
+            {key: result for key, (result, _) in statuses.items()},
+            {
+                (self.event.id, 3): "registered",
+                (self.event.id, 4): "waitlisted",
+                (999, 3): "rejected",
+            },
+        )
+
+    @mock.patch("events.buffer.complete_registrations")
+    @mock.patch("events.buffer.read_registrations", return_value=[])
+    def test_apply_buffered_registrations_without_requests(
+        self, mocked_read, mocked_complete
+    ) -> None:
+        with self.assertNumQueries(0):
+            applied = apply_buffered_registrations()
+
+        self.assertEqual(applied, 0)
+        mocked_complete.assert_not_called()
+
+
+@mock.patch("events.mail._pool", None)
+class EmailConnectionPoolTests(TestCase):
+    def setUp(self) -> None:
+        self.message = mail.EmailMessage(subject="Subject", to=["a@a.com"])
+
+    def test_send_individual_messages_reuses_connection(self) -> None:
+        with mock.patch(
+            "events.mail.get_connection", wraps=mail.get_connection
+        ) as mocked_get_connection:
+            for _ in range(2):
+                send_individual_messages([self.message])
+
+        mocked_get_connection.assert_called_once()
+        self.assertEqual(len(mail.outbox), 2)
+
+    @mock.patch("events.mail.get_connection")
+    def test_reconnect_after_disconnect(self, mocked_get_connection) -> None:
+        dropped, reopened = mock.MagicMock(), mock.MagicMock()
+        dropped.send_messages.side_effect = smtplib.SMTPServerDisconnected
+        reopened.send_messages.return_value = 1
+        mocked_get_connection.side_effect = [dropped, reopened]
+        pool = ConnectionPool(size=1, keepalive=30)
+
+        self.assertEqual(pool.send_messages([self.message]), 1)
+
+        dropped.close.assert_called_once()
+        self.assertIs(pool.acquire(), reopened)
+
+    @mock.patch("events.mail.get_connection")
+    def test_idle_connection_checked_before_reuse(
+        self, mocked_get_connection
+    ) -> None:
+        stale, fresh = mock.MagicMock(), mock.MagicMock()
+        stale.connection.noop.side_effect = smtplib.SMTPServerDisconnected
+        fresh.connection.noop.return_value = (250, b"OK")
+        mocked_get_connection.side_effect = [fresh]
+        pool = ConnectionPool(size=2, keepalive=0)
+        pool.release(fresh)
+        pool.release(stale)
+
+        self.assertIs(pool.acquire(), fresh)
+        stale.close.assert_called_once()
+        mocked_get_connection.assert_not_called()
+
+    def test_benchmark_sends_all_messages(self) -> None:
+        out = StringIO()
+        call_command(
+            "benchmark_email_connections",
+            messages=3,
+            handshake_ms=0,
+            stdout=out,
+        )
+
+        self.assertIn("Pooled connection", out.getvalue())
+        self.assertIn("Messages received: 6", out.getvalue())
+
+
+class NotificationTests(TestCase):
+    fixtures = ["events/tests/fixtures/events_data.json"]
+
+    def setUp(self) -> None:
+        # Event with 7 participants
+        self.event = Event.objects.get(pk=4)
+        self.users = list(get_user_model().objects.order_by("pk")[:3])
+        cache.clear()
+
+    def collect_chunks(self, mocked_group) -> list[list[int]]:
+        chunks = []
+        mocked_group.side_effect = lambda signatures: mock.Mock(
+            apply_async=lambda: chunks.extend(
+                signature.kwargs["user_ids"] for signature in signatures
+            )
+        )
+        return chunks
+
+    @override_settings(EVENT_NOTIFICATION_CHUNK_SIZE=3)
+    @mock.patch("events.tasks.group")
+    def test_notify_event_update_fans_out_chunks(self, mocked_group) -> None:
+        chunks = self.collect_chunks(mocked_group)
+
+        notify_event_update(self.event.id)
+
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 3, 1])
+        self.assertEqual(
+            sorted(user_id for chunk in chunks for user_id in chunk),
+            sorted(self.event.participants.values_list("pk", flat=True)),
+        )
+
+    @mock.patch("events.tasks.group")
+    def test_notify_missing_event_update(self, mocked_group) -> None:
+        chunks = self.collect_chunks(mocked_group)
+
+        notify_event_update(999)
+
+        self.assertEqual(chunks, [])
+
+    @mock.patch("events.mail._pool", None)
+    def test_send_notification_over_one_connection(self) -> None:
+        with mock.patch(
+            "events.mail.get_connection", wraps=mail.get_connection
+        ) as mocked_get_connection:
+            sent = send_notification(
+                template="update",
+                event_id=self.event.id,
+                user_ids=[user.pk for user in self.users],
+            )
+
+        self.assertEqual(sent, 3)
+        mocked_get_connection.assert_called_once()
+        self.assertEqual(
+            [message.to for message in mail.outbox],
+            [[user.email] for user in self.users],
+        )
+        message = mail.outbox[0]
+        self.assertEqual(
+            message.subject, f"Event {self.event.title} was updated"
+        )
+        self.assertIn(f"Location: {self.event.location}", message.body)
+        self.assertNotIn("<", message.body)
+        self.assertEqual(message.alternatives[0][1], "text/html")
+
+    @mock.patch("events.mail._pool", None)
+    def test_send_notification_escapes_html(self) -> None:
+        Event.objects.filter(pk=self.event.pk).update(title="<b>Party</b>")
+
+        send_notification(
+            template="registration",
+            event_id=self.event.id,
+            user_ids=[self.users[0].pk],
+        )
+
+        message = mail.outbox[0]
+        self.assertIn("<b>Party</b>", message.body)
+        self.assertIn("&lt;b&gt;Party&lt;/b&gt;", message.alternatives[0][0])
+
+    @mock.patch("events.mail._pool", None)
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_event_fragment_cached_per_version(self, mocked_now) -> None:
+        user_ids = [self.users[0].pk]
+        send_notification(
+            template="update", event_id=self.event.id, user_ids=user_ids
+        )
+
+        # The users query only
+        with self.assertNumQueries(1):
+            send_notification(
+                template="update", event_id=self.event.id, user_ids=user_ids
+            )
+
+        self.event.title = "Renamed"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.event.save(update_fields=["title"])
+        send_notification(
+            template="update", event_id=self.event.id, user_ids=user_ids
+        )
+
+        self.assertEqual(mail.outbox[-1].subject, "Event Renamed was updated")
+
+    def test_send_notification_of_missing_event(self) -> None:
+        sent = send_notification(
+            template="update", event_id=999, user_ids=[self.users[0].pk]
+        )
+
+        self.assertEqual(sent, 0)
+        self.assertEqual(len(mail.outbox), 0)
+
+    @mock.patch("events.mail._pool", None)
+    @mock.patch("events.mail.get_connection")
+    def test_refused_recipient_does_not_stop_others(
+        self, mocked_get_connection
+    ) -> None:
+        mocked_get_connection.return_value.send_messages.side_effect = [
+            1,
+            smtplib.SMTPRecipientsRefused({"b@b.com": (550, b"Unknown")}),
+            1,
+        ]
+
+        sent = send_notification(
+            template="update",
+            event_id=self.event.id,
+            user_ids=[user.pk for user in self.users],
+        )
+
+        self.assertEqual(sent, 2)
+
+class OutboxTests(TestCase):
+    fixtures = ["events/tests/fixtures/events_data.json"]
+
+    def setUp(self) -> None:
+        self.event = Event.objects.get(pk=4)
+        self.other_event = Event.objects.get(pk=8)
+        OutboxNotification.objects.bulk_create(
+            [
+                OutboxNotification(
+                    template="registration", event=self.event, user_id=3
+                ),
+                OutboxNotification(template="update", event=self.event),
+                OutboxNotification(
+                    template="registration", event=self.event, user_id=4
+                ),
+                OutboxNotification(
+                    template="cancel_registration",
+                    event=self.other_event,
+                    user_id=3,
+                ),
+                OutboxNotification(template="update", event=self.event),
+            ]
+        )
+
+    @mock.patch("events.tasks.notify_event_update.delay")
+    @mock.patch("events.tasks.send_notification.delay")
+    def test_dispatch_notifications(
+        self, mocked_send_notification, mocked_notify
+    ) -> None:
+        dispatched = dispatch_notifications(batch_size=10)
+
+        self.assertEqual(dispatched, 5)
+        self.assertFalse(OutboxNotification.objects.exists())
+        self.assertEqual(
+            [call.kwargs for call in mocked_send_notification.call_args_list],
+            [
+                {
+                    "template": "registration",
+                    "event_id": self.event.id,
+                    "user_ids": [3, 4],
+                },
+                {
+                    "template": "cancel_registration",
+                    "event_id": self.other_event.id,
+                    "user_ids": [3],
+                },
+            ],
+        )
+        mocked_notify.assert_called_once_with(self.event.id)
+
+    @mock.patch("events.tasks.notify_event_update.delay")
+    @mock.patch("events.tasks.send_notification.delay")
+    def test_dispatch_notifications_in_batches(
+        self, mocked_send_notification, mocked_notify
+    ) -> None:
+        # The second update of the event is coalesced with the batch
+        self.assertEqual(dispatch_notifications(batch_size=2), 3)
+
+        mocked_send_notification.assert_called_once_with(
+            template="registration", event_id=self.event.id, user_ids=[3]
+        )
+        mocked_notify.assert_called_once_with(self.event.id)
+        self.assertEqual(OutboxNotification.objects.count(), 2)
+
+    @mock.patch("events.tasks.notify_event_update.delay")
+    @mock.patch("events.tasks.send_notification.delay")
+    def test_failed_publishing_keeps_notifications(
+        self, mocked_send_notification, mocked_notify
+    ) -> None:
+        mocked_notify.side_effect = ConnectionError
+
+        with self.assertRaises(ConnectionError):
+            dispatch_notifications(batch_size=10)
+
+        self.assertEqual(OutboxNotification.objects.count(), 5)
+
+    @mock.patch("events.tasks.notify_event_update.delay")
+    @mock.patch("events.tasks.send_notification.delay")
+    def test_dispatch_notifications_command(
+        self, mocked_send_notification, mocked_notify
+    ) -> None:
+        out = StringIO()
+
+        call_command(
+            "dispatch_notifications", "--once", "--batch-size=2", stdout=out
+        )
+
+        self.assertFalse(OutboxNotification.objects.exists())
+        self.assertIn("Dispatched 2 notifications", out.getvalue())
+
+
+@override_settings(EVENT_NOTIFICATION_COALESCE_SECONDS=30)
+class NotificationDigestTests(TestCase):
+    fixtures = ["events/tests/fixtures/events_data.json"]
+
+    def setUp(self) -> None:
+        self.event = Event.objects.get(pk=4)
+        self.other_event = Event.objects.get(pk=6)
+        self.users = list(get_user_model().objects.order_by("pk")[:3])
+        get_user_model().objects.filter(
+            pk__in=[user.pk for user in self.users[1:]]
+        ).update(notification_mode="digest")
+        cache.clear()
+
+    def collect_chunks(self, mocked_group) -> list[list[int]]:
+        chunks = []
+        mocked_group.side_effect = lambda signatures: mock.Mock(
+            apply_async=lambda: chunks.extend(
+                signature.kwargs["user_ids"] for signature in signatures
+            )
+        )
+        return chunks
+
+    def test_send_notification_logs_digest_users(self) -> None:
+        sent = send_notification(
+            template="update",
+            event_id=self.event.id,
+            user_ids=[user.pk for user in self.users],
+        )
+
+        self.assertEqual(sent, 1)
+        self.assertEqual(mail.outbox[0].to, [self.users[0].email])
+        self.assertEqual(
+            list(
+                NotificationLog.objects.values_list(
+                    "template", "event_id", "user_id"
+                )
+            ),
+            [("update", self.event.id, user.pk) for user in self.users[1:]],
+        )
+
+    @override_settings(EVENT_NOTIFICATION_CHUNK_SIZE=1)
+    @mock.patch("events.tasks.group")
+    def test_send_notification_digests(self, mocked_group) -> None:
+        chunks = self.collect_chunks(mocked_group)
+        NotificationLog.objects.bulk_create(
+            [
+                NotificationLog(
+                    template="registration",
+                    event=self.other_event,
+                    user=self.users[1],
+                ),
+                NotificationLog(
+                    template="update", event=self.event, user=self.users[1]
+                ),
+                NotificationLog(
+                    template="update", event=self.event, user=self.users[1]
+                ),
+                NotificationLog(
+                    template="update", event=self.event, user=self.users[2]
+                ),
+            ]
+        )
+
+        # Only the users with logged notifications are read
+        with self.assertNumQueries(1):
+            digests = send_notification_digests()
+
+        self.assertEqual(digests, 2)
+        self.assertEqual(
+            chunks, [[self.users[1].pk], [self.users[2].pk]]
+        )
+        self.assertEqual(NotificationLog.objects.count(), 4)
+
+        sent = sum(send_digests(user_ids=chunk) for chunk in chunks)
+
+        self.assertEqual(sent, 2)
+        self.assertFalse(NotificationLog.objects.exists())
+        self.assertEqual(
+            [message.to for message in mail.outbox],
+            [[self.users[1].email], [self.users[2].email]],
+        )
+        self.assertEqual(mail.outbox[0].subject, "Your events of the day")
+        body = mail.outbox[0].body
+        self.assertIn(f"Dear {self.users[1].username},", body)
+        self.assertLess(
+            body.index(f"You are registered at {self.other_event.title}"),
+            body.index(f"{self.event.title} was updated"),
+        )
+        # Repeated updates of the event are listed once
+        self.assertEqual(body.count(f"{self.event.title} was updated"), 1)
+
+    def test_reminders_are_not_digested(self) -> None:
+        sent = send_notification(
+            template="reminder",
+            event_id=self.event.id,
+            user_ids=[self.users[1].pk],
+        )
+
+        self.assertEqual(sent, 1)
+        self.assertFalse(NotificationLog.objects.exists())
+
+    @mock.patch("events.mail._pool", None)
+    @mock.patch("events.mail.get_connection")
+    def test_failed_digests_keep_log(self, mocked_get_connection) -> None:
+        mocked_get_connection.return_value.send_messages.side_effect = (
+            smtplib.SMTPServerDisconnected
+        )
+        NotificationLog.objects.create(
+            template="update", event=self.event, user=self.users[1]
+        )
+
+        result = send_digests.apply(
+            kwargs={"user_ids": [self.users[1].pk]}
+        )
+
+        self.assertTrue(result.failed())
+        self.assertEqual(NotificationLog.objects.count(), 1)
+
+    @mock.patch("events.mail._pool", None)
+    @mock.patch("events.mail.get_connection")
+    def test_interrupted_digests_retried_for_unsent_users(
+        self, mocked_get_connection
+    ) -> None:
+        send_messages = mocked_get_connection.return_value.send_messages
+        send_messages.side_effect = [
+            1,
+            smtplib.SMTPServerDisconnected,
+            smtplib.SMTPServerDisconnected,
+        ]
+        for user in self.users[1:]:
+            NotificationLog.objects.create(
+                template="update", event=self.event, user=user
+            )
+
+        with mock.patch.object(send_digests, "retry") as mocked_retry:
+            mocked_retry.side_effect = Retry
+            with self.assertRaises(Retry):
+                send_digests(user_ids=[user.pk for user in self.users[1:]])
+
+        self.assertEqual(
+            mocked_retry.call_args.kwargs["kwargs"],
+            {"user_ids": [self.users[2].pk]},
+        )
+        # The log of the user sent the digest is deleted
+        self.assertEqual(
+            list(NotificationLog.objects.values_list("user_id", flat=True)),
+            [self.users[2].pk],
+        )
+
+    def test_digests_keep_notifications_of_other_users(self) -> None:
+        for user in self.users[1:]:
+            NotificationLog.objects.create(
+                template="update", event=self.event, user=user
+            )
+
+        sent = send_digests(user_ids=[self.users[1].pk])
+
+        self.assertEqual(sent, 1)
+        self.assertEqual(
+            list(NotificationLog.objects.values_list("user_id", flat=True)),
+            [self.users[2].pk],
+        )
+
+    def test_digest_escapes_html(self) -> None:
+        Event.objects.filter(pk=self.event.pk).update(title="<b>Launch</b>")
+        NotificationLog.objects.create(
+            template="update", event=self.event, user=self.users[1]
+        )
+
+        send_digests(user_ids=[self.users[1].pk])
+
+        html = mail.outbox[0].alternatives[0][0]
+        self.assertIn("&lt;b&gt;Launch&lt;/b&gt; was updated", html)
+        self.assertIn("<b>Launch</b> was updated", mail.outbox[0].body)
+
+
+@override_settings(EVENT_NOTIFICATION_COALESCE_SECONDS=30)
+class NotificationCoalescingTests(TestCase):
+    fixtures = ["events/tests/fixtures/events_data.json"]
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        # Upcoming event without capacity
+        self.event = Event.objects.get(pk=6)
+        self.user = get_user_model().objects.get(pk=3)
+        self.client.force_authenticate(self.user)
+        self.dispatched_at = NOW_MOCKED_VALUE + timedelta(seconds=30)
+
+    def dispatch(self, at: datetime) -> int:
+        with mock.patch("django.utils.timezone.now", return_value=at):
+            return dispatch_notifications(batch_size=10)
+
+    @mock.patch("events.tasks.send_notification.delay")
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_notifications_held_for_coalesce_window(
+        self, mocked_now, mocked_send_notification
+    ) -> None:
+        self.client.post(register_url(self.event.id))
+
+        self.assertEqual(
+            self.dispatch(self.dispatched_at - timedelta(seconds=1)), 0
+        )
+        self.assertEqual(self.dispatch(self.dispatched_at), 1)
+        mocked_send_notification.assert_called_once_with(
+            template="registration",
+            event_id=self.event.id,
+            user_ids=[self.user.id],
+        )
+
+    @mock.patch("events.tasks.send_notification.delay")
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_registration_changes_collapse_to_net_state(
+        self, mocked_now, mocked_send_notification
+    ) -> None:
+        for urls, expected_calls in [
+            # Registered and unregistered, as before
+            ([register_url, unregister_url], []),
+            (
+                [register_url, unregister_url, register_url],
+                [
+                    mock.call(
+                        template="registration",
+                        event_id=self.event.id,
+                        user_ids=[self.user.id],
+                    )
+                ],
+            ),
+        ]:
+            with self.subTest(urls=urls):
+                self.event.participants.remove(self.user)
+                mocked_send_notification.reset_mock()
+                for url in urls:
+                    self.client.post(url(self.event.id))
+
+                self.assertEqual(
+                    self.dispatch(self.dispatched_at), len(urls)
+                )
+                self.assertEqual(
+                    mocked_send_notification.call_args_list, expected_calls
+                )
+                self.assertFalse(OutboxNotification.objects.exists())
+
+    @mock.patch("events.tasks.notify_event_update.delay")
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_updates_collapse_to_one_notification(
+        self, mocked_now, mocked_notify
+    ) -> None:
+        self.client.force_authenticate(self.event.organizer)
+        for location in ["Room A", "Room B", "Room C"]:
+            response = self.client.patch(
+                detail_url(self.event.id), {"location": location}
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(self.dispatch(self.dispatched_at), 3)
+        mocked_notify.assert_called_once_with(self.event.id)
+
+
+@override_settings(
+    EVENT_REMINDER_LEAD_MINUTES=3 * 24 * 60, EVENT_REMINDER_BATCH_SIZE=1
+)
+class EventReminderTests(TestCase):
+    fixtures = ["events/tests/fixtures/events_data.json"]
+
+    def setUp(self) -> None:
+        # Upcoming events within the lead time, starting first
+        self.event = Event.objects.get(pk=4)
+        self.other_event = Event.objects.get(pk=6)
+
+    def get_reminded(self) -> set[tuple[int, int]]:
+        return set(
+            OutboxNotification.objects.filter(template="reminder")
+            .values_list("event_id", "user_id")
+        )
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_send_event_reminders(self, mocked_now) -> None:
+        # A batch of one event per statement and the last, empty one
+        with self.assertNumQueries(3):
+            reminders = send_event_reminders()
+
+        self.assertEqual(reminders, 12)
+        self.assertEqual(
+            self.get_reminded(),
+            {
+                (event.id, user_id)
+                for event in (self.event, self.other_event)
+                for user_id in event.participants.values_list(
+                    "id", flat=True
+                )
+            },
+        )
+        self.assertEqual(
+            set(
+                Event.objects.filter(
+                    reminder_sent_at__isnull=False
+                ).values_list("id", flat=True)
+            ),
+            {self.event.id, self.other_event.id},
+        )
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_reminders_are_not_repeated(self, mocked_now) -> None:
+        send_event_reminders()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(send_event_reminders(), 0)
+        self.assertEqual(
+            OutboxNotification.objects.filter(template="reminder").count(),
+            12,
+        )
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_stale_save_keeps_claimed_reminder(self, mocked_now) -> None:
+        # Loaded before the reminders are claimed, saved after
+        stale_event = Event.objects.get(pk=self.event.pk)
+        send_event_reminders()
+
+        stale_event.description = "Updated description"
+        stale_event.save()
+
+        self.assertEqual(send_event_reminders(), 0)
+        self.event.refresh_from_db()
+        self.assertIsNotNone(self.event.reminder_sent_at)
+
+    @mock.patch("django.utils.timezone.now", return_value=NOW_MOCKED_VALUE)
+    def test_start_time_change_resets_reminder(self, mocked_now) -> None:
+        send_event_reminders()
+        client = APIClient()
+        client.force_authenticate(self.event.organizer)
+
+        response = client.patch(
+            detail_url(self.event.id),
+            {"start_time": "2024-12-13 15:00", "end_time": "2024-12-13 17:00"},
+        )
+        self.event.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(self.event.reminder_sent_at)
+
+    @mock.patch("events.tasks.send_bulk_notification.delay")
+    @mock.patch("events.tasks.send_notification.delay")
+    def test_reminders_are_not_coalesced_with_registration(
+        self, mocked_send_notification, mocked_send_bulk_notification
+    ) -> None:
+        OutboxNotification.objects.bulk_create(
+            OutboxNotification(template=template, event=self.event, user_id=3)
+            for template in ("registration", "reminder")
+        )
+
+        dispatch_notifications(batch_size=10)
+
+        # Reminders are sent through the bulk queue
+        mocked_send_bulk_notification.assert_called_once_with(
+            template="reminder", event_id=self.event.id, user_ids=[3]
+        )
+        mocked_send_notification.assert_called_once_with(
+            template="registration", event_id=self.event.id, user_ids=[3]
+        )
+
+
+class ConcurrentOutboxTests(TransactionTestCase):
+    fixtures = ["events/tests/fixtures/events_data.json"]
+
+    @mock.patch("events.tasks.notify_event_update.delay")
+    @mock.patch("events.tasks.send_notification.delay")
+    def test_dispatchers_skip_locked_notifications(
+        self, mocked_send_notification, mocked_notify
+    ) -> None:
+        OutboxNotification.objects.bulk_create(
+            OutboxNotification(
+                template="registration", event_id=4, user_id=user_id
+            )
+            for user_id in (3, 4)
+        )
+        locked, released = threading.Event(), threading.Event()
+
+        def lock_first_notification() -> None:
+            try:
+                with transaction.atomic():
+                    list(
+                        OutboxNotification.objects.select_for_update()
+                        .order_by("id")[:1]
+                    )
+                    locked.set()
+                    released.wait(timeout=10)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=lock_first_notification)
+        thread.start()
+        locked.wait(timeout=10)
+        try:
+            dispatched = dispatch_notifications(batch_size=10)
+        finally:
+            released.set()
+            thread.join()
+
+        self.assertEqual(dispatched, 1)
+        mocked_send_notification.assert_called_once_with(
+            template="registration", event_id=4, user_ids=[4]
+        )
+        self.assertEqual(
+            list(OutboxNotification.objects.values_list("user_id", flat=True)),
+            [3],
+        )
+
+
+class TaskRoutingTests(TestCase):
+    fixtures = ["events/tests/fixtures/events_data.json"]
+
+    def test_email_tasks_routes(self) -> None:
+        for name, queue, priority in [
+            ("events.tasks.send_notification", "transactional", 0),
+            ("events.tasks.send_bulk_notification", "bulk", 3),
+            ("events.tasks.notify_event_update", "bulk", 3),
+            ("events.tasks.send_digests", "bulk", 9),
+            ("events.tasks.reconcile_participant_counts", "celery", None),
+        ]:
+            with self.subTest(name=name):
+                options = celery_app.amqp.router.route({}, name)
+
+                self.assertEqual(options["queue"].name, queue)
+                self.assertEqual(options.get("priority"), priority)
+
+    @mock.patch("events.mail._pool", None)
+    @mock.patch("events.mail.get_connection")
+    def test_send_notification_retried_while_disconnected(
+        self, mocked_get_connection
+    ) -> None:
+        mocked_get_connection.return_value.send_messages.side_effect = [
+            smtplib.SMTPServerDisconnected,
+            smtplib.SMTPServerDisconnected,
+            1,
+        ]
+
+        result = send_notification.apply(
+            kwargs={"template": "update", "event_id": 4, "user_ids": [1]}
+        )
+
+        self.assertTrue(result.successful())
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(
+            mocked_get_connection.return_value.send_messages.call_count, 3
+        )
+
+    @mock.patch("events.mail._pool", None)
+    @mock.patch("events.mail.get_connection")
+    def test_retry_sends_only_unsent_messages(
+        self, mocked_get_connection
+    ) -> None:
+        send_messages = mocked_get_connection.return_value.send_messages
+        # The second message fails on the pooled and the new connection
+        send_messages.side_effect = [
+            1,
+            smtplib.SMTPServerDisconnected,
+            smtplib.SMTPServerDisconnected,
+            1,
+        ]
+        users = list(get_user_model().objects.order_by("pk")[:2])
+
+        result = send_notification.apply(
+            kwargs={
+                "template": "update",
+                "event_id": 4,
+                "user_ids": [user.pk for user in users],
+            }
+        )
+
+        self.assertTrue(result.successful())
+        self.assertEqual(
+            [call.args[0][0].to for call in send_messages.call_args_list],
+            [[users[0].email]] + [[users[1].email]] * 3,
+        )
+
+    def test_only_rerunnable_tasks_acknowledged_late(self) -> None:
+        for task, acks_late in [
+            (send_notification, False),
+            (send_bulk_notification, False),
+            (send_digests, False),
+            (notify_event_update, False),
+            (send_notification_digests, False),
+            (reconcile_participant_counts, True),
+            (promote_waitlisted_participants, True),
+            (apply_buffered_registrations, True),
+            (send_event_reminders, True),
+        ]:
+            with self.subTest(task=task.name):
+                self.assertEqual(task.acks_late, acks_late)
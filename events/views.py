@@ -1,42 +1,58 @@
+import hashlib
+from datetime import datetime
+
 import django.utils.timezone
 import django.core.mail
 from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
 from django.db.models import QuerySet
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.permissions import (
     IsAuthenticatedOrReadOnly,
     IsAuthenticated,
 )
 from rest_framework.request import Request
 from rest_framework.response import Response
+from rest_framework.reverse import reverse
 
-from email_templates.event_registration_template import (
-    REGISTRATION_HTML_CONTENT,
-)
-from email_templates.event_cancel_registration_template import (
-    CANCEL_REGISTRATION_HTML_CONTENT,
-)
-from email_templates.event_update_template import UPDATE_HTML_CONTENT
+import events.buffer
+import events.cache
+import events.holds
+import events.notifications
 from events.filters import EventFilter
-from events.models import Event
+from events.models import (
+    Event,
+    OutboxNotification,
+    REJECTED,
+    WAITLISTED,
+)
 from events.permissions import IsOrganizerOrReadOnly
 from events.schemas.events import event_schema
 from events.serializers import (
+    BULK_CREATE_MAX_EVENTS,
     EventSerializer,
     EventListSerializer,
     EventCreateUpdateSerializer,
     EventRetrieveSerializer,
+    EventBulkCreateSerializer,
 )
 import events.tasks
 
 
 @event_schema
 class EventViewSet(viewsets.ModelViewSet):
-    queryset = Event.objects.all()
+    # The search vector is only used in WHERE clauses
+    queryset = Event.objects.defer("search_vector")
     serializer_class = EventSerializer
     permission_classes = [IsAuthenticatedOrReadOnly, IsOrganizerOrReadOnly]
     filterset_class = EventFilter
+    not_found_message = "No Event matches the given query."
 
     def get_serializer_class(self) -> type[EventSerializer]:
         if self.action == "list":
@@ -45,21 +61,187 @@ class EventViewSet(viewsets.ModelViewSet):
             return EventRetrieveSerializer
         if self.action in ["create", "update", "partial_update"]:
             return EventCreateUpdateSerializer
+        if self.action == "bulk_create":
+            return EventBulkCreateSerializer
         return self.serializer_class
 
+    def get_event_id(self) -> int:
+        try:
+            return int(self.kwargs[self.lookup_url_kwarg or self.lookup_field])
+        except ValueError:
+            raise NotFound(self.not_found_message)
+
     def get_queryset(self) -> QuerySet:
-        if self.action in ["list", "retrieve"]:
+        if self.action == "list":
+            # Only the number of participants is listed, read from the counter
+            self.queryset = self.queryset.select_related("organizer")
+        if self.action == "retrieve":
             self.queryset = self.queryset.select_related(
                 "organizer"
             ).prefetch_related("participants")
         return self.queryset
 
+    def get_validators(
+        self,
+        request: Request,
+        event_id: str | None = None,
+    ) -> tuple[str, datetime | None] | None:
+        """
+        Computes the ETag and Last-Modified of the response without
+        fetching and serializing events.
+        Lists are only validated by ETag, from the list generation (see
+        events.cache) bumped on every change, and a coarse time bucket,
+        as events becoming past reorder them without any change. Events
+        are validated by their updated_at, with one indexed query.
+        """
+        if event_id is not None:
+            queryset = self.filter_queryset(self.get_queryset())
+            try:
+                last_modified = (
+                    queryset.filter(pk=event_id)
+                    .values_list("updated_at", flat=True)
+                    .order_by()
+                    .first()
+                )
+            except (TypeError, ValueError, DjangoValidationError):
+                return None
+            if last_modified is None:
+                return None
+            state = [last_modified]
+        else:
+            last_modified = None
+            # Changes when upcoming events become past, a bucket late at most
+            time_bucket = int(django.utils.timezone.now().timestamp()) // (
+                events.cache.get_list_validator_bucket_seconds()
+            )
+            state = events.cache.get_generations(
+                events.cache.LIST_GENERATION_KEY
+            ) + [time_bucket]
+            # Responses of the user-dependent filters differ per user
+            if any(
+                name in events.cache.USER_FILTERS
+                for name in request.query_params
+            ):
+                state.append(request.user.pk)
+
+        # Usernames and emails are part of the responses too
+        users_generation = events.cache.get_generations(
+            events.cache.USERS_GENERATION_KEY
+        )[0]
+        etag = hashlib.md5(
+            repr(
+                (
+                    request.get_full_path(),
+                    request.accepted_media_type,
+                    users_generation,
+                    state,
+                )
+            ).encode()
+        ).hexdigest()
+        return etag, last_modified
+
+    @staticmethod
+    def set_validators(
+        response: Response,
+        validators: tuple[str, datetime | None],
+    ) -> Response:
+        etag, last_modified = validators
+        response.headers["ETag"] = quote_etag(etag)
+        if last_modified is not None:
+            response.headers["Last-Modified"] = http_date(
+                last_modified.timestamp()
+            )
+        return response
+
+    def get_cached_response(
+        self,
+        get_response,
+        request: Request,
+        *args,
+        **kwargs,
+    ) -> Response:
+        """
+        Answers conditional requests with 304 Not Modified and serves
+        the response data from the cache, see events.cache.
+        Cache entries keep the validators of their data, so cache hits
+        answer conditional requests without queries.
+        """
+        event_id = kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        timeout = events.cache.get_response_cache_timeout()
+        cache_key, entry = None, None
+        if timeout:
+            cache_key = events.cache.get_response_cache_key(
+                request,
+                variant=(
+                    f"{self.action}:{self.get_serializer_class().__name__}"
+                ),
+                event_id=event_id,
+            )
+            entry = cache.get(cache_key)
+
+        if entry is None:
+            validators = self.get_validators(request, event_id)
+        else:
+            data, validators = entry
+
+        if validators is not None:
+            etag, last_modified = validators
+            if get_conditional_response(
+                request,
+                etag=quote_etag(etag),
+                last_modified=(
+                    int(last_modified.timestamp()) if last_modified else None
+                ),
+            ):
+                return self.set_validators(
+                    Response(status=status.HTTP_304_NOT_MODIFIED),
+                    validators,
+                )
+
+        if entry is not None:
+            return self.set_validators(Response(data), validators)
+
+        response = get_response(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK and validators:
+            self.set_validators(response, validators)
+            if timeout:
+                cache.set(cache_key, (response.data, validators), timeout)
+        return response
+
+    def list(self, request: Request, *args, **kwargs) -> Response:
+        return self.get_cached_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request: Request, *args, **kwargs) -> Response:
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
     def perform_create(self, serializer: EventCreateUpdateSerializer):
         serializer.save(organizer=self.request.user)
 
+    @transaction.atomic
     def perform_update(self, serializer: EventCreateUpdateSerializer):
         event = self.get_object()
         updated_event = serializer.save()
+        if updated_event.start_time != event.start_time:
+            # Participants are reminded of the new start time
+            updated_event.reminder_sent_at = None
+            Event.objects.filter(pk=updated_event.pk).update(
+                reminder_sent_at=None
+            )
+
+        # Give the added seats to waitlisted users
+        if event.capacity is not None and (
+            updated_event.capacity is None
+            or updated_event.capacity > event.capacity
+        ):
+            transaction.on_commit(
+                lambda: events.tasks.promote_waitlisted_participants.delay(
+                    updated_event.id
+                )
+            )
 
         # Check if start_time, end_time, or location have changed
         if (
@@ -67,27 +249,106 @@ class EventViewSet(viewsets.ModelViewSet):
             or updated_event.end_time != event.end_time
             or updated_event.location != event.location
         ):
-            # Sending email about update
-            subject = f"Event {event.title} was updated"
-            message = UPDATE_HTML_CONTENT.format(
-                event=updated_event.title,
-                start_time=updated_event.start_time.strftime("%d %b %Y %H:%M"),
-                end_time=updated_event.end_time.strftime("%d %b %Y %H:%M"),
-                location=updated_event.location,
-                organizer_email=updated_event.organizer.email,
-            )
-            participant_emails = list(
-                updated_event.participants.values_list(
-                    "email",
-                    flat=True,
+            # Emails about the update are committed with it and coalesced
+            # with the next updates, participants are read by the task
+            now = django.utils.timezone.now()
+            OutboxNotification.objects.create(
+                template=events.notifications.UPDATE,
+                event=updated_event,
+                created_at=now,
+                available_at=now + events.notifications.get_coalesce_window(),
+            )
+
+    @action(
+        detail=False,
+        methods=["POST"],
+        url_path="bulk",
+        permission_classes=[IsAuthenticated],
+    )
+    def bulk_create(self, request: Request) -> Response:
+        """
+        Custom action for creating many events in one transaction.
+        """
+
+        serializer = self.get_serializer(
+            data=request.data,
+            many=True,
+            max_length=BULK_CREATE_MAX_EVENTS,
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save(organizer=request.user)
+
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def register_user(
+        self,
+        request: Request,
+        hold_required: bool = False,
+    ) -> Response:
+        """
+        Registers the user with one statement, claiming the seat held
+        by the user if any. Seats held by other users are not claimed.
+        """
+        event_id = self.get_event_id()
+        now = django.utils.timezone.now()
+        reserved, hold_expires_at = 0, None
+        if events.holds.holds_enabled():
+            reserved, hold_expires_at = events.holds.get_holds(
+                event_id, request.user.id, now
+            )
+        if hold_required and hold_expires_at is None:
+            return Response(
+                {"detail": "You have no seat held for this event."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        event = Event.objects.register_participant(
+            event_id=event_id,
+            user_id=request.user.id,
+            now=now,
+            reserved=reserved,
+            held=hold_expires_at is not None,
+        )
+        if event is None:
+            raise NotFound(self.not_found_message)
+
+        result, detail = Event.get_registration_result(event)
+        if result == REJECTED:
+            return Response(
+                {"detail": detail},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Check if the user was put on the waitlist
+        if result == WAITLISTED:
+            if event["has_free_seats"]:
+                # Seats freed for the users waiting before
+                transaction.on_commit(
+                    lambda: events.tasks.promote_waitlisted_participants.delay(
+                        event["id"]
+                    )
                 )
+            elif reserved:
+                # Seats released by the holds expiring in the meantime
+                countdown = events.holds.get_hold_duration().total_seconds()
+                transaction.on_commit(
+                    lambda: (
+                        events.tasks.promote_waitlisted_participants
+                        .apply_async((event["id"],), countdown=countdown)
+                    )
+                )
+            return Response(
+                {"detail": detail},
+                status=status.HTTP_202_ACCEPTED,
             )
-            events.tasks.send_email_notification.delay(
-                subject=subject,
-                message=message,
-                emails=participant_emails,
+
+        if hold_expires_at is not None:
+            transaction.on_commit(
+                lambda: events.holds.release_hold(event_id, request.user.id)
             )
 
+        return Response({"detail": detail}, status=status.HTTP_200_OK)
+
     @action(
         detail=True,
         methods=["POST"],
@@ -97,55 +358,132 @@ class EventViewSet(viewsets.ModelViewSet):
     def register(self, request: Request, pk: int | None = None) -> Response:
         """
         Custom action for registering a user to an event.
+        Checks and registration are made by one statement.
         """
+        if events.buffer.buffer_enabled():
+            return self.buffer_registration(request)
+        return self.register_user(request)
 
-        event = self.get_object()
+    def buffer_registration(self, request: Request) -> Response:
+        """
+        Accepts the registration request into the Redis stream without
+        touching the database. Requests are applied in batches by
+        events.tasks.apply_buffered_registrations.
+        """
+        event_id = self.get_event_id()
+        events.buffer.enqueue_registration(event_id, request.user.id)
+        return Response(
+            {
+                "detail": "Registration request accepted.",
+                "status_url": reverse(
+                    "events:event-registration-status",
+                    args=[event_id],
+                    request=request,
+                ),
+            },
+            status=status.HTTP_202_ACCEPTED,
+        )
 
-        # Check if the user is organizer
-        if request.user == event.organizer:
+    @action(
+        detail=True,
+        methods=["GET"],
+        url_path="registration-status",
+        permission_classes=[IsAuthenticated],
+    )
+    def registration_status(
+        self,
+        request: Request,
+        pk: int | None = None,
+    ) -> Response:
+        """
+        Custom action for the status of the buffered registration request.
+        """
+        registration = events.buffer.get_status(
+            self.get_event_id(), request.user.id
+        )
+        if registration is None:
             return Response(
-                {"detail": "You are the organizer of this event."},
-                status=status.HTTP_400_BAD_REQUEST,
+                {"detail": "No registration request for this event."},
+                status=status.HTTP_404_NOT_FOUND,
             )
+        return Response(registration, status=status.HTTP_200_OK)
 
-        # Check if the user is already registered
-        if event.participants.filter(id=request.user.id).exists():
+    @action(
+        detail=True,
+        methods=["POST"],
+        url_path="hold",
+        permission_classes=[IsAuthenticated],
+    )
+    def hold(self, request: Request, pk: int | None = None) -> Response:
+        """
+        Custom action for holding a seat for the user for a few minutes.
+        Holds are kept in Redis only, so the database is written
+        to on confirmation and never on expiry.
+        """
+        if not events.holds.holds_enabled():
             return Response(
-                {"detail": "You are already registered for this event."},
+                {"detail": "Seat holds are not available."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Check if the event started or is in the past
-        if event.start_time < django.utils.timezone.now():
+        event_id = self.get_event_id()
+        now = django.utils.timezone.now()
+        event = Event.objects.get_registration_state(
+            event_id=event_id,
+            user_id=request.user.id,
+            now=now,
+        )
+        if event is None:
+            raise NotFound(self.not_found_message)
+
+        message = Event.get_registration_error_message(event)
+        if message is not None:
             return Response(
-                {
-                    "detail": "You cannot register for the event that have already started or is finished"
-                },
+                {"detail": message},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Register the user
-        event.participants.add(request.user)
-
-        # Sending email about successful registration
-        subject = f"You are registered at {event.title}"
-        message = REGISTRATION_HTML_CONTENT.format(
-            username=request.user.username,
-            event=event.title,
-            start_time=event.start_time.strftime("%d %b %Y %H:%M"),
-            end_time=event.end_time.strftime("%d %b %Y %H:%M"),
-            location=event.location,
-            organizer_email=event.organizer.email,
-        )
-        events.tasks.send_email_notification.delay(
-            subject=subject, message=message, emails=[request.user.email]
-        )
+        # Free seats are given to the waitlisted users first
+        expires_at = None
+        if not event["has_waitlist"]:
+            expires_at = events.holds.hold_seat(
+                event_id=event_id,
+                user_id=request.user.id,
+                free_seats=event["free_seats"],
+                now=now,
+            )
+        if expires_at is None:
+            return Response(
+                {"detail": "The event is full."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
         return Response(
-            {"detail": "Successfully registered for the event."},
+            {
+                "detail": "Seat held, confirm to register for the event.",
+                "expires_at": expires_at,
+            },
             status=status.HTTP_200_OK,
         )
 
+    @action(
+        detail=True,
+        methods=["POST"],
+        url_path="confirm",
+        permission_classes=[IsAuthenticated],
+    )
+    def confirm(self, request: Request, pk: int | None = None) -> Response:
+        """
+        Custom action for registering a user to an event
+        for the seat held by the user.
+        """
+        if not events.holds.holds_enabled():
+            return Response(
+                {"detail": "Seat holds are not available."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return self.register_user(request, hold_required=True)
+
     @action(
         detail=True,
         methods=["POST"],
@@ -155,19 +493,26 @@ class EventViewSet(viewsets.ModelViewSet):
     def unregister(self, request: Request, pk: int | None = None) -> Response:
         """
         Custom action for unregistering a user from an event.
+        Checks and unregistration are made by one statement.
         """
 
-        event = self.get_object()
+        event = Event.objects.unregister_participant(
+            event_id=self.get_event_id(),
+            user_id=request.user.id,
+            now=django.utils.timezone.now(),
+        )
+        if event is None:
+            raise NotFound(self.not_found_message)
 
-        # Check if the user is not in event participants
-        if not event.participants.filter(id=request.user.id).exists():
+        # Check if the user is not in event participants or the waitlist
+        if not event["registered"] and not event["on_waitlist"]:
             return Response(
                 {"detail": "You are not registered for this event."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
         # Check if the event started or is in the past
-        if event.start_time < django.utils.timezone.now():
+        if event["started"]:
             return Response(
                 {
                     "detail": "You cannot unregister from the event that have already started or is finished"
@@ -175,20 +520,19 @@ class EventViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Unregister the user
-        event.participants.remove(request.user)
+        if event["on_waitlist"]:
+            return Response(
+                {"detail": "Successfully left the waitlist of the event."},
+                status=status.HTTP_200_OK,
+            )
 
-        # Sending email about successful canceling of the registration
-        subject = f"You've canceled you registration at {event.title}"
-        message = CANCEL_REGISTRATION_HTML_CONTENT.format(
-            username=request.user.username,
-            event=event.title,
-        )
-        events.tasks.send_email_notification.delay(
-            subject=subject,
-            message=message,
-            emails=[request.user.email],
-        )
+        # Give the seat to the first waitlisted user
+        if event["has_waitlist"]:
+            transaction.on_commit(
+                lambda: events.tasks.promote_waitlisted_participants.delay(
+                    event["id"]
+                )
+            )
 
         return Response(
             {"detail": "Successfully unregistered from the event."},
@@ -1,6 +1,7 @@
 import os
 
 from celery import Celery
+from kombu import Queue
 
 # Set the default Django settings module for the 'celery' program.
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "events_core.settings")
@@ -16,6 +17,59 @@ app.config_from_object("django.conf:settings", namespace="CELERY")
 # Load task modules from all registered Django apps.
 app.autodiscover_tasks()
 
+DEFAULT_QUEUE = "celery"
+# Registration emails, never queued behind bulk mail
+TRANSACTIONAL_QUEUE = "transactional"
+# Update fan-outs, reminders and digests
+BULK_QUEUE = "bulk"
+
+# Every queue is consumed by its own workers (see docker-compose.yaml)
+app.conf.task_queues = (
+    Queue(DEFAULT_QUEUE),
+    Queue(TRANSACTIONAL_QUEUE),
+    Queue(BULK_QUEUE),
+)
+app.conf.task_default_queue = DEFAULT_QUEUE
+# Lower is consumed first
+app.conf.task_routes = {
+    "events.tasks.send_notification": {
+        "queue": TRANSACTIONAL_QUEUE,
+        "priority": 0,
+    },
+    "events.tasks.promote_waitlisted_participants": {
+        "queue": TRANSACTIONAL_QUEUE,
+        "priority": 3,
+    },
+    "events.tasks.send_event_reminders": {"queue": BULK_QUEUE, "priority": 0},
+    "events.tasks.notify_event_update": {"queue": BULK_QUEUE, "priority": 3},
+    "events.tasks.send_bulk_notification": {
+        "queue": BULK_QUEUE,
+        "priority": 3,
+    },
+    "events.tasks.send_notification_digests": {
+        "queue": BULK_QUEUE,
+        "priority": 9,
+    },
+    "events.tasks.send_digests": {"queue": BULK_QUEUE, "priority": 9},
+}
+# Redis emulates priorities with a list per priority of every queue
+app.conf.broker_transport_options = {
+    "queue_order_strategy": "priority",
+    "priority_steps": list(range(10)),
+    "sep": ":",
+}
+# Rate limits of the email tasks, per worker. A bulk task sends
+# up to EVENT_NOTIFICATION_CHUNK_SIZE messages.
+app.conf.task_annotations = {
+    "events.tasks.send_notification": {"rate_limit": "50/s"},
+    "events.tasks.send_bulk_notification": {"rate_limit": "2/s"},
+    "events.tasks.send_digests": {"rate_limit": "2/s"},
+}
+# One task is reserved at a time, so a long bulk task does not hold
+# others back. Tasks safe to run again are acknowledged late
+# (see events.tasks).
+app.conf.worker_prefetch_multiplier = 1
+
 
 @app.task(bind=True, ignore_result=True)
 def debug_task(self):
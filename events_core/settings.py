@@ -13,6 +13,7 @@ import os
 from datetime import timedelta
 from pathlib import Path
 
+from celery.schedules import crontab
 from dotenv import load_dotenv
 
 
@@ -47,6 +48,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
 
     # 3rd parties
     "rest_framework",
@@ -107,6 +109,19 @@ DATABASES = {
 }
 
 
+# Cache
+# Tests use the local memory cache instead (see events_core.test_settings)
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": (
+            f"redis://{os.getenv('REDIS_HOST')}:{os.getenv('REDIS_PORT')}/1"
+        ),
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -174,6 +189,42 @@ REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
 
+# Default events list pagination: "page" or "cursor"
+# (can be switched per request with the "pagination" query param)
+EVENT_PAGINATION_MODE = "page"
+
+# Events list counts: "exact" or "estimated" (planner estimates for broad
+# queries, exact counts cached per filter signature for narrow ones)
+EVENT_COUNT_MODE = "exact"
+EVENT_COUNT_ESTIMATE_THRESHOLD = 10000
+EVENT_COUNT_CACHE_TIMEOUT = 30
+
+# Waitlisted users promoted to free seats per transaction
+EVENT_WAITLIST_PROMOTION_BATCH_SIZE = 500
+
+# Events list and retrieve responses, invalidated on changes (0 disables)
+EVENT_RESPONSE_CACHE_TIMEOUT = 60
+
+# Events list ETags change at least this often, as events become past
+EVENT_LIST_VALIDATOR_BUCKET_SECONDS = 60
+
+# Seats held in Redis before confirming the registration (0 disables).
+# Off by default, as registrations then read the holds from Redis first.
+EVENT_SEAT_HOLD_MINUTES = 0
+EVENT_SEAT_HOLDS_REDIS_URL = (
+    f"redis://{os.getenv('REDIS_HOST')}:{os.getenv('REDIS_PORT')}/2"
+)
+
+# Registrations: "direct" or "buffered" (requests are accepted into a Redis
+# stream and applied in batches by the apply_buffered_registrations task)
+EVENT_REGISTRATION_MODE = "direct"
+EVENT_REGISTRATION_BUFFER_REDIS_URL = EVENT_SEAT_HOLDS_REDIS_URL
+EVENT_REGISTRATION_BUFFER_BATCH_SIZE = 1000
+EVENT_REGISTRATION_BUFFER_INTERVAL = 1
+# Requests of crashed consumers are taken over after this idle time
+EVENT_REGISTRATION_BUFFER_CLAIM_IDLE_MS = 60_000
+EVENT_REGISTRATION_STATUS_TIMEOUT = 24 * 60 * 60
+
 
 # JSON Web Token
 
@@ -192,6 +243,32 @@ EMAIL_PORT = os.getenv("EMAIL_PORT")
 EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
 EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS")
+EMAIL_TIMEOUT = 10
+
+# SMTP connections kept open by each Celery worker process (events.mail),
+# checked with NOOP before reuse after being idle for EVENT_EMAIL_KEEPALIVE
+EVENT_EMAIL_POOL_SIZE = 4
+EVENT_EMAIL_KEEPALIVE = 30
+
+# Participants emailed by one task of the event update notifications
+EVENT_NOTIFICATION_CHUNK_SIZE = 500
+# Event fields of the notifications, cached per event version
+EVENT_EMAIL_CONTEXT_CACHE_TIMEOUT = 60 * 60
+# Hour (UTC) of the daily digest of the users in the digest notification mode
+EVENT_NOTIFICATION_DIGEST_HOUR = 8
+# Participants are reminded of events starting within the lead time
+# by a beat task running every EVENT_REMINDER_INTERVAL_MINUTES,
+# which claims EVENT_REMINDER_BATCH_SIZE events per statement
+EVENT_REMINDER_LEAD_MINUTES = 24 * 60
+EVENT_REMINDER_INTERVAL_MINUTES = 5
+EVENT_REMINDER_BATCH_SIZE = 100
+# Notifications are held for this long and coalesced per user and event,
+# or per event for updates, so bursts of changes send one email
+EVENT_NOTIFICATION_COALESCE_SECONDS = 30
+# Notifications published by one transaction of dispatch_notifications,
+# which polls the outbox every EVENT_OUTBOX_POLL_INTERVAL seconds once drained
+EVENT_OUTBOX_BATCH_SIZE = 500
+EVENT_OUTBOX_POLL_INTERVAL = 0.5
 
 
 # Spectacular settings
@@ -217,3 +294,23 @@ CELERY_RESULT_BACKEND = f"redis://{os.getenv('REDIS_HOST')}:{os.getenv('REDIS_PO
 CELERY_TIMEZONE = "UTC"
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60
+CELERY_BEAT_SCHEDULE = {
+    "reconcile-participant-counts": {
+        "task": "events.tasks.reconcile_participant_counts",
+        "schedule": timedelta(hours=1),
+    },
+    "send-event-reminders": {
+        "task": "events.tasks.send_event_reminders",
+        "schedule": timedelta(minutes=EVENT_REMINDER_INTERVAL_MINUTES),
+    },
+    "send-notification-digests": {
+        "task": "events.tasks.send_notification_digests",
+        "schedule": crontab(hour=EVENT_NOTIFICATION_DIGEST_HOUR, minute=0),
+    },
+}
+
+if EVENT_REGISTRATION_MODE == "buffered":
+    CELERY_BEAT_SCHEDULE["apply-buffered-registrations"] = {
+        "task": "events.tasks.apply_buffered_registrations",
+        "schedule": timedelta(seconds=EVENT_REGISTRATION_BUFFER_INTERVAL),
+    }
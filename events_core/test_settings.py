@@ -0,0 +1,20 @@
+"""
+Django settings for running the tests, the production settings with
+the cache in local memory, so tests neither need the Redis server nor
+clear its entries.
+
+python manage.py test --settings=events_core.test_settings
+"""
+from events_core.settings import *  # noqa: F401, F403
+
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+# The cache outlives the rolled back test transactions, responses cached
+# by one test would leak into the others. ResponseCacheEventApiTests
+# enables it with a cleared cache.
+EVENT_RESPONSE_CACHE_TIMEOUT = 0
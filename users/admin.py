@@ -14,6 +14,7 @@ class UserAdmin(DjangoUserAdmin):
     fieldsets = (
         (None, {"fields": ("username", "email", "password")}),
         (_("Personal info"), {"fields": ("first_name", "last_name")}),
+        (_("Notifications"), {"fields": ("notification_mode",)}),
         (
             _("Permissions"),
             {
@@ -37,6 +38,6 @@ class UserAdmin(DjangoUserAdmin):
             },
         ),
     )
-    list_display = ("email", "username", "is_staff")
+    list_display = ("email", "username", "notification_mode", "is_staff")
     search_fields = ("email", "username")
     ordering = ("email",)
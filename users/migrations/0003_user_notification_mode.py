@@ -0,0 +1,23 @@
+# Generated by Django 5.1.4 on 2026-10-18 05:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0002_user_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="notification_mode",
+            field=models.CharField(
+                choices=[("immediate", "Immediate"), ("digest", "Digest")],
+                db_default="immediate",
+                default="immediate",
+                max_length=15,
+            ),
+        ),
+    ]
@@ -1,14 +1,41 @@
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 
 from users.managers import UserManager
 
 
+class NotificationMode(models.TextChoices):
+    IMMEDIATE = "immediate"
+    # One email per day with all the notifications (see events.tasks)
+    DIGEST = "digest"
+
+
 class User(AbstractUser):
 
     email = models.EmailField(verbose_name="email address", unique=True)
+    notification_mode = models.CharField(
+        max_length=15,
+        choices=NotificationMode.choices,
+        default=NotificationMode.IMMEDIATE,
+        db_default=NotificationMode.IMMEDIATE,
+    )
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["username"]
 
     objects = UserManager()
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Trigram indexes serving icontains, i.e. UPPER(field) LIKE '%x%'
+            GinIndex(
+                OpClass(Upper("username"), name="gin_trgm_ops"),
+                name="user_username_trgm_idx",
+            ),
+            GinIndex(
+                OpClass(Upper("email"), name="gin_trgm_ops"),
+                name="user_email_trgm_idx",
+            ),
+        ]
@@ -17,6 +17,7 @@ REGISTER_RESPONSE_OPEN_API_EXAMPLE = OpenApiExample(
         "id": 12,
         "username": "Tech_Dragon",
         "email": "tech.dragon@test.com",
+        "notification_mode": "immediate",
         "is_staff": False,
     },
     response_only=True,
@@ -72,6 +73,7 @@ USER_DETAIL_OPEN_API_EXAMPLE = OpenApiExample(
         "id": 3,
         "username": "SkyWalker89",
         "email": "sky.walker@test.com",
+        "notification_mode": "immediate",
         "is_staff": False,
     },
     response_only=True,
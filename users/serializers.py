@@ -5,7 +5,14 @@ from rest_framework import serializers
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = get_user_model()
-        fields = ("id", "username", "email", "password", "is_staff")
+        fields = (
+            "id",
+            "username",
+            "email",
+            "password",
+            "notification_mode",
+            "is_staff",
+        )
         read_only_fields = ("id", "is_staff")
         extra_kwargs = {
             "password": {
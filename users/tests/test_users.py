@@ -139,6 +139,24 @@ class PrivateUserApiTests(TestCase):
         self.assertEqual(self.user.email, self.payload["email"])
         self.assertTrue(self.user.check_password("test123test"))
 
+    def test_update_notification_mode(self) -> None:
+        response = self.client.patch(
+            MANAGE_USER_URL, {"notification_mode": "digest"}
+        )
+        self.user.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.user.notification_mode, "digest")
+
+    def test_update_invalid_notification_mode(self) -> None:
+        response = self.client.patch(
+            MANAGE_USER_URL, {"notification_mode": "weekly"}
+        )
+        self.user.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.user.notification_mode, "immediate")
+
     def test_unauthorized_user_cannot_access_profile(self) -> None:
         self.client.force_authenticate(user=None)
         response = self.client.get(MANAGE_USER_URL)